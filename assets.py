@@ -0,0 +1,55 @@
+"""CSS/JS paketleri ve içerik özetli statik adları
+
+Sayfa kabuğu (templates/index.html) küçük bir HTML'dir; stiller ve betikler
+static/ altındaki paketlerden yüklenir. build_assets.py her paketi
+birleştirip küçültür, içerik özetiyle adlandırır (dist/app.3f2a9c1b7d4e.js)
+ve static/dist/manifest.json'a yazar. Ad içerikle değiştiği için nginx bu
+dosyaları bir yıl önbellekletebilir; yeni sürüm yeni bir adla gelir.
+
+Manifest yoksa (geliştirme) paketin kaynak dosyaları ayrı ayrı, içerik
+özeti ?v= parametresinde olacak şekilde verilir.
+"""
+import hashlib
+import json
+import os
+
+from flask import url_for
+
+# Paket -> static/ altındaki kaynak dosyalar (sırayla birleştirilir)
+BUNDLES = {
+    'app.css': ('src/app.css',),
+    'app.js': ('webrtc.js', 'src/app.js'),
+}
+DIST = 'dist'
+MANIFEST = 'dist/manifest.json'
+
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+class AssetManifest:
+    """asset_urls('app.js') şablon fonksiyonunu sağlar"""
+
+    def __init__(self):
+        self.static_folder = None
+        self.manifest = {}
+
+    def init_app(self, app):
+        self.static_folder = app.static_folder
+        path = os.path.join(self.static_folder, MANIFEST)
+        if os.path.exists(path):
+            with open(path) as f:
+                self.manifest = json.load(f)
+        app.add_template_global(self.urls, 'asset_urls')
+        app.extensions['assets'] = self
+
+    def _source_digest(self, name):
+        with open(os.path.join(self.static_folder, name), 'rb') as f:
+            return digest(f.read())
+
+    def urls(self, bundle):
+        """Paketi yükleyen URL'ler: derlenmişse tek özetli dosya, değilse kaynaklar"""
+        if bundle in self.manifest:
+            return [url_for('static', filename=self.manifest[bundle])]
+        return [url_for('static', filename=name, v=self._source_digest(name)) for name in BUNDLES[bundle]]
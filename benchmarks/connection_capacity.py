@@ -0,0 +1,218 @@
+"""Eşzamanlı Socket.IO bağlantı kapasitesi: geliştirme sunucusu ve gunicorn
+
+İki açılış şekli karşılaştırılır:
+
+  * dev:      python index.py'nin eski hali, socketio.run(app, debug=True)
+  * gunicorn: gunicorn -c gunicorn.conf.py wsgi:app (eventlet worker)
+
+Her sunucuya --connections kadar WebSocket bağlantısı açılır (Socket.IO
+el sıkışması dahil), bağlantılar --hold saniye açık tutulur ve kurulan /
+ayakta kalan bağlantı sayısı, bağlanma gecikmesi ile sunucu belleği raporlanır.
+
+    python -m benchmarks.connection_capacity --connections 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve_dev(port):
+    """Eski açılış: socketio.run(debug=True)"""
+    from index import app, socketio
+
+    socketio.run(app, debug=True, host='127.0.0.1', port=port)
+
+
+def rss_mb(pid):
+    """Sürecin ve alt süreçlerinin toplam RSS'i (MB, Linux)"""
+    total, pending = 0, [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/status') as status:
+                total += next(int(line.split()[1]) for line in status if line.startswith('VmRSS'))
+            for task in os.listdir(f'/proc/{current}/task'):
+                with open(f'/proc/{current}/task/{task}/children') as children:
+                    pending.extend(int(child) for child in children.read().split())
+        except (OSError, StopIteration):
+            continue
+    return total / 1024
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class SocketClient:
+    """Engine.IO v4 / Socket.IO v5 protokolünü konuşan en küçük WebSocket istemcisi"""
+
+    def __init__(self, http, url):
+        self.http = http
+        self.url = url
+        self.ws = None
+        self.reader = None
+
+    async def connect(self, timeout):
+        # Dolu bir sunucu el sıkışmayı hiç yanıtlamayabilir; tüm adımlar tek süre sınırında
+        started = time.perf_counter()
+        await asyncio.wait_for(self._handshake(), timeout)
+        self.reader = asyncio.ensure_future(self._keepalive())
+        return (time.perf_counter() - started) * 1000
+
+    async def _handshake(self):
+        self.ws = await self.http.ws_connect(f'{self.url}/socket.io/?EIO=4&transport=websocket',
+                                             autoping=False)
+        opened = await self.ws.receive()
+        if not str(opened.data).startswith('0'):
+            raise RuntimeError('Engine.IO open paketi gelmedi')
+        await self.ws.send_str('40')
+        while True:
+            message = await self.ws.receive()
+            if message.type != aiohttp.WSMsgType.TEXT:
+                raise RuntimeError('bağlantı kapandı')
+            if message.data.startswith('40'):
+                return
+
+    async def _keepalive(self):
+        # Sunucu ping'lerine pong ile yanıt ver
+        async for message in self.ws:
+            if message.type == aiohttp.WSMsgType.TEXT and message.data == '2':
+                await self.ws.send_str('3')
+
+    @property
+    def alive(self):
+        return self.ws is not None and not self.ws.closed
+
+    async def close(self):
+        if self.reader:
+            self.reader.cancel()
+        if self.ws is not None:
+            await self.ws.close()
+
+
+async def wait_for(url, timeout=30):
+    deadline = time.time() + timeout
+    async with aiohttp.ClientSession() as http:
+        while time.time() < deadline:
+            try:
+                async with http.get(f'{url}/api/rooms') as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise RuntimeError(f'{url} başlamadı')
+
+
+async def load(url, connections, concurrency, hold, timeout):
+    limit = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as http:
+        clients = [SocketClient(http, url) for _ in range(connections)]
+
+        async def open_one(client):
+            async with limit:
+                try:
+                    latencies.append(await client.connect(timeout))
+                except Exception as e:
+                    errors.append(type(e).__name__)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(open_one(c) for c in clients))
+        ramp = time.perf_counter() - started
+        await asyncio.sleep(hold)
+        alive = sum(c.alive for c in clients)
+        await asyncio.wait_for(asyncio.gather(*(c.close() for c in clients), return_exceptions=True), timeout)
+    return latencies, errors, ramp, alive
+
+
+def start_server(mode, port, env):
+    if mode == 'dev':
+        command = [sys.executable, '-m', 'benchmarks.connection_capacity', '--serve-dev', str(port)]
+    else:
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+    return subprocess.Popen(command, cwd=ROOT, env=dict(env, PORT=str(port)),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+async def run(args):
+    # Her iki taraf da binlerce soket açacak
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'capacity.db')
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}', GUNICORN_ACCESS_LOG='')
+    os.environ.update(env)
+    from index import app
+    from models import db
+    with app.app_context():
+        db.create_all()
+
+    rows = []
+    for mode in args.modes.split(','):
+        port = free_port()
+        server = start_server(mode, port, env)
+        url = f'http://127.0.0.1:{port}'
+        try:
+            await wait_for(url)
+            idle = rss_mb(server.pid)
+            latencies, errors, ramp, alive = await load(url, args.connections, args.concurrency,
+                                                        args.hold, args.timeout)
+            loaded = rss_mb(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+        rows.append((mode, len(latencies), alive, errors, ramp, latencies, idle, loaded))
+
+    print(f"{'mod':<9} {'kurulan':>8} {'ayakta':>7} {'hata':>6} {'süre s':>7} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'RSS MB':>8} {'KB/bağ.':>8}")
+    for mode, connected, alive, errors, ramp, latencies, idle, loaded in rows:
+        per_connection = (loaded - idle) * 1024 / connected if connected else 0
+        print(f'{mode:<9} {connected:>8} {alive:>7} {len(errors):>6} {ramp:>7.1f} '
+              f"{statistics.median(latencies) if latencies else 0:>8.1f} "
+              f"{percentile(latencies, 95) if latencies else 0:>8.1f} "
+              f"{percentile(latencies, 99) if latencies else 0:>8.1f} "
+              f'{loaded:>8.1f} {per_connection:>8.1f}')
+        if errors:
+            print(f"          hatalar: {', '.join(sorted(set(errors)))}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--modes', default='dev,gunicorn')
+    parser.add_argument('--connections', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=200, help='aynı anda açılan bağlantı sayısı')
+    parser.add_argument('--hold', type=float, default=5, help='bağlantıların açık tutulacağı süre (saniye)')
+    parser.add_argument('--timeout', type=float, default=15)
+    parser.add_argument('--serve-dev', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_dev:
+        serve_dev(args.serve_dev)
+        return 0
+    return asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""Davet kodu üretimi ve kullanımı: verim ve yarış güvenliği
+
+Üç ölçüm yapılır:
+
+  * üretim: --count davet, eski yöntemle (her kod için ayrı POST /invite)
+    ve tek POST /invites çağrısıyla (tek çok satırlı INSERT),
+  * yarış: --threads kullanıcı aynı kodla aynı anda özel odaya katılmaya
+    çalışır; yalnızca biri başarılı olmalı,
+  * kullanım: her kullanıcı kendi koduyla katılır; katılım/sn ölçülür.
+
+DATABASE_URL verilmezse geçici bir SQLite dosyası kullanılır.
+
+    python -m benchmarks.invites --count 1000 --threads 32
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'invites.db')}")
+os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'threading')
+os.environ.setdefault('METRICS_SLOW_MS', '60000')
+
+from index import app
+from models import db, User, Room, RoomInvite
+from query_counter import QueryCounter
+
+
+def seed(tag, users, capacity):
+    with app.app_context():
+        owner = User(username=f'owner_{tag}', display_name='Owner')
+        db.session.add(owner)
+        db.session.flush()
+        room = Room(name=f'invites {tag}', owner_id=owner.id, is_public=False,
+                    max_participants=capacity, current_participants=0)
+        db.session.add(room)
+        people = [User(username=f'{tag}_{i}', display_name=f'U{i}') for i in range(users)]
+        db.session.add_all(people)
+        db.session.commit()
+        return owner.id, room.id, [p.id for p in people]
+
+
+def client_for(user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+    return client
+
+
+def generation(count, engine):
+    owner_id, room_id, _ = seed('gen', 0, 10)
+    client = client_for(owner_id)
+    rows = []
+
+    with QueryCounter(engine) as counter:
+        started = time.perf_counter()
+        for _ in range(count):
+            response = client.post(f'/api/rooms/{room_id}/invite')
+            assert response.status_code == 201, response.get_json()
+        elapsed = time.perf_counter() - started
+    rows.append(('tek tek', count, counter.count, elapsed))
+
+    with QueryCounter(engine) as counter:
+        started = time.perf_counter()
+        response = client.post(f'/api/rooms/{room_id}/invites', json={'count': count})
+        elapsed = time.perf_counter() - started
+    assert response.status_code == 201, response.get_json()
+    codes = response.get_json()['invite_codes']
+    rows.append(('toplu', count, counter.count, elapsed))
+
+    with app.app_context():
+        stored = RoomInvite.query.filter_by(room_id=room_id).count()
+    unique = len(set(codes)) == len(codes) and stored == 2 * count
+    return rows, unique
+
+
+def redeem(room_id, pairs, threads):
+    """(kullanıcı, kod) çiftleriyle eşzamanlı katıl; durum kodu sayılarını döndür"""
+    stats = {'ok': 0, 'invalid': 0, 'other': 0}
+    lock = threading.Lock()
+    start = threading.Barrier(min(threads, len(pairs)))
+
+    def worker(pair):
+        user_id, code = pair
+        client = client_for(user_id)
+        try:
+            start.wait(timeout=10)
+        except threading.BrokenBarrierError:
+            pass
+        response = client.post(f'/api/rooms/{room_id}/join', json={'invite_code': code})
+        if response.status_code == 200:
+            key = 'ok'
+        elif response.get_json().get('error') == 'Invalid invite code':
+            key = 'invalid'
+        else:
+            key = 'other'
+        with lock:
+            stats[key] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, pairs))
+    return stats, time.perf_counter() - started
+
+
+def race(threads):
+    owner_id, room_id, user_ids = seed('race', threads, threads + 1)
+    response = client_for(owner_id).post(f'/api/rooms/{room_id}/invite')
+    code = response.get_json()['invite_code']
+    stats, _ = redeem(room_id, [(user_id, code) for user_id in user_ids], threads)
+    return stats
+
+
+def throughput(count, threads):
+    owner_id, room_id, user_ids = seed('use', count, count + 1)
+    response = client_for(owner_id).post(f'/api/rooms/{room_id}/invites', json={'count': count})
+    codes = response.get_json()['invite_codes']
+    stats, elapsed = redeem(room_id, list(zip(user_ids, codes)), threads)
+    with app.app_context():
+        used = RoomInvite.query.filter_by(room_id=room_id, is_used=True).count()
+    return stats, elapsed, used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=32)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        engine = db.engine
+
+    failed = False
+    rows, unique = generation(args.count, engine)
+    print(f"{'üretim':<10} {'davet':>6} {'sorgu':>7} {'süre ms':>9} {'davet/sn':>10}")
+    for method, count, queries, elapsed in rows:
+        print(f'{method:<10} {count:>6} {queries:>7} {elapsed * 1000:>9.1f} {count / elapsed:>10.0f}')
+    if not unique:
+        print('HATA: tekrarlanan veya eksik davet kodu')
+        failed = True
+
+    stats = race(args.threads)
+    result = 'OK' if stats['ok'] == 1 and stats['other'] == 0 else 'HATA'
+    print(f"\nyarış: {args.threads} kullanıcı aynı kod -> başarılı {stats['ok']}, "
+          f"geçersiz {stats['invalid']}, diğer {stats['other']}  {result}")
+    failed = failed or result != 'OK'
+
+    stats, elapsed, used = throughput(args.count, args.threads)
+    result = 'OK' if stats['ok'] == args.count == used else 'HATA'
+    print(f"kullanım: {args.count} farklı kod -> başarılı {stats['ok']}, kullanılmış {used}, "
+          f"{args.count / elapsed:.0f} katılım/sn  {result}")
+    failed = failed or result != 'OK'
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Eşzamanlı katılma / ayrılma altında kapasite ve sayaç tutarlılığı
+
+--users kullanıcı aynı anda --capacity kişilik bir odaya katılmaya çalışır;
+--churn oranındaki katılanlar hemen ayrılıp tekrar katılmayı dener. Sonunda:
+
+  * kabul edilen eşzamanlı üye sayısı hiçbir an kapasiteyi aşmamalı
+    (room_member satırı <= max_participants),
+  * current_participants, room_member satırlarının COUNT(*)'ına eşit olmalı.
+
+Aynı senaryo karşılaştırma için eski (Python'da oku-artır-yaz) yöntemle de
+çalıştırılır. DATABASE_URL verilmezse geçici bir SQLite dosyası kullanılır.
+
+    python -m benchmarks.join_stress --users 200 --capacity 50 --threads 32
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'join_stress.db')}")
+os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'threading')
+os.environ.setdefault('METRICS_SLOW_MS', '60000')
+
+from index import app
+from models import db, User, Room, RoomMember
+
+
+def legacy_join(room_id, user_id):
+    """Önceki yöntem: sayacı yükle, Python'da kontrol et ve artır"""
+    room = db.session.get(Room, room_id)
+    if room.current_participants >= room.max_participants:
+        return False
+    db.session.add(RoomMember(user_id=user_id, room_id=room_id))
+    room.current_participants += 1
+    db.session.commit()
+    return True
+
+
+def legacy_leave(room_id, user_id):
+    member = RoomMember.query.filter_by(user_id=user_id, room_id=room_id).first()
+    member.room.current_participants -= 1
+    db.session.delete(member)
+    db.session.commit()
+
+
+def seed(tag, users, capacity):
+    with app.app_context():
+        owner = User(username=f'owner_{tag}', display_name='Owner')
+        db.session.add(owner)
+        db.session.flush()
+        room = Room(name=f'stress {tag}', owner_id=owner.id, max_participants=capacity, current_participants=0)
+        db.session.add(room)
+        people = [User(username=f'{tag}_{i}', display_name=f'U{i}') for i in range(users)]
+        db.session.add_all(people)
+        db.session.commit()
+        return room.id, [p.id for p in people]
+
+
+def run(mode, users, capacity, threads, churn):
+    room_id, user_ids = seed(mode, users, capacity)
+    stats = {'joined': 0, 'full': 0, 'left': 0, 'errors': 0, 'peak_members': 0}
+    lock = threading.Lock()
+    start = threading.Barrier(min(threads, users))
+
+    def count_members():
+        return RoomMember.query.filter_by(room_id=room_id).count()
+
+    def worker(user_id):
+        try:
+            start.wait(timeout=10)
+        except threading.BrokenBarrierError:
+            pass
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = user_id
+        try:
+            for attempt in range(2):
+                if mode == 'legacy':
+                    with app.app_context():
+                        joined = legacy_join(room_id, user_id)
+                else:
+                    response = client.post(f'/api/rooms/{room_id}/join', json={})
+                    joined = response.status_code == 200
+                    if not joined and response.get_json().get('error') != 'Room is full':
+                        raise RuntimeError(response.get_json())
+                with app.app_context():
+                    members = count_members()
+                with lock:
+                    stats['joined' if joined else 'full'] += 1
+                    stats['peak_members'] = max(stats['peak_members'], members)
+                if not joined or attempt == 1 or random.random() >= churn:
+                    return
+                if mode == 'legacy':
+                    with app.app_context():
+                        legacy_leave(room_id, user_id)
+                else:
+                    client.post(f'/api/rooms/{room_id}/leave')
+                with lock:
+                    stats['left'] += 1
+        except Exception:
+            with lock:
+                stats['errors'] += 1
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(worker, user_ids))
+
+    with app.app_context():
+        room = db.session.get(Room, room_id)
+        stats['members'] = count_members()
+        stats['counter'] = room.current_participants
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--capacity', type=int, default=50)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--churn', type=float, default=0.3, help='katıldıktan sonra ayrılıp tekrar deneyenlerin oranı')
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+
+    failed = False
+    print(f"{'yöntem':<8} {'katıldı':>8} {'dolu':>6} {'ayrıldı':>8} {'hata':>5} {'en çok üye':>11} "
+          f"{'üye':>5} {'sayaç':>6}  sonuç")
+    for mode in ('legacy', 'atomic'):
+        stats = run(mode, args.users, args.capacity, args.threads, args.churn)
+        problems = []
+        if stats['peak_members'] > args.capacity or stats['members'] > args.capacity:
+            problems.append('kapasite aşıldı')
+        if stats['counter'] != stats['members']:
+            problems.append(f"sayaç kaydı ({stats['counter'] - stats['members']:+d})")
+        print(f"{mode:<8} {stats['joined']:>8} {stats['full']:>6} {stats['left']:>8} {stats['errors']:>5} "
+              f"{stats['peak_members']:>11} {stats['members']:>5} {stats['counter']:>6}  "
+              f"{', '.join(problems) or 'OK'}")
+        if mode == 'atomic' and (problems or stats['errors']):
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,403 @@
+"""REST ve Socket.IO yüzeyleri için yük testi
+
+Uygulama ayrı bir süreçte (wsgi.py ile aynı şekilde, eventlet) SQLite veya
+DATABASE_URL'deki veritabanına karşı başlatılır. Sentetik kullanıcılar:
+
+  1. kayıt olur ve giriş yapar, oda dizinini listeler,
+  2. aynı odaya katılır, Socket.IO ile bağlanıp join_room gönderir,
+  3. konuşma ister, oda sahibi istekleri onaylar,
+  4. start_speaking / stop_speaking / toggle_mute olaylarını art arda gönderir.
+
+Her işlem için p50/p95/p99 gecikme, saniyedeki işlem sayısı ve işlem başına
+sunucuda çalışan SQL sorgusu; bağlı istemci başına sunucu belleği raporlanır.
+Socket olaylarının gecikmesi ack dönüşüne kadar geçen süredir.
+
+Sonuçlar JSON olarak kaydedilip sonraki bir çalıştırmayla karşılaştırılabilir:
+
+    python -m benchmarks.load_test --users 50 --save benchmarks/baselines/sqlite.json
+    python -m benchmarks.load_test --users 50 --compare benchmarks/baselines/sqlite.json
+
+Karşılaştırmada işlem başına sorgu sayısı --query-tolerance'tan fazla artarsa
+çıkış kodu 1 olur. Gecikme ve işlem hızı makineye ve o anki yüke bağlı olarak
+tek çalıştırmada %50'yi aşan oynamalar gösterebildiğinden yalnızca
+--check-latency verildiğinde (p95 veya işlem hızı --tolerance'tan fazla
+kötüleşirse) hataya sayılır; bu durumda --repeat ile birkaç çalıştırmanın
+medyanını kullanmak gerekir. Sorgu sayısındaki küçük farklar önbellek
+ıskalarından gelebilir (ör. --users 10 ile list_rooms'ta ıskalama oranı daha
+yüksektir); temel ölçümle parametreleri farklı çalıştırmalarda uyarı yazılır.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Sunucu tarafında kaydedilen sayaçlar bu uçtan okunur (yalnızca yük testi sürecinde)
+STATS_PATH = '/__load_test__/stats'
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def serve(port, trace_memory):
+    """Ölçüm ucu eklenmiş uygulama süreci"""
+    import eventlet
+    eventlet.monkey_patch()
+
+    import tracemalloc
+    from flask import jsonify
+    from sqlalchemy import event
+    from index import app, socketio, create_app
+    from models import db
+
+    if trace_memory:
+        tracemalloc.start()
+    counter = {'queries': 0}
+
+    def count_query(*args):
+        counter['queries'] += 1
+
+    with app.app_context():
+        db.create_all()
+        event.listen(db.engine, 'before_cursor_execute', count_query)
+
+    @app.route(STATS_PATH)
+    def load_test_stats():
+        with open('/proc/self/status') as status:
+            rss_kb = next(int(line.split()[1]) for line in status if line.startswith('VmRSS'))
+        return jsonify({
+            'queries': counter['queries'],
+            'rss_kb': rss_kb,
+            'traced_kb': tracemalloc.get_traced_memory()[0] / 1024 if trace_memory else None
+        })
+
+    create_app()
+    socketio.run(app, host='127.0.0.1', port=port, log_output=False)
+
+
+class OpStats:
+    """Bir işlem türünün gecikmeleri ve sunucu sorgu sayısı"""
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.elapsed = 0.0
+        self.queries = 0
+
+    def to_dict(self):
+        count = len(self.latencies) + self.errors
+        latencies = self.latencies or [0]
+        return {
+            'count': count,
+            'errors': self.errors,
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'ops_per_sec': round(count / self.elapsed, 1) if self.elapsed else 0,
+            'queries_per_op': round(self.queries / count, 2) if count else 0
+        }
+
+
+class SyntheticUser:
+    def __init__(self, url, name):
+        import requests
+        import socketio
+
+        self.url = url
+        self.name = name
+        self.http = requests.Session()
+        self.sio = socketio.Client(reconnection=False)
+        self.user_id = None
+
+    def register(self):
+        response = self.http.post(f'{self.url}/api/auth/register',
+                                  json={'username': self.name, 'display_name': self.name})
+        if response.ok:
+            self.user_id = response.json()['id']
+        return response.ok
+
+    def login(self):
+        return self.http.post(f'{self.url}/api/auth/login', json={'username': self.name}).ok
+
+    def list_rooms(self):
+        return self.http.get(f'{self.url}/api/rooms').ok
+
+    def join(self, room_id):
+        return self.http.post(f'{self.url}/api/rooms/{room_id}/join', json={}).ok
+
+    def connect(self, room_id):
+        cookie = '; '.join(f'{k}={v}' for k, v in self.http.cookies.items())
+        self.sio.connect(self.url, headers={'Cookie': cookie}, transports=['websocket'])
+        self.sio.call('join_room', {'room_id': room_id}, timeout=10)
+        return True
+
+    def request_speak(self, room_id):
+        return self.http.post(f'{self.url}/api/rooms/{room_id}/request-speak').ok
+
+    def approve(self, room_id, user_id):
+        return self.http.post(f'{self.url}/api/rooms/{room_id}/approve-speak/{user_id}').ok
+
+    def emit(self, name, data):
+        self.sio.call(name, data, timeout=10)
+        return True
+
+
+class LoadTest:
+    def __init__(self, url, concurrency):
+        import requests
+
+        self.url = url
+        self.concurrency = concurrency
+        self.http = requests.Session()
+        self.ops = {}
+
+    def server_stats(self):
+        return self.http.get(f'{self.url}{STATS_PATH}').json()
+
+    def phase(self, name, calls, concurrency=None):
+        """Çağrıları eşzamanlı çalıştır, gecikmeleri name altında topla"""
+        stats = self.ops.setdefault(name, OpStats())
+
+        def timed(call):
+            started = time.perf_counter()
+            try:
+                ok = call()
+            except Exception:
+                ok = False
+            return ok, (time.perf_counter() - started) * 1000
+
+        before = self.server_stats()['queries']
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency or self.concurrency) as executor:
+            for ok, latency in executor.map(timed, calls):
+                if ok:
+                    stats.latencies.append(latency)
+                else:
+                    stats.errors += 1
+        stats.elapsed += time.perf_counter() - started
+        stats.queries += self.server_stats()['queries'] - before
+
+    def run(self, users, list_rounds, bursts):
+        owner = SyntheticUser(self.url, 'owner')
+        owner.register()
+        members = [SyntheticUser(self.url, f'user{i}') for i in range(users)]
+
+        self.phase('register', [m.register for m in members])
+        self.phase('login', [m.login for m in members])
+        for _ in range(list_rounds):
+            self.phase('list_rooms', [m.list_rooms for m in members])
+
+        room = owner.http.post(f'{self.url}/api/rooms',
+                               json={'name': 'load', 'max_participants': users + 1}).json()
+        room_id = room['id']
+        self.phase('join', [lambda m=m: m.join(room_id) for m in members])
+
+        # Socket başına bellek: bağlantılar ve join_room öncesi / sonrası
+        idle = self.server_stats()
+        owner.connect(room_id)
+        self.phase('socket_connect', [lambda m=m: m.connect(room_id) for m in members], concurrency=users)
+        loaded = self.server_stats()
+        connected = sum(m.sio.connected for m in members) + 1
+        memory = {
+            'connected_clients': connected,
+            'rss_kb_per_client': round((loaded['rss_kb'] - idle['rss_kb']) / connected, 1)
+        }
+        if loaded['traced_kb'] is not None:
+            memory['traced_kb_per_client'] = round((loaded['traced_kb'] - idle['traced_kb']) / connected, 1)
+
+        self.phase('request_speak', [lambda m=m: m.request_speak(room_id) for m in members])
+        self.phase('approve_speak', [lambda m=m: owner.approve(room_id, m.user_id) for m in members])
+
+        payload = {'room_id': room_id}
+        for _ in range(bursts):
+            self.phase('start_speaking', [lambda m=m: m.emit('start_speaking', payload) for m in members],
+                       concurrency=users)
+            self.phase('stop_speaking', [lambda m=m: m.emit('stop_speaking', payload) for m in members],
+                       concurrency=users)
+            for muted in (True, False):
+                self.phase('toggle_mute', [lambda m=m: m.emit('toggle_mute', dict(payload, is_muted=muted))
+                                           for m in members], concurrency=users)
+
+        for member in [owner] + members:
+            member.sio.disconnect()
+        return {'operations': {name: stats.to_dict() for name, stats in self.ops.items()}, 'memory': memory}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def wait_for(url, timeout=30):
+    import requests
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(f'{url}{STATS_PATH}', timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f'{url} başlamadı')
+
+
+def print_results(results):
+    print(f"{'işlem':<16} {'adet':>6} {'hata':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'işlem/s':>9} {'sorgu/işlem':>12}")
+    for name, op in results['operations'].items():
+        print(f"{name:<16} {op['count']:>6} {op['errors']:>5} {op['p50_ms']:>8.2f} {op['p95_ms']:>8.2f} "
+              f"{op['p99_ms']:>8.2f} {op['ops_per_sec']:>9.1f} {op['queries_per_op']:>12.2f}")
+    memory = results['memory']
+    line = f"bellek: {memory['connected_clients']} istemci, istemci başına {memory['rss_kb_per_client']} KB RSS"
+    if 'traced_kb_per_client' in memory:
+        line += f", {memory['traced_kb_per_client']} KB Python nesnesi"
+    print(line)
+
+
+# Karşılaştırılabilirlik için temel ölçümle aynı olması beklenen parametreler
+RUN_PARAMETERS = ('database', 'users', 'concurrency', 'list_rounds', 'bursts')
+
+
+def median_results(runs):
+    """Birden fazla çalıştırmanın her ölçümü için medyanı al"""
+    if len(runs) == 1:
+        return runs[0]
+    operations = {}
+    for name, first in runs[0]['operations'].items():
+        values = [run['operations'][name] for run in runs]
+        operations[name] = {key: statistics.median(v[key] for v in values) for key in first}
+    memory = {key: statistics.median(run['memory'][key] for run in runs) for key in runs[0]['memory']}
+    return {'operations': operations, 'memory': memory}
+
+
+def compare(results, baseline, tolerance, query_tolerance, check_latency=False):
+    """Temel ölçümle karşılaştır; kötüleşen ölçümlerin listesini döndür
+
+    Gecikme ve işlem hızı her zaman raporlanır, ancak yalnızca check_latency
+    verildiğinde kötüleşme sayılır.
+    """
+    regressions = []
+    print(f"\ntemel: {baseline['meta'].get('commit')}  ->  şimdiki: {results['meta'].get('commit')}")
+    differing = [f"{key}={baseline['meta'].get(key)}→{results['meta'].get(key)}" for key in RUN_PARAMETERS
+                 if key in baseline['meta'] and baseline['meta'][key] != results['meta'].get(key)]
+    if differing:
+        print(f"uyarı: parametreler temel ölçümden farklı ({', '.join(differing)}); "
+              f"sonuçlar doğrudan karşılaştırılamayabilir")
+    print(f"{'işlem':<16} {'p95 ms':>20} {'işlem/s':>22} {'sorgu/işlem':>16}")
+    for name, op in results['operations'].items():
+        base = baseline['operations'].get(name)
+        if base is None:
+            continue
+        p95_change = (op['p95_ms'] - base['p95_ms']) / base['p95_ms'] * 100 if base['p95_ms'] else 0
+        rate_change = (op['ops_per_sec'] - base['ops_per_sec']) / base['ops_per_sec'] * 100 \
+            if base['ops_per_sec'] else 0
+        marks = []
+        if check_latency and p95_change > tolerance:
+            marks.append('p95')
+        if check_latency and rate_change < -tolerance:
+            marks.append('işlem/s')
+        if op['queries_per_op'] > base['queries_per_op'] + query_tolerance:
+            marks.append('sorgu')
+        regressions.extend(f'{name}: {mark}' for mark in marks)
+        print(f"{name:<16} {base['p95_ms']:>8.2f} → {op['p95_ms']:<8.2f}{p95_change:>+5.0f}% "
+              f"{base['ops_per_sec']:>8.1f} → {op['ops_per_sec']:<8.1f}{rate_change:>+5.0f}% "
+              f"{base['queries_per_op']:>6.2f} → {op['queries_per_op']:<6.2f}"
+              f"{'  ← ' + ', '.join(marks) if marks else ''}")
+    return regressions
+
+
+def run_once(args, env):
+    """Yeni bir sunucu süreci başlatıp tek bir yük testi çalıştır"""
+    port = free_port()
+    url = f'http://127.0.0.1:{port}'
+    command = [sys.executable, '-m', 'benchmarks.load_test', '--serve', str(port)]
+    if args.trace_memory:
+        command.append('--trace-memory')
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(url)
+        return LoadTest(url, args.concurrency).run(args.users, args.list_rounds, args.bursts)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=20, help='REST çağrılarında eşzamanlılık')
+    parser.add_argument('--list-rounds', type=int, default=5)
+    parser.add_argument('--bursts', type=int, default=10, help='socket olay turu sayısı')
+    parser.add_argument('--trace-memory', action='store_true', help='sunucuda tracemalloc ile nesne belleğini ölç')
+    parser.add_argument('--save', help='sonuçları bu JSON dosyasına yaz')
+    parser.add_argument('--compare', help='sonuçları bu JSON temel ölçümle karşılaştır')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='çalıştırma sayısı; sonuçlar ölçüm başına medyan alınarak birleştirilir')
+    parser.add_argument('--check-latency', action='store_true',
+                        help='p95 gecikme ve işlem hızı kötüleşmelerinde de çıkış kodu 1 döndür')
+    parser.add_argument('--tolerance', type=float, default=50,
+                        help='--check-latency ile izin verilen kötüleşme yüzdesi')
+    parser.add_argument('--query-tolerance', type=float, default=0.1,
+                        help='işlem başına sorgu sayısında izin verilen artış (mutlak)')
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.trace_memory)
+        return 0
+
+    runs = []
+    for _ in range(max(1, args.repeat)):
+        env = dict(os.environ)
+        env.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'load_test.db')}")
+        runs.append(run_once(args, env))
+    results = median_results(runs)
+
+    results['meta'] = {
+        'commit': git_commit(),
+        'database': env['DATABASE_URL'].split(':', 1)[0],
+        'users': args.users,
+        'concurrency': args.concurrency,
+        'list_rounds': args.list_rounds,
+        'bursts': args.bursts,
+        'repeat': len(runs),
+        'python': platform.python_version(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+    print_results(results)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance, args.query_tolerance,
+                                  args.check_latency)
+        if regressions:
+            print(f"\nkötüleşme: {'; '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
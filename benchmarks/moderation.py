@@ -0,0 +1,130 @@
+"""Toplu moderasyon: kullanıcı başına uçlar ve tek çağrı karşılaştırması
+
+Her boyut için bekleyen konuşma isteği olan --sizes kadar dinleyici
+oluşturulur. Aynı iş (hepsini onayla, sonra herkesi sustur) önce tek
+kullanıcılık uçlarla, sonra POST /api/rooms/<id>/moderation ile yapılır;
+SQL sorgu sayısı, süre ve odaya yapılan yayın sayısı raporlanır. Toplu
+çağrının sorgu sayısı oda büyüklüğünden bağımsız olmalıdır.
+
+    python -m benchmarks.moderation --sizes 10,100,500
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'moderation.db')}")
+os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'threading')
+os.environ.setdefault('METRICS_SLOW_MS', '60000')
+
+import index
+from index import app
+from models import db, User, Room, RoomMember, SpeakingRequest
+from query_counter import QueryCounter
+
+
+def seed(size, tag):
+    with app.app_context():
+        owner = User(username=f'owner_{tag}', display_name='Owner')
+        db.session.add(owner)
+        db.session.flush()
+        room = Room(name=f'moderation {tag}', owner_id=owner.id, max_participants=size + 1,
+                    current_participants=size + 1)
+        db.session.add(room)
+        db.session.flush()
+        users = [User(username=f'{tag}_{i}', display_name=f'U{i}') for i in range(size)]
+        db.session.add_all(users)
+        db.session.flush()
+        db.session.add(RoomMember(user_id=owner.id, room_id=room.id, can_speak=True, is_moderator=True))
+        db.session.add_all([RoomMember(user_id=u.id, room_id=room.id) for u in users])
+        db.session.add_all([SpeakingRequest(user_id=u.id, room_id=room.id) for u in users])
+        db.session.commit()
+        return owner.id, room.id, [u.id for u in users]
+
+
+class BroadcastCounter:
+    """index.broadcast çağrılarını say"""
+
+    def __init__(self):
+        self.count = 0
+        self._original = index.broadcast
+
+    def __enter__(self):
+        def counting(*args, **kwargs):
+            self.count += 1
+            return self._original(*args, **kwargs)
+        index.broadcast = counting
+        return self
+
+    def __exit__(self, *exc):
+        index.broadcast = self._original
+
+
+def measure(engine, fn):
+    with QueryCounter(engine) as queries, BroadcastCounter() as broadcasts:
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+    return queries.count, broadcasts.count, elapsed
+
+
+def run(size, engine):
+    rows = []
+    owner_id, room_id, user_ids = seed(size, f'single{size}')
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = owner_id
+
+    def single():
+        for user_id in user_ids:
+            assert client.post(f'/api/rooms/{room_id}/approve-speak/{user_id}').status_code == 200
+        for user_id in user_ids:
+            assert client.post(f'/api/rooms/{room_id}/mute/{user_id}').status_code == 200
+
+    rows.append(('tek tek', size) + measure(engine, single))
+
+    owner_id, room_id, user_ids = seed(size, f'bulk{size}')
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = owner_id
+
+    def bulk():
+        response = client.post(f'/api/rooms/{room_id}/moderation', json={'action': 'approve'})
+        assert response.get_json()['count'] == size, response.get_json()
+        response = client.post(f'/api/rooms/{room_id}/moderation', json={'action': 'mute', 'filter': 'speakers'})
+        assert response.get_json()['count'] == size, response.get_json()
+
+    rows.append(('toplu', size) + measure(engine, bulk))
+    with app.app_context():
+        pending = SpeakingRequest.query.filter_by(room_id=room_id, status='pending').count()
+        muted = RoomMember.query.filter_by(room_id=room_id, is_muted=True, can_speak=True).count()
+    return rows, pending == 0 and muted == size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10,100,500')
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        engine = db.engine
+
+    rows = []
+    failed = False
+    for size in [int(size) for size in args.sizes.split(',')]:
+        size_rows, ok = run(size, engine)
+        rows.extend(size_rows)
+        failed = failed or not ok
+
+    print(f"{'yöntem':<8} {'kullanıcı':>9} {'sorgu':>7} {'yayın':>7} {'süre ms':>9}")
+    for method, size, queries, broadcasts, elapsed in rows:
+        print(f'{method:<8} {size:>9} {queries:>7} {broadcasts:>7} {elapsed * 1000:>9.1f}')
+    if failed:
+        print('HATA: toplu işlem tüm kullanıcılara uygulanmadı')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
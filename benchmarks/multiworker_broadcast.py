@@ -0,0 +1,181 @@
+"""Birden fazla worker süreci arasında yayın teslimi yük testi
+
+N ayrı uygulama süreci aynı mesaj kuyruğuna (Redis) bağlanır, istemciler
+worker'lara dağıtılır ve REST üzerinden tetiklenen oda yayınlarının (mute /
+unmute ve room_closed) her istemciye, bağlı olduğu worker'dan bağımsız olarak
+ulaştığı doğrulanır.
+
+    python -m benchmarks.multiworker_broadcast --workers 3 --clients 30 --broadcasts 50
+
+REDIS_URL verilmezse süreç içinde bir fakeredis TCP sunucusu başlatılır.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_fake_redis():
+    import fakeredis
+
+    port = free_port()
+    server = fakeredis.TcpFakeServer(('127.0.0.1', port), server_type='redis')
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'redis://127.0.0.1:{port}/0'
+
+
+def serve(port):
+    """Tek bir worker süreci"""
+    # wsgi.py gibi: Redis mesaj kuyruğu eventlet'te yamalanmış socket ister
+    import eventlet
+    eventlet.monkey_patch()
+
+    from index import app, socketio
+
+    socketio.run(app, host='127.0.0.1', port=port, allow_unsafe_werkzeug=True)
+
+
+def wait_for(url, timeout=30):
+    import requests
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(f'{url}/api/rooms', timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f'{url} başlamadı')
+
+
+class Participant:
+    """HTTP oturumu ve Socket.IO bağlantısı olan sentetik kullanıcı"""
+
+    def __init__(self, name, url):
+        import requests
+        import socketio
+
+        self.url = url
+        self.http = requests.Session()
+        self.user = self.http.post(f'{url}/api/auth/register',
+                                   json={'username': name, 'display_name': name}).json()
+        self.sio = socketio.Client(reconnection=False)
+        self.received = []
+        self.closed = threading.Event()
+        self.sio.on('user_muted', lambda data: self.received.append(time.perf_counter()))
+        self.sio.on('user_unmuted', lambda data: self.received.append(time.perf_counter()))
+        self.sio.on('room_closed', lambda data: self.closed.set())
+
+    def connect(self, room_id):
+        cookie = '; '.join(f'{k}={v}' for k, v in self.http.cookies.items())
+        joined = threading.Event()
+        self.sio.on('member_joined', lambda data: data['member']['user_id'] == self.user['id'] and joined.set())
+        self.sio.connect(self.url, headers={'Cookie': cookie}, transports=['polling'])
+        self.sio.emit('join_room', {'room_id': room_id})
+        if not joined.wait(10):
+            raise RuntimeError(f"{self.user['username']} odaya socket ile katılamadı")
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run(args):
+    redis_url = os.environ.get('REDIS_URL') or start_fake_redis()
+    db_path = os.path.join(tempfile.mkdtemp(), 'multiworker.db')
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{db_path}', SOCKETIO_MESSAGE_QUEUE=redis_url)
+    os.environ.update(env)
+
+    from index import app
+    from models import db
+    with app.app_context():
+        db.create_all()
+
+    ports = [free_port() for _ in range(args.workers)]
+    workers = [
+        subprocess.Popen([sys.executable, '-m', 'benchmarks.multiworker_broadcast', '--serve', str(port)],
+                         env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for port in ports
+    ]
+    urls = [f'http://127.0.0.1:{port}' for port in ports]
+    try:
+        for url in urls:
+            wait_for(url)
+
+        owner = Participant('owner', urls[0])
+        room = owner.http.post(f'{urls[0]}/api/rooms',
+                               json={'name': 'Load test', 'max_participants': args.clients + 1}).json()
+        owner.connect(room['id'])
+
+        clients = []
+        for i in range(args.clients):
+            # İstemciler worker'lara sırayla dağıtılır (nginx sticky session karşılığı)
+            client = Participant(f'listener{i}', urls[i % len(urls)])
+            client.http.post(f"{client.url}/api/rooms/{room['id']}/join", json={})
+            client.connect(room['id'])
+            clients.append(client)
+
+        target = clients[0].user['id']
+        sent = []
+        for i in range(args.broadcasts):
+            action = 'mute' if i % 2 == 0 else 'unmute'
+            sent.append(time.perf_counter())
+            owner.http.post(f"{urls[0]}/api/rooms/{room['id']}/{action}/{target}")
+
+        deadline = time.time() + args.timeout
+        while time.time() < deadline and any(len(c.received) < args.broadcasts for c in clients):
+            time.sleep(0.05)
+
+        owner.http.post(f"{urls[0]}/api/rooms/{room['id']}/close")
+        closed = sum(c.closed.wait(args.timeout) for c in clients)
+
+        latencies = [(received - sent[i]) * 1000
+                     for c in clients for i, received in enumerate(c.received[:args.broadcasts])]
+        delivered = sum(min(len(c.received), args.broadcasts) for c in clients)
+        expected = args.broadcasts * len(clients)
+
+        print(f'worker: {args.workers}  istemci: {len(clients)}  yayın: {args.broadcasts}')
+        print(f'teslim: {delivered}/{expected}  room_closed: {closed}/{len(clients)}')
+        if latencies:
+            print(f'gecikme ms  p50={statistics.median(latencies):.1f}  '
+                  f'p95={percentile(latencies, 95):.1f}  p99={percentile(latencies, 99):.1f}')
+
+        for client in [owner] + clients:
+            client.sio.disconnect()
+        return 0 if delivered == expected and closed == len(clients) else 1
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--clients', type=int, default=30)
+    parser.add_argument('--broadcasts', type=int, default=50)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve)
+        return 0
+    return run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+"""Uç nokta sorgu bütçesi kontrolü
+
+Farklı büyüklükte odalar oluşturur ve listeleme uçlarının oda büyüklüğünden
+bağımsız olarak sabit sayıda sorgu çalıştırdığını doğrular.
+
+    python -m benchmarks.query_budget
+"""
+import os
+import sys
+import tempfile
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'query_budget.db')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{DB_PATH}')
+
+from index import app, invalidate_room_directory, room_search
+from models import db, User, Room, RoomMember, SpeakingRequest
+from query_counter import QueryCounter
+
+ROOM_SIZES = (1, 10, 50)
+
+# Uç nokta -> izin verilen en fazla sorgu sayısı
+BUDGETS = {
+    '/api/rooms': 1,
+    '/api/rooms/search?q=room': 1,
+    '/api/rooms/{room_id}': 1,
+    '/api/rooms/{room_id}/members': 1,
+    '/api/rooms/{room_id}/roster': 1,
+    '/api/rooms/{room_id}/speaking-requests': 3,
+}
+
+
+def seed_room(size):
+    """size üyeli, her dinleyicisinin bekleyen isteği olan bir oda oluştur"""
+    owner = User(username=f'owner{size}', display_name=f'Owner {size}')
+    db.session.add(owner)
+    db.session.flush()
+    room = Room(name=f'Room {size}', owner_id=owner.id, max_participants=size + 1)
+    db.session.add(room)
+    db.session.flush()
+    db.session.add(RoomMember(user_id=owner.id, room_id=room.id, can_speak=True, is_moderator=True))
+    for i in range(size - 1):
+        user = User(username=f'u{size}_{i}', display_name=f'User {i}', bio='x' * 200)
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(RoomMember(user_id=user.id, room_id=room.id))
+        db.session.add(SpeakingRequest(user_id=user.id, room_id=room.id))
+    room.current_participants = size
+    db.session.commit()
+    return owner.id, room.id
+
+
+def main():
+    with app.app_context():
+        db.create_all()
+        rooms = {size: seed_room(size) for size in ROOM_SIZES}
+        # Arama indeksi açılışta bir kez yüklenir; bütçe sorgu başına ölçülür
+        room_search.rebuild()
+
+        failures = []
+        for template, budget in BUDGETS.items():
+            counts = []
+            for size in ROOM_SIZES:
+                owner_id, room_id = rooms[size]
+                client = app.test_client()
+                with client.session_transaction() as sess:
+                    sess['user_id'] = owner_id
+                # Her istek kendi oturumuyla ve önbelleksiz yolla başlasın
+                db.session.remove()
+                invalidate_room_directory()
+                with QueryCounter() as counter:
+                    response = client.get(template.format(room_id=room_id))
+                assert response.status_code == 200, (template, response.status_code)
+                counts.append(counter.count)
+
+            ok = max(counts) <= budget and len(set(counts)) == 1
+            print(f"{'OK  ' if ok else 'FAIL'} {template:45} sorgular={counts} bütçe={budget}")
+            if not ok:
+                failures.append(template)
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Okuma replikası yönlendirmesi: iki SQLite bind ile yerel doğrulama
+
+Birincil ve replika iki ayrı SQLite dosyasıdır; "replikasyon" birincil
+dosyanın replikaya kopyalanmasıyla (sqlite3 backup) elle yapılır. Her
+senaryoda salt okunur bir ucun kaç sorguyu hangi veritabanına gönderdiği
+sayılır:
+
+  * anonim okuma replikaya gider,
+  * odaya katılan kullanıcı kendi okumasında birincile gider (kendi yazdığını
+    okuma), başkası henüz kopyalanmamış replikadan okur,
+  * pencere dolunca kullanıcı da replikaya döner,
+  * gecikmesi REPLICA_MAX_LAG'ı aşan replika atlanır,
+  * replika bozulunca istek birincilde tekrarlanır.
+
+    python -m benchmarks.replicas
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp()
+PRIMARY = os.path.join(DB_DIR, 'primary.db')
+REPLICA = os.path.join(DB_DIR, 'replica.db')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{PRIMARY}')
+os.environ.setdefault('DATABASE_REPLICA_URLS', f'sqlite:///{REPLICA}')
+os.environ.setdefault('REPLICA_STICKY_SECONDS', '0.5')
+os.environ.setdefault('REPLICA_MAX_LAG', '1')
+os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'threading')
+os.environ.setdefault('METRICS_SLOW_MS', '60000')
+
+from index import app, replicas
+from models import db
+from query_counter import QueryCounter
+
+
+def replicate():
+    """Birincil dosyayı replikaya kopyala ve gecikmeyi ölç"""
+    # Önce birincile güncel heartbeat yazılır, kopyadan sonraki ölçüm onu replikada okur
+    with app.app_context():
+        replicas.heartbeat()
+        with sqlite3.connect(PRIMARY) as source, sqlite3.connect(REPLICA) as target:
+            source.backup(target)
+        replicas.heartbeat()
+
+
+def client_for(username):
+    client = app.test_client()
+    response = client.post('/api/auth/register', json={'username': username, 'display_name': username})
+    return client, response.get_json()['id']
+
+
+def measure(client, url, primary, replica):
+    with QueryCounter(primary) as on_primary, QueryCounter(replica) as on_replica:
+        response = client.get(url)
+    assert response.status_code == 200, (url, response.status_code)
+    return on_primary.count, on_replica.count, response.get_json()
+
+
+def main():
+    with app.app_context():
+        db.create_all()
+        primary, replica = db.engine, db.engines['replica_0']
+
+    owner, _ = client_for('replica_owner')
+    room_id = owner.post('/api/rooms', json={'name': 'replica'}).get_json()['id']
+    guest, guest_id = client_for('replica_guest')
+    anonymous = app.test_client()
+    time.sleep(float(os.environ['REPLICA_STICKY_SECONDS']))
+    replicate()
+    members_url = f'/api/rooms/{room_id}/members'
+
+    def member_ids(payload):
+        return {member['user_id'] for member in payload}
+
+    rows = []
+    p, r, payload = measure(anonymous, members_url, primary, replica)
+    rows.append(('anonim okuma', p, r, r > 0 and p == 0))
+
+    guest.post(f'/api/rooms/{room_id}/join', json={})
+    p, r, payload = measure(guest, members_url, primary, replica)
+    rows.append(('katılan kendi okuması', p, r, p > 0 and r == 0 and guest_id in member_ids(payload)))
+    p, r, payload = measure(anonymous, members_url, primary, replica)
+    rows.append(('başkası (kopyasız)', p, r, r > 0 and guest_id not in member_ids(payload)))
+
+    time.sleep(float(os.environ['REPLICA_STICKY_SECONDS']))
+    replicate()
+    p, r, payload = measure(guest, members_url, primary, replica)
+    rows.append(('pencere sonrası', p, r, r > 0 and p == 0 and guest_id in member_ids(payload)))
+
+    time.sleep(float(os.environ['REPLICA_MAX_LAG']) + 0.2)
+    with app.app_context():
+        replicas.heartbeat()
+    p, r, payload = measure(anonymous, members_url, primary, replica)
+    rows.append(('gecikme sınırı aşıldı', p, r, p > 0 and r == 0))
+
+    replicate()
+    replica.dispose()
+    os.remove(REPLICA)
+    p, r, payload = measure(anonymous, members_url, primary, replica)
+    rows.append(('replika bozuk', p, r, p > 0 and guest_id in member_ids(payload)))
+    p, r, payload = measure(anonymous, members_url, primary, replica)
+    rows.append(('devre dışıyken', p, r, p > 0 and r == 0))
+
+    print(f"{'senaryo':<24} {'birincil':>8} {'replika':>8}  sonuç")
+    for name, on_primary, on_replica, ok in rows:
+        print(f"{name:<24} {on_primary:>8} {on_replica:>8}  {'OK' if ok else 'HATA'}")
+    with app.app_context():
+        print('replikalar:', replicas.snapshot())
+    return 0 if all(ok for *_, ok in rows) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
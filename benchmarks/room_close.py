@@ -0,0 +1,98 @@
+"""Oda kapatma: satır satır silme ve toplu sorgu karşılaştırması
+
+Farklı büyüklükte, her dinleyicisinin bekleyen konuşma isteği olan odalar
+oluşturulur ve POST /api/rooms/<id>/close uç noktasının çalıştırdığı sorgu
+sayısı ve süresi, eski satır satır silme yöntemiyle karşılaştırılır.
+
+    python -m benchmarks.room_close --sizes 50,500,2000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), 'room_close.db')
+os.environ.setdefault('DATABASE_URL', f'sqlite:///{DB_PATH}')
+
+from index import app
+from models import db, User, Room, RoomMember, SpeakingRequest
+from query_counter import QueryCounter
+
+
+def seed_room(size, tag):
+    owner = User(username=f'owner_{tag}', display_name='Owner')
+    db.session.add(owner)
+    db.session.flush()
+    room = Room(name=f'Room {tag}', owner_id=owner.id, max_participants=size + 1)
+    db.session.add(room)
+    db.session.flush()
+    users = [User(username=f'u_{tag}_{i}', display_name=f'User {i}') for i in range(size - 1)]
+    db.session.add_all(users)
+    db.session.flush()
+    db.session.add(RoomMember(user_id=owner.id, room_id=room.id, can_speak=True, is_moderator=True))
+    db.session.add_all([RoomMember(user_id=u.id, room_id=room.id) for u in users])
+    db.session.add_all([SpeakingRequest(user_id=u.id, room_id=room.id) for u in users])
+    room.current_participants = size
+    db.session.commit()
+    return owner.id, room.id
+
+
+def close_row_by_row(room_id):
+    """Önceki yöntem: üyeleri yükleyip tek tek sil"""
+    room = db.session.get(Room, room_id)
+    room.is_active = False
+    for member in RoomMember.query.filter_by(room_id=room_id).all():
+        db.session.delete(member)
+    room.current_participants = 0
+    db.session.commit()
+
+
+def close_via_endpoint(client, room_id):
+    response = client.post(f'/api/rooms/{room_id}/close')
+    assert response.status_code == 200, response.get_json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='50,500,2000')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    rows = []
+    with app.app_context():
+        db.create_all()
+        engine = db.engine
+    for size in sizes:
+        with app.app_context():
+            _, room_id = seed_room(size, f'old{size}')
+            db.session.expunge_all()
+            with QueryCounter(engine) as counter:
+                started = time.perf_counter()
+                close_row_by_row(room_id)
+                elapsed = time.perf_counter() - started
+        rows.append(('satır satır', size, counter.count, elapsed))
+
+        with app.app_context():
+            owner_id, room_id = seed_room(size, f'new{size}')
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = owner_id
+        with QueryCounter(engine) as counter:
+            started = time.perf_counter()
+            close_via_endpoint(client, room_id)
+            elapsed = time.perf_counter() - started
+        rows.append(('toplu', size, counter.count, elapsed))
+        with app.app_context():
+            pending = SpeakingRequest.query.filter_by(room_id=room_id, status='pending').count()
+        if pending:
+            print(f'UYARI: {size} üyeli odada {pending} istek hâlâ bekliyor')
+
+    print(f"{'yöntem':<12} {'üye':>6} {'sorgu':>7} {'süre ms':>9}")
+    for method, size, queries, elapsed in rows:
+        print(f'{method:<12} {size:>6} {queries:>7} {elapsed * 1000:>9.1f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
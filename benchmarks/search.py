@@ -0,0 +1,63 @@
+"""Oda araması: indeks büyüklüğüne göre sorgu süresi
+
+--sizes kadar sentetik oda search.RoomSearchIndex'e eklenir ve aynı sorgu
+kümesi (tam kelime, kısa önek, çok terimli, eşleşmeyen) her boyutta
+çalıştırılır. Aday sınırı (SEARCH_MAX_CANDIDATES) aşılan sorguların
+eşleşme sayısı yaklaşıktır ve ~ ile gösterilir.
+
+    python -m benchmarks.search --sizes 1000,10000,50000
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from search import RoomSearchIndex
+
+WORDS = ('müzik', 'sohbet', 'kitap', 'yazılım', 'python', 'caz', 'futbol', 'sinema', 'oyun',
+         'felsefe', 'tarih', 'öğrenci', 'girişim', 'podcast', 'akşam', 'sabah', 'dil', 'gezi')
+NAMES = ('Ayşe', 'Mehmet', 'İlker', 'Zeynep', 'Can', 'Elif', 'Murat', 'Deniz')
+QUERIES = ('müzik', 'm', 'ogr', 'python sohbet', 'ilker caz', 'bulunamaz')
+
+
+def build(size, seed=1):
+    rng = random.Random(seed)
+    index = RoomSearchIndex()
+    now = datetime.utcnow()
+    started = time.perf_counter()
+    for i in range(size):
+        name = ' '.join(rng.sample(WORDS, 2)) + f' {i}'
+        description = ' '.join(rng.sample(WORDS, 4))
+        index.add(f'room-{i}', name, description, f'{rng.choice(NAMES)} {i % 100}', now - timedelta(seconds=i))
+    return index, time.perf_counter() - started
+
+
+def measure(index, query, limit, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        page, total, approximate = index.search(query, limit)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return f"{'~' if approximate else ''}{total}", timings[len(timings) // 2], timings[int(len(timings) * 0.99) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000,50000')
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'oda':>7} {'yükleme ms':>11} {'sorgu':<14} {'eşleşme':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for size in [int(size) for size in args.sizes.split(',')]:
+        index, build_time = build(size)
+        for query in QUERIES:
+            total, p50, p99 = measure(index, query, args.limit, args.repeat)
+            print(f'{size:>7} {build_time * 1000:>11.0f} {query:<14} {total:>8} {p50 * 1000:>8.2f} {p99 * 1000:>8.2f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
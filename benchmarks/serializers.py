@@ -0,0 +1,154 @@
+"""Roster ve oda listesi yüklerinin dönüştürme ve kodlama maliyeti
+
+İki ölçüm yapılır:
+
+  * dönüştürme: sorgu satırlarını sözlüğe çevirmek; kolonları isimle okuyan
+    eski yazım ile serializers.compile_row ile derlenmiş dönüştürücü,
+  * kodlama: aynı yükün REST gövdesi (stdlib json, orjson) ve Socket.IO
+    paketi (varsayılan JSON, orjson, MessagePack) olarak süresi ve boyutu.
+
+msgpack kurulu değilse MessagePack satırları atlanır.
+
+    python -m benchmarks.serializers --members 500 --rooms 50
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import timeit
+
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'serializers.db')}")
+os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'threading')
+os.environ.setdefault('METRICS_SLOW_MS', '60000')
+
+from socketio import packet
+
+import serializers
+from index import app
+from models import db, User, Room, RoomMember
+from wire import OrjsonModule
+
+
+def seed(members, rooms):
+    with app.app_context():
+        users = [User(username=f'wire_{i}', display_name=f'Kullanıcı {i}',
+                      avatar_url=f'https://example.com/avatar/{i}.png') for i in range(max(members, rooms))]
+        db.session.add_all(users)
+        db.session.flush()
+        room_objs = [Room(name=f'Oda {i}', description='Akşam sohbeti', owner_id=users[i].id,
+                          max_participants=members + 1, current_participants=members if i == 0 else 1)
+                     for i in range(rooms)]
+        db.session.add_all(room_objs)
+        db.session.flush()
+        db.session.add_all([RoomMember(user_id=u.id, room_id=room_objs[0].id) for u in users[:members]])
+        db.session.commit()
+        return room_objs[0].id
+
+
+def by_name_member(row):
+    """Derlemeden önceki yazım: her kolon isimle okunur, iç sözlük ayrıca kurulur"""
+    return {
+        'id': row.id,
+        'joined_at': serializers._iso(row.joined_at),
+        'is_speaking': row.is_speaking,
+        'is_muted': row.is_muted,
+        'can_speak': row.can_speak,
+        'is_moderator': row.is_moderator,
+        'user_id': row.user_id,
+        'room_id': row.room_id,
+        'user': serializers._user_summary(row.user_id, row.username, row.display_name, row.avatar_url)
+    }
+
+
+def by_name_room(row):
+    return {
+        'id': row.id,
+        'name': row.name,
+        'description': row.description,
+        'is_public': row.is_public,
+        'max_participants': row.max_participants,
+        'current_participants': row.current_participants,
+        'is_active': row.is_active,
+        'created_at': serializers._iso(row.created_at),
+        'owner_id': row.owner_id,
+        'owner_name': row.owner_name
+    }
+
+
+def fetch_rows(room_id, rooms):
+    with app.app_context():
+        member_rows = db.session.execute(
+            db.select(*serializers.MEMBER_COLUMNS)
+            .join(User, RoomMember.user_id == User.id)
+            .where(RoomMember.room_id == room_id)
+        ).all()
+        room_rows = db.session.execute(serializers.room_query().limit(rooms)).all()
+    return member_rows, room_rows
+
+
+def per_call(fn, number):
+    """Çağrı başına mikro saniye (en iyi 3 tekrar)"""
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6
+
+
+class OrjsonPacket(packet.Packet):
+    json = OrjsonModule()
+
+
+def encoders():
+    orjson_module = OrjsonModule()
+    rows = [
+        ('REST json', lambda data: json.dumps(data, separators=(',', ':')).encode()),
+        ('REST orjson', lambda data: orjson_module.dumps(data).encode()),
+        ('Socket.IO json', lambda data: packet.Packet(packet.EVENT, ['roster', data]).encode().encode()),
+        ('Socket.IO orjson', lambda data: OrjsonPacket(packet.EVENT, ['roster', data]).encode().encode()),
+    ]
+    try:
+        from socketio.msgpack_packet import MsgPackPacket
+    except ImportError:
+        print('msgpack kurulu değil: MessagePack satırları atlandı')
+    else:
+        rows.append(('Socket.IO msgpack', lambda data: MsgPackPacket(packet.EVENT, ['roster', data]).encode()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--members', type=int, default=500)
+    parser.add_argument('--rooms', type=int, default=50)
+    parser.add_argument('--number', type=int, default=200, help='ölçüm başına tekrar')
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+    room_id = seed(args.members, args.rooms)
+    member_rows, room_rows = fetch_rows(room_id, args.rooms)
+
+    payloads = {
+        'roster': [serializers.member_row_to_dict(row) for row in member_rows],
+        'oda listesi': [serializers.room_row_to_dict(row) for row in room_rows],
+    }
+    failed = (payloads['roster'] != [by_name_member(row) for row in member_rows]
+              or payloads['oda listesi'] != [by_name_room(row) for row in room_rows])
+
+    print(f"{'yük':<12} {'dönüştürme':<10} {'µs/yük':>10}")
+    for name, rows, old in (('roster', member_rows, by_name_member), ('oda listesi', room_rows, by_name_room)):
+        compiled = serializers.member_row_to_dict if old is by_name_member else serializers.room_row_to_dict
+        for method, fn in (('isimle', old), ('derlenmiş', compiled)):
+            print(f'{name:<12} {method:<10} {per_call(lambda: [fn(row) for row in rows], args.number):>10.1f}')
+
+    print()
+    methods = encoders()
+    print(f"{'yük':<12} {'kodlayıcı':<18} {'bayt':>8} {'µs/yük':>10}")
+    for name, data in payloads.items():
+        for method, encode in methods:
+            size = len(encode(data))
+            print(f'{name:<12} {method:<18} {size:>8} {per_call(lambda: encode(data), args.number):>10.1f}')
+    if failed:
+        print('HATA: derlenmiş dönüştürücü eski yazımla aynı sözlüğü üretmiyor')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Konuşma durumu dalgalanması (VAD flapping) altında oda yayınları
+
+--speakers konuşmacı --hz sıklıkla start_speaking / stop_speaking gönderir;
+bir dinleyici odaya gelen olayları sayar. Raporlanan:
+
+  * gönderilen ve hız sınırına takılan olaylar,
+  * dinleyiciye gelen speaking_state yayınları (olay başına değil, oda
+    başına SPEAKING_COALESCE_MS penceresinde bir tane),
+  * sonunda dinleyicinin gördüğü durumun presence deposuyla aynı olup olmadığı.
+
+    python -m benchmarks.speaking_flap --speakers 5 --hz 20 --seconds 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'speaking_flap.db')}")
+os.environ.setdefault('SOCKETIO_ASYNC_MODE', 'threading')
+os.environ.setdefault('METRICS_SLOW_MS', '60000')
+
+from index import app, socketio, presence, rate_limited_events, speaking_coalescer
+from models import db
+
+
+def client_for(username):
+    client = app.test_client()
+    response = client.post('/api/auth/register', json={'username': username, 'display_name': username})
+    return client, response.get_json()['id']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--speakers', type=int, default=5)
+    parser.add_argument('--hz', type=float, default=20, help='konuşmacı başına saniyedeki olay')
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+
+    owner, owner_id = client_for('flap_owner')
+    room_id = owner.post('/api/rooms', json={'name': 'flap', 'max_participants': args.speakers + 2}).get_json()['id']
+    listener = socketio.test_client(app, flask_test_client=owner)
+    listener.emit('join_room', {'room_id': room_id})
+
+    speakers = []
+    for i in range(args.speakers):
+        client, user_id = client_for(f'flap_{i}')
+        client.post(f'/api/rooms/{room_id}/join', json={})
+        client.post(f'/api/rooms/{room_id}/request-speak')
+        owner.post(f'/api/rooms/{room_id}/approve-speak/{user_id}')
+        sock = socketio.test_client(app, flask_test_client=client)
+        sock.emit('join_room', {'room_id': room_id})
+        speakers.append((user_id, sock))
+    listener.get_received()
+    limited_before = sum(rate_limited_events._values.values())
+
+    sent = [0]
+    lock = threading.Lock()
+
+    def flap(sock):
+        interval = 1 / args.hz
+        deadline = time.monotonic() + args.seconds
+        speaking = False
+        while time.monotonic() < deadline:
+            speaking = not speaking
+            sock.emit('start_speaking' if speaking else 'stop_speaking', {'room_id': room_id})
+            with lock:
+                sent[0] += 1
+            time.sleep(interval)
+
+    threads = [threading.Thread(target=flap, args=(sock,)) for _, sock in speakers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    time.sleep(speaking_coalescer.window * 3)
+
+    received = listener.get_received()
+    batches = [event['args'][0] for event in received if event['name'] == 'speaking_state']
+    seen = {}
+    for batch in batches:
+        for user_id, changes in batch['states'].items():
+            seen.setdefault(user_id, {}).update(changes)
+    with app.app_context():
+        consistent = all(
+            seen.get(user_id, {}).get('is_speaking', False) == presence.get(room_id, user_id)['is_speaking']
+            for user_id, _ in speakers
+        )
+    limited = sum(rate_limited_events._values.values()) - limited_before
+
+    print(f"{'gönderilen':>10} {'sınırlanan':>10} {'speaking_state':>15} {'olay/yayın':>11} {'diğer':>6}  sonuç")
+    others = len(received) - len(batches)
+    ratio = sent[0] / len(batches) if batches else float('inf')
+    print(f"{sent[0]:>10} {limited:>10} {len(batches):>15} {ratio:>11.1f} {others:>6}  "
+          f"{'OK' if consistent else 'HATA: dinleyicideki durum presence ile farklı'}")
+    return 0 if consistent else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
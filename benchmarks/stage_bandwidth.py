@@ -0,0 +1,268 @@
+"""Mesh ve SFU modlarında istemci başına bant genişliği ve CPU ölçümü
+
+Başsız (headless) aiortc istemcileri gerçek WebRTC bağlantıları kurar:
+
+  * mesh: her istemci çifti doğrudan bağlanır; konuşmacılar ton, diğerleri
+    (susturulmuş dinleyiciler gibi) sessizlik gönderir.
+  * sfu:  konuşmacılar sfu.py servisine tek bağlantıyla yayın yapar, herkes
+    tek bağlantıyla abone olur. Servis ayrı bir süreçte çalışır, CPU'su ayrıca
+    raporlanır.
+
+Ölçüm süresi boyunca istemci başına gönderilen/alınan baytlar ve
+istemci sürecinin CPU süresi (istemci sayısına bölünerek) raporlanır.
+
+    python -m benchmarks.stage_bandwidth --sizes 4,8,16 --speakers 2 --duration 5
+"""
+import argparse
+import asyncio
+import fractions
+import math
+import os
+import socket
+import struct
+import subprocess
+import sys
+import time
+
+import aiohttp
+import av
+from aiortc import MediaStreamTrack, RTCConfiguration, RTCPeerConnection
+from aiortc.contrib.media import MediaRelay
+
+SAMPLE_RATE = 48000
+FRAME_SAMPLES = 960  # 20 ms
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ToneTrack(MediaStreamTrack):
+    """Gerçek zamanlı 20 ms'lik çerçeveler üreten sinüs (veya sessizlik) kaynağı"""
+
+    kind = 'audio'
+
+    def __init__(self, frequency=None):
+        super().__init__()
+        amplitude = 8000 if frequency else 0
+        frequency = frequency or 440
+        period = [int(amplitude * math.sin(2 * math.pi * frequency * i / SAMPLE_RATE))
+                  for i in range(SAMPLE_RATE)]
+        self._pcm = struct.pack(f'<{SAMPLE_RATE}h', *period) * 2
+        self._timestamp = 0
+        self._start = None
+
+    async def recv(self):
+        if self._start is None:
+            self._start = time.time()
+        else:
+            self._timestamp += FRAME_SAMPLES
+            wait = self._start + self._timestamp / SAMPLE_RATE - time.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+        offset = (self._timestamp % SAMPLE_RATE) * 2
+        frame = av.AudioFrame(format='s16', layout='mono', samples=FRAME_SAMPLES)
+        frame.planes[0].update(self._pcm[offset:offset + FRAME_SAMPLES * 2])
+        frame.pts = self._timestamp
+        frame.sample_rate = SAMPLE_RATE
+        frame.time_base = fractions.Fraction(1, SAMPLE_RATE)
+        return frame
+
+
+async def _drain(track):
+    # Tarayıcıdaki <audio> oynatımının karşılığı: gelen çerçeveleri tüket
+    try:
+        while True:
+            await track.recv()
+    except Exception:
+        pass
+
+
+class BenchClient:
+    """Bir odadaki sentetik katılımcı ve bağlantıları"""
+
+    def __init__(self, user_id, speaker):
+        self.user_id = user_id
+        self.speaker = speaker
+        self.source = ToneTrack(220 + 40 * int(user_id[1:]) if speaker else None)
+        self.relay = MediaRelay()
+        self.pcs = []
+        self.sinks = []
+
+    def peer_connection(self):
+        pc = RTCPeerConnection(RTCConfiguration(iceServers=[]))
+        pc.on('track', lambda track: self.sinks.append(asyncio.ensure_future(_drain(track))))
+        self.pcs.append(pc)
+        return pc
+
+    def local_track(self):
+        # Her bağlantı kaynağın kendi kopyasını kodlar (tarayıcıdaki mesh ile aynı)
+        return self.relay.subscribe(self.source)
+
+    async def byte_counts(self):
+        sent = received = 0
+        for pc in self.pcs:
+            # Taşıma katmanı sayaçları SRTP/RTCP ek yükünü de içerir (kablodaki bant genişliği)
+            for stats in (await pc.getStats()).values():
+                if stats.type == 'transport':
+                    sent += stats.bytesSent
+                    received += stats.bytesReceived
+        return sent, received
+
+    async def close(self):
+        for sink in self.sinks:
+            sink.cancel()
+        await asyncio.gather(*(pc.close() for pc in self.pcs))
+
+
+def _offer_payload(pc):
+    return {'sdp': pc.localDescription.sdp, 'type': pc.localDescription.type}
+
+
+async def connect_mesh(clients):
+    """Her çift için doğrudan bağlantı; teklifi listede önce gelen gönderir"""
+    async def pair(a, b):
+        pa, pb = a.peer_connection(), b.peer_connection()
+        pa.addTrack(a.local_track())
+        pb.addTrack(b.local_track())
+        await pa.setLocalDescription(await pa.createOffer())
+        await pb.setRemoteDescription(pa.localDescription)
+        await pb.setLocalDescription(await pb.createAnswer())
+        await pa.setRemoteDescription(pb.localDescription)
+
+    await asyncio.gather(*(pair(a, b) for i, a in enumerate(clients) for b in clients[i + 1:]))
+
+
+async def connect_sfu(clients, sfu_url, room_id='bench'):
+    async with aiohttp.ClientSession() as http:
+        async def negotiate(client, pc, action):
+            await pc.setLocalDescription(await pc.createOffer())
+            async with http.post(f'{sfu_url}/rooms/{room_id}/{action}',
+                                 json={'user_id': client.user_id, 'offer': _offer_payload(pc)}) as response:
+                result = await response.json()
+            if response.status != 200:
+                raise RuntimeError(f"{action} {client.user_id}: {result.get('error')}")
+            await pc.setRemoteDescription(
+                type(pc.localDescription)(sdp=result['answer']['sdp'], type=result['answer']['type']))
+
+        speakers = [c for c in clients if c.speaker]
+        for client in speakers:
+            pc = client.peer_connection()
+            pc.addTrack(client.local_track())
+            await negotiate(client, pc, 'publish')
+
+        async def subscribe(client):
+            others = [s for s in speakers if s is not client]
+            if not others:
+                return
+            pc = client.peer_connection()
+            for _ in others:
+                pc.addTransceiver('audio', direction='recvonly')
+            await negotiate(client, pc, 'subscribe')
+
+        await asyncio.gather(*(subscribe(c) for c in clients))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def sfu_cpu(sfu_url):
+    async with aiohttp.ClientSession() as http:
+        async with http.get(f'{sfu_url}/stats') as response:
+            return (await response.json())['cpu_seconds']
+
+
+async def wait_for_sfu(sfu_url, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            return await sfu_cpu(sfu_url)
+        except aiohttp.ClientError:
+            await asyncio.sleep(0.2)
+    raise RuntimeError('sfu.py başlamadı')
+
+
+async def wait_connected(clients, timeout=20):
+    deadline = time.time() + timeout
+    pcs = [pc for c in clients for pc in c.pcs]
+    while time.time() < deadline:
+        if all(pc.connectionState == 'connected' for pc in pcs):
+            return
+        await asyncio.sleep(0.1)
+    raise RuntimeError('bağlantılar kurulamadı')
+
+
+async def measure(mode, size, speakers, duration, sfu_url=None):
+    clients = [BenchClient(f'u{i}', i < speakers) for i in range(size)]
+    if mode == 'mesh':
+        await connect_mesh(clients)
+    else:
+        await connect_sfu(clients, sfu_url, room_id=f'bench-{size}')
+    await wait_connected(clients)
+    await asyncio.sleep(1)  # ısınma
+
+    before = [await c.byte_counts() for c in clients]
+    cpu_before = time.process_time()
+    sfu_before = await sfu_cpu(sfu_url) if sfu_url else 0
+    await asyncio.sleep(duration)
+    cpu = time.process_time() - cpu_before
+    sfu_cpu_seconds = (await sfu_cpu(sfu_url) - sfu_before) if sfu_url else 0
+    after = [await c.byte_counts() for c in clients]
+
+    up = [(a[0] - b[0]) * 8 / 1000 / duration for a, b in zip(after, before)]
+    down = [(a[1] - b[1]) * 8 / 1000 / duration for a, b in zip(after, before)]
+    result = {
+        'mode': mode,
+        'size': size,
+        'speakers': speakers,
+        'pcs_per_client': sum(len(c.pcs) for c in clients) / size,
+        'up_kbps_avg': sum(up) / size,
+        'up_kbps_max': max(up),
+        'down_kbps_avg': sum(down) / size,
+        'client_cpu_pct': cpu / duration * 100 / size,
+        'sfu_cpu_pct': sfu_cpu_seconds / duration * 100
+    }
+    await asyncio.gather(*(c.close() for c in clients))
+    return result
+
+
+async def run(args):
+    sizes = [int(size) for size in args.sizes.split(',')]
+    port = free_port()
+    sfu_url = f'http://127.0.0.1:{port}'
+    sfu = subprocess.Popen([sys.executable, os.path.join(ROOT, 'sfu.py'), '--port', str(port), '--stun', ''],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        await wait_for_sfu(sfu_url)
+        results = []
+        for size in sizes:
+            speakers = min(args.speakers, size)
+            if size <= args.max_mesh:
+                results.append(await measure('mesh', size, speakers, args.duration))
+            results.append(await measure('sfu', size, speakers, args.duration, sfu_url))
+    finally:
+        sfu.terminate()
+        sfu.wait()
+
+    print(f"{'mod':<5} {'N':>4} {'kon.':>4} {'pc/ist.':>8} {'up kbps ort/maks':>18} "
+          f"{'down kbps':>10} {'cpu%/ist.':>10} {'sfu cpu%':>9}")
+    for r in results:
+        print(f"{r['mode']:<5} {r['size']:>4} {r['speakers']:>4} {r['pcs_per_client']:>8.1f} "
+              f"{r['up_kbps_avg']:>8.1f}/{r['up_kbps_max']:<9.1f} {r['down_kbps_avg']:>10.1f} "
+              f"{r['client_cpu_pct']:>10.2f} {r['sfu_cpu_pct'] if r['mode'] == 'sfu' else 0:>9.1f}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='4,8,16')
+    parser.add_argument('--speakers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--max-mesh', type=int, default=16, help='bu boyuttan büyük odalarda mesh ölçülmez')
+    args = parser.parse_args()
+    return asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Static asset build for Clubhouse Spaces
+Bundles, minifies and content-hashes the CSS/JS listed in assets.BUNDLES,
+precompresses them for nginx gzip_static / brotli_static and writes
+static/dist/manifest.json
+
+    python build_assets.py
+
+rjsmin / rcssmin are used for minification and brotli for .br files when
+installed; otherwise a conservative built-in minifier is used and .br files
+are skipped.
+"""
+
+import gzip
+import json
+import os
+import re
+import sys
+
+from assets import BUNDLES, DIST, MANIFEST, digest
+
+STATIC = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+
+
+def minify_css(text):
+    try:
+        import rcssmin
+        return rcssmin.cssmin(text)
+    except ImportError:
+        pass
+    text = re.sub(r'/\*.*?\*/', '', text, flags=re.S)
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s*([{};,>])\s*', r'\1', text)
+    return text.replace(';}', '}').strip()
+
+
+def minify_js(text):
+    try:
+        import rjsmin
+        return rjsmin.jsmin(text)
+    except ImportError:
+        pass
+    # Keep line breaks (automatic semicolon insertion); drop indentation,
+    # blank lines and comment-only lines
+    lines = (line.strip() for line in text.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+
+def compressors():
+    """(suffix, compress) pairs for the precompressed copies"""
+    result = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    try:
+        import brotli
+    except ImportError:
+        print("ℹ️ brotli not installed, skipping .br files")
+    else:
+        result.append(('.br', lambda data: brotli.compress(data, quality=11)))
+    return result
+
+
+def build_bundle(name, compress_with):
+    """Build one bundle; return (dist filename, source bytes, [minified, gzip, brotli] bytes)"""
+    sources = []
+    for source in BUNDLES[name]:
+        with open(os.path.join(STATIC, source), encoding='utf-8') as f:
+            sources.append(f.read())
+    stem, ext = os.path.splitext(name)
+    if ext == '.js':
+        text = ';\n'.join(minify_js(source) for source in sources)
+    else:
+        text = '\n'.join(minify_css(source) for source in sources)
+    data = text.encode('utf-8')
+
+    filename = f'{DIST}/{stem}.{digest(data)}{ext}'
+    path = os.path.join(STATIC, filename)
+    with open(path, 'wb') as f:
+        f.write(data)
+    sizes = [len(data)]
+    for suffix, compress in compress_with:
+        compressed = compress(data)
+        with open(path + suffix, 'wb') as f:
+            f.write(compressed)
+        sizes.append(len(compressed))
+    return filename, sum(len(source.encode('utf-8')) for source in sources), sizes
+
+
+def prune(keep):
+    """Delete bundles from older builds (cached HTML shells may still ask for the previous one)"""
+    for filename in os.listdir(os.path.join(STATIC, DIST)):
+        base = re.sub(r'\.(gz|br)$', '', filename)
+        if f'{DIST}/{base}' not in keep and filename != os.path.basename(MANIFEST):
+            os.remove(os.path.join(STATIC, DIST, filename))
+
+
+def main():
+    os.makedirs(os.path.join(STATIC, DIST), exist_ok=True)
+    manifest_path = os.path.join(STATIC, MANIFEST)
+    previous = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            previous = json.load(f)
+
+    manifest = {}
+    compress_with = compressors()
+    for name in BUNDLES:
+        filename, raw, sizes = build_bundle(name, compress_with)
+        manifest[name] = filename
+        print(f"✅ {filename}: {raw} -> {' / '.join(str(size) for size in sizes)} bytes")
+
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    prune(set(manifest.values()) | set(previous.values()))
+    print(f"✅ Manifest written: static/{MANIFEST}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Sık gelen konuşma/susturma olaylarının birleştirilmesi ve hız sınırı
+
+Ses etkinliği algılama (VAD) saniyede birçok kez start_speaking /
+stop_speaking gönderebilir. Her değişiklik odaya ayrı ayrı yayınlanmaz:
+oda başına kısa bir pencere (SPEAKING_COALESCE_MS) içindeki değişiklikler
+kullanıcı başına son değere indirgenir ve tek bir speaking_state olayı
+olarak gönderilir. Pencere içinde açılıp kapanan (net değişikliği olmayan)
+durumlar hiç yayınlanmaz. Bu olayların değiştirdiği aktif konuşmacı kümesi de
+pencere sonunda, o anki haliyle bir kez yayınlanır.
+
+Durumu açan olaylar (konuşmaya başlama, susturmayı kaldırma) ayrıca socket
+başına token bucket ile sınırlanır; kapatan olaylar yalnızca gerçekten açık
+olan bir durumu kapatabildiği için sayıları zaten bu sınırla sınırlıdır.
+"""
+import threading
+import time
+
+
+class RateLimiter:
+    """Anahtar (sid) başına token bucket: saniyede rate token, en fazla burst"""
+
+    def __init__(self, rate=5, burst=10):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.rate = app.config.get('SOCKET_EVENT_RATE', self.rate)
+        self.burst = app.config.get('SOCKET_EVENT_BURST', self.burst)
+        app.extensions['rate_limiter'] = self
+
+    def allow(self, key):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            return allowed
+
+    def discard(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class SpeakingCoalescer:
+    """Oda başına durum değişikliklerini pencere sonunda tek olayda gönderen birleştirici"""
+
+    def __init__(self, socketio, emit=None, window=0.075):
+        self.socketio = socketio
+        self.emit = emit
+        self.window = window
+        self.staged = 0
+        self.emitted = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app, emit):
+        """emit(room_id, states, speakers_changed): states = {user_id: {alan: değer}}"""
+        self.window = app.config.get('SPEAKING_COALESCE_MS', self.window * 1000) / 1000
+        self.emit = emit
+        app.extensions['speaking_coalescer'] = self
+
+    def _batch(self, room_id):
+        """Odanın açık penceresi; yeni açıldıysa ikinci değer True (kilit içinde çağrılır)"""
+        batch = self._pending.get(room_id)
+        if batch is not None:
+            return batch, False
+        batch = self._pending[room_id] = {'users': {}, 'speakers': False}
+        return batch, True
+
+    def stage(self, room_id, user_id, changes, before):
+        """Değişikliği pencereye ekle; before: değişiklikten önceki durum"""
+        with self._lock:
+            self.staged += 1
+            batch, opened = self._batch(room_id)
+            entry = batch['users'].setdefault(user_id, {'before': {}, 'after': {}})
+            for name in changes:
+                # Penceredeki ilk değer karşılaştırma için saklanır
+                entry['before'].setdefault(name, before.get(name))
+            entry['after'].update(changes)
+        if opened:
+            self.socketio.start_background_task(self._flush, room_id)
+
+    def stage_speakers(self, room_id):
+        """Aktif konuşmacı kümesi değişti; pencere sonunda güncel küme bir kez yayınlanır"""
+        with self._lock:
+            self.staged += 1
+            batch, opened = self._batch(room_id)
+            batch['speakers'] = True
+        if opened:
+            self.socketio.start_background_task(self._flush, room_id)
+
+    def _flush(self, room_id):
+        self.socketio.sleep(self.window)
+        with self._lock:
+            batch = self._pending.pop(room_id, None) or {'users': {}, 'speakers': False}
+        states = {}
+        for user_id, entry in batch['users'].items():
+            changed = {name: value for name, value in entry['after'].items()
+                       if value != entry['before'].get(name)}
+            if changed:
+                states[user_id] = changed
+        if states or batch['speakers']:
+            with self._lock:
+                self.emitted += 1
+            self.emit(room_id, states, batch['speakers'])
+
+    def pending(self):
+        """Pencerede bekleyen kullanıcı durumu sayısı"""
+        with self._lock:
+            return sum(len(batch['users']) for batch in self._pending.values())
@@ -4,8 +4,10 @@ Database creation script for Clubhouse Spaces
 Creates the database and tables for the audio conference application
 """
 
+import sys
 import pymysql
 from models import db, User, Room, RoomMember, SpeakingRequest, RoomInvite
+from migrations import apply_migrations, explain_hot_queries
 from index import app
 
 def create_database():
@@ -36,6 +38,15 @@ def create_database():
             print("   - room_member")
             print("   - speaking_request")
             print("   - room_invite")
+            
+            # Existing databases only get new indexes through migrations
+            applied = apply_migrations(db.engine)
+            if applied:
+                print("✅ Migrations applied:")
+                for number, description in applied:
+                    print(f"   - {number:03d} {description}")
+            else:
+                print("✅ Schema is up to date")
         
         print("\n🎉 Clubhouse Spaces database setup completed!")
         print("📊 Database information:")
@@ -63,6 +74,16 @@ def test_connection():
         print(f"❌ Connection error: {e}")
         return False
 
+def check_indexes():
+    """Run EXPLAIN on the hot queries and report the index each one uses"""
+    with app.app_context():
+        results = explain_hot_queries(db.engine)
+    ok = True
+    for name, used, expected in results:
+        print(f"{'✅' if expected else '❌'} {name}: {used}")
+        ok = ok and expected
+    return ok
+
 def create_sample_data():
     """Create sample data for testing"""
     try:
@@ -124,6 +145,10 @@ def create_sample_data():
         print(f"❌ Error creating sample data: {e}")
 
 if __name__ == '__main__':
+    if '--explain' in sys.argv:
+        print("🔍 Hot query index check")
+        sys.exit(0 if check_indexes() else 1)
+    
     print("🚀 Clubhouse Spaces - Database Setup")
     print("=" * 40)
     
@@ -0,0 +1,167 @@
+"""Veritabanı bağlantı havuzu ayarları ve ölçümleri
+
+MariaDB için havuz boyutu, taşma (overflow), bağlantı yenileme süresi ve
+pre-ping ortam değişkenleriyle ayarlanır. Havuz, bağlantı alma (checkout)
+bekleme süresini ölçen bir QueuePool'dur; ölçümler /api/health/db ile
+okunur. Socket olayları her çağrıda kendi session'ını kullanır ve olay
+bittiğinde bağlantı havuza hemen geri verilir.
+"""
+import functools
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _in_memory_sqlite(uri):
+    return uri.startswith('sqlite') and (uri in ('sqlite://', 'sqlite:///') or ':memory:' in uri)
+
+
+def engine_options(uri, pool_size=10, max_overflow=20, pool_timeout=10, pool_recycle=1800, pool_pre_ping=True):
+    """SQLALCHEMY_ENGINE_OPTIONS değerini oluştur
+
+    Bellek içi SQLite tek bağlantıyla çalışmak zorunda olduğu için kendi
+    havuzunda bırakılır; dosya tabanlı SQLite ve MariaDB ölçümlü havuzu kullanır.
+    """
+    if _in_memory_sqlite(uri):
+        return {}
+    return {
+        'poolclass': TimedQueuePool,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': pool_timeout,
+        # MariaDB wait_timeout'u dolmadan bağlantıları yenile ("server has gone away")
+        'pool_recycle': pool_recycle,
+        'pool_pre_ping': pool_pre_ping
+    }
+
+
+class TimedQueuePool(QueuePool):
+    """Bağlantı alma süresini PoolMetrics'e bildiren QueuePool"""
+
+    metrics = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        if self.metrics is not None:
+            self.metrics.record_checkout(time.perf_counter() - started, self)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() sonrası yeni havuz aynı ölçümlere yazmaya devam eder
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class PoolMetrics:
+    """Havuz bekleme süreleri, zaman aşımları ve kopan bağlantı sayaçları"""
+
+    def __init__(self, samples=1000):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.max_wait_ms = 0.0
+        self.peak_checked_out = 0
+        self.peak_overflow = 0
+        self.wait_ms = deque(maxlen=samples)
+        self.engine = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db):
+        with app.app_context():
+            self.engine = db.engine
+        if isinstance(self.engine.pool, TimedQueuePool):
+            self.engine.pool.metrics = self
+        event.listen(self.engine, 'connect', self._on_connect)
+        event.listen(self.engine, 'invalidate', self._on_invalidate)
+        app.extensions['pool_metrics'] = self
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def record_checkout(self, seconds, pool):
+        wait_ms = seconds * 1000
+        with self._lock:
+            self.checkouts += 1
+            self.wait_ms.append(wait_ms)
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.peak_checked_out = max(self.peak_checked_out, pool.checkedout())
+            self.peak_overflow = max(self.peak_overflow, pool.overflow())
+
+    def record_timeout(self, seconds):
+        with self._lock:
+            self.timeouts += 1
+            self.max_wait_ms = max(self.max_wait_ms, seconds * 1000)
+
+    def snapshot(self):
+        with self._lock:
+            waits = list(self.wait_ms)
+            result = {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'peak_checked_out': self.peak_checked_out,
+                'peak_overflow': self.peak_overflow,
+                'wait_ms': {
+                    'samples': len(waits),
+                    'avg': round(sum(waits) / len(waits), 3) if waits else None,
+                    'p50': round(_percentile(waits, 50), 3) if waits else None,
+                    'p95': round(_percentile(waits, 95), 3) if waits else None,
+                    'p99': round(_percentile(waits, 99), 3) if waits else None,
+                    'max': round(self.max_wait_ms, 3)
+                }
+            }
+        pool = self.engine.pool if self.engine is not None else None
+        result['pool'] = type(pool).__name__ if pool is not None else None
+        if isinstance(pool, QueuePool):
+            result.update({
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                # overflow(), havuz dolana kadar negatiftir
+                'overflow': max(0, pool.overflow()),
+                'max_overflow': pool._max_overflow
+            })
+        return result
+
+
+def scoped_session(db):
+    """Socket olay handler'ını kendi session kapsamında çalıştıran decorator
+
+    Hata olursa işlem geri alınır; her durumda session kapatılır ve bağlantı
+    olay biter bitmez havuza döner (sonraki olaylar aynı greenlet'te eski
+    session'ı devralmaz).
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            try:
+                return f(*args, **kwargs)
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+        return wrapper
+    return decorator
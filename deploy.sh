@@ -37,6 +37,9 @@ source venv/bin/activate
 echo -e "${YELLOW}📚 Python bağımlılıklarını yükle...${NC}"
 pip install -r requirements.txt
 
+echo -e "${YELLOW}🎨 Statik paketleri oluştur (CSS/JS küçültme, gzip/brotli)...${NC}"
+python build_assets.py
+
 echo -e "${YELLOW}🗄️ MariaDB veritabanını oluştur...${NC}"
 python create_database.py
 
@@ -47,7 +50,7 @@ echo -e "${GREEN}✅ Kurulum tamamlandı!${NC}"
 echo ""
 echo -e "${YELLOW}🚀 Uygulamayı başlatmak için:${NC}"
 echo "   source venv/bin/activate"
-echo "   python index.py"
+echo "   HOST=0.0.0.0 gunicorn -c gunicorn.conf.py wsgi:app"
 echo ""
 echo -e "${YELLOW}🌐 Tarayıcıda test etmek için:${NC}"
 echo "   http://localhost:5000"
@@ -0,0 +1,53 @@
+"""gunicorn ayarları (eventlet worker)
+
+Socket.IO oturumları worker'a yapışık (sticky) olmalıdır; bu yüzden her
+gunicorn süreci tek worker ile çalışır. Yatay ölçekleme için farklı PORT'larda
+birden fazla süreç açılır, nginx ip_hash ile dağıtır ve yayınlar
+SOCKETIO_MESSAGE_QUEUE üzerinden paylaşılır. Tüm değerler ortam
+değişkenleriyle ayarlanabilir.
+"""
+import os
+import signal
+
+bind = f"{os.environ.get('HOST', '127.0.0.1')}:{os.environ.get('PORT', '5000')}"
+worker_class = 'eventlet'
+workers = 1
+# Worker başına eşzamanlı bağlantı (greenlet havuzu); her WebSocket bir greenlet tutar
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 5000))
+# HTTP keep-alive süresi (saniye)
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+# SIGTERM / HUP sonrası bağlantıların boşalması için beklenecek en uzun süre
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# İstemcilerin yeniden bağlanmasının yayılacağı pencere (graceful_timeout'tan kısa olmalı)
+drain_window = int(os.environ.get('DRAIN_WINDOW', 5))
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+proc_name = 'dataflow-spaces'
+
+
+def post_worker_init(worker):
+    """SIGTERM'de yeni bağlantı almayı bırak ve mevcut socket'leri boşalt"""
+    import eventlet
+
+    def handle_term(sig, frame):
+        if not worker.alive:
+            return
+        worker.alive = False
+        worker.log.info('Bağlantılar boşaltılıyor (pencere: %ss)', drain_window)
+        eventlet.spawn(_drain, worker)
+
+    signal.signal(signal.SIGTERM, handle_term)
+    signal.siginterrupt(signal.SIGTERM, False)
+
+
+def _drain(worker):
+    from index import drain_connections
+
+    try:
+        count = drain_connections(drain_window)
+        worker.log.info('%s socket yeniden bağlanmaya yönlendirildi', count)
+    except Exception:
+        worker.log.exception('Bağlantı boşaltma başarısız')
@@ -0,0 +1,86 @@
+"""Oturum kimliği önbelleği
+
+HTTP isteklerinde kullanıcı istek başına bir kez çözülür (flask.g); istekler
+arası ise sınırlı, TTL'li bir önbellekte veritabanından ayrılmış (detached)
+kopyası tutulur ve oturuma SELECT atmadan merge edilir. Socket bağlantıları
+connect anında session'daki kullanıcıya bağlanır ve olaylarda bu kimlik
+kullanılır.
+"""
+import threading
+
+from flask import g
+from sqlalchemy.orm import make_transient_to_detached
+
+from cache import TTLCache
+from models import db, User
+
+
+def _detached_copy(user):
+    """Kullanıcının oturumdan bağımsız, temiz bir kopyasını oluştur"""
+    copy = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(copy)
+    return copy
+
+
+class IdentityCache:
+    """Kullanıcı ve socket kimliklerini önbellekleyen yardımcı"""
+
+    def __init__(self):
+        self._users = TTLCache()
+        self._sockets = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self._users = TTLCache(
+            maxsize=app.config.get('IDENTITY_CACHE_SIZE', 10000),
+            ttl=app.config.get('IDENTITY_CACHE_TTL', 60)
+        )
+        app.extensions['identity'] = self
+
+    def load_user(self, user_id):
+        """Kullanıcıyı istek içinde bir kez, istekler arası önbellekten çöz"""
+        current = g.get('identity_user')
+        if current is not None and current.id == user_id:
+            return current
+
+        snapshot = self._users.get(user_id)
+        if snapshot is None:
+            user = db.session.get(User, user_id)
+            if user is None:
+                return None
+            self._users.set(user_id, _detached_copy(user))
+        else:
+            # load=False: SELECT atmadan önbellekteki durumu oturuma al
+            user = db.session.merge(snapshot, load=False)
+
+        g.identity_user = user
+        return user
+
+    def invalidate(self, user_id):
+        """Giriş/çıkış veya profil değişikliğinde önbelleği düşür"""
+        self._users.pop(user_id)
+        current = g.get('identity_user')
+        if current is not None and current.id == user_id:
+            g.pop('identity_user')
+
+    def bind_socket(self, sid, user_id):
+        with self._lock:
+            self._sockets[sid] = user_id
+
+    def unbind_socket(self, sid):
+        with self._lock:
+            return self._sockets.pop(sid, None)
+
+    def socket_user(self, sid):
+        with self._lock:
+            return self._sockets.get(sid)
+
+    def socket_ids(self):
+        """Bu süreçteki kimliği bağlı socket'ler"""
+        with self._lock:
+            return list(self._sockets)
+
+    def socket_users(self):
+        """Bu süreçte en az bir socket'i bağlı kullanıcılar"""
+        with self._lock:
+            return set(self._sockets.values())
@@ -0,0 +1,78 @@
+"""Oda davet kodları: toplu üretim ve tek sorguda kullanım
+
+Kodlar secrets ile üretilir. Bir çağrıdaki tüm kodlar tek bir çok satırlı
+INSERT ile yazılır; veritabanında zaten bulunan kodlar önce tek bir SELECT
+ile elenir, aradaki yarışta unique indekse takılan olursa tüm grup yeni
+kodlarla tekrar denenir. Kullanım tek bir koşullu UPDATE'tir (is_used =
+false); aynı kodu aynı anda kullanan iki istekten yalnızca biri başarılı olur.
+"""
+import secrets
+import string
+import uuid
+from datetime import datetime
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from models import db, RoomInvite
+
+ALPHABET = string.ascii_uppercase + string.digits
+
+
+def generate_code(length=8):
+    return ''.join(secrets.choice(ALPHABET) for _ in range(length))
+
+
+def _unique_codes(count, length):
+    """Veritabanında bulunmayan count adet farklı kod"""
+    codes = set()
+    while len(codes) < count:
+        candidates = set()
+        while len(candidates) < count - len(codes):
+            candidates.add(generate_code(length))
+        candidates -= codes
+        taken = set(db.session.scalars(
+            select(RoomInvite.invite_code).where(RoomInvite.invite_code.in_(candidates))
+        ))
+        codes |= candidates - taken
+    return list(codes)
+
+
+def create_invites(room_id, invited_by, count=1, length=8, attempts=5):
+    """count adet davet oluştur ve kaydet; satırları sözlük olarak döndür"""
+    for attempt in range(attempts):
+        now = datetime.utcnow()
+        rows = [{
+            'id': str(uuid.uuid4()),
+            'invite_code': code,
+            'is_used': False,
+            'created_at': now,
+            'room_id': room_id,
+            'invited_by': invited_by
+        } for code in _unique_codes(count, length)]
+        try:
+            db.session.execute(insert(RoomInvite), rows)
+            db.session.commit()
+            return rows
+        except IntegrityError:
+            # Başka bir istek aynı kodu araya yazdı
+            db.session.rollback()
+            if attempt == attempts - 1:
+                raise
+
+
+def claim_invite(room_id, invite_code, user_id):
+    """Kullanılmamış daveti bu kullanıcı adına işaretle; başarılıysa True
+
+    Commit çağıranın işlemiyle birlikte yapılır; katılım başarısız olursa
+    rollback daveti tekrar kullanılabilir bırakır.
+    """
+    result = db.session.execute(
+        update(RoomInvite)
+        .where(RoomInvite.room_id == room_id,
+               RoomInvite.invite_code == invite_code,
+               RoomInvite.is_used == False)  # noqa: E712 (indeksli eşitlik)
+        .values(is_used=True, used_at=datetime.utcnow(), used_by=user_id)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
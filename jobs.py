@@ -0,0 +1,131 @@
+"""Zamanlanmış arka plan işleri
+
+Periyodik işler (presence flush, sayaç düzeltme, bayat kayıt taramaları)
+tek bir çalıştırıcıya kaydedilir; her iş kendi arka plan görevinde
+(eventlet altında greenlet) aralığı kadar uyuyup uygulama bağlamında çalışır.
+Her çalıştırmanın süresi, sonucu ve işlediği satır sayısı /metrics'e yazılır.
+
+Bazı işler worker başınadır (kalp atışı: o worker'a bağlı socket'ler);
+veritabanının tamamını tarayan işler ise exclusive kaydedilir ve aralık
+boyunca süren bir kira (lease) ile yalnızca bir worker'da çalışır. Kira
+birden fazla worker'da Redis'te tutulur; tek süreçte gerekmez.
+"""
+import logging
+import time
+import uuid
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryJobLock:
+    """Tek süreç: işi çalıştıran başka worker yok, kira her zaman alınır"""
+
+    def acquire(self, name, ttl):
+        return True
+
+
+class RedisJobLock:
+    """Worker'lar arası kira: SET NX EX; kira süre dolunca kendiliğinden düşer"""
+
+    def __init__(self, url=None, client=None, prefix='jobs'):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.redis = client
+        self.prefix = prefix
+        self.token = uuid.uuid4().hex
+
+    def acquire(self, name, ttl):
+        return bool(self.redis.set(f'{self.prefix}:lease:{name}', self.token, nx=True, ex=max(1, int(ttl))))
+
+
+class Job:
+    def __init__(self, name, fn, interval, exclusive):
+        self.name = name
+        self.fn = fn
+        self.interval = interval
+        self.exclusive = exclusive
+        self.last_success = None
+        self.last_rows = 0
+
+
+class JobRunner:
+    def __init__(self, lock=None):
+        self.app = None
+        self.socketio = None
+        self.lock = lock or MemoryJobLock()
+        self.batch_size = 500
+        self.max_batches = 20
+        self.jobs = {}
+        self._started = False
+        self._runs = None
+        self._rows = None
+        self._duration = None
+
+    def init_app(self, app, socketio, metrics=None):
+        self.app = app
+        self.socketio = socketio
+        self.batch_size = app.config.get('JOB_BATCH_SIZE', self.batch_size)
+        self.max_batches = app.config.get('JOB_MAX_BATCHES', self.max_batches)
+        app.extensions['jobs'] = self
+        if metrics is not None:
+            self._runs = metrics.counter('job_runs_total', 'Arka plan işi çalıştırmaları', ('job', 'result'))
+            self._rows = metrics.counter('job_rows_total', 'Arka plan işlerinin işlediği satırlar', ('job',))
+            self._duration = metrics.histogram('job_duration_seconds', 'Arka plan işi süresi', ('job',))
+            metrics.gauge_callback('job_last_success_age_seconds', 'Son başarılı çalıştırmadan beri geçen süre',
+                                   self._success_ages, ('job',))
+
+    def register(self, name, fn, interval, exclusive=False):
+        """fn() işlenen satır sayısını döndürür; exclusive işler tek worker'da çalışır"""
+        self.jobs[name] = Job(name, fn, interval, exclusive)
+
+    def batched(self, step):
+        """step(limit) en fazla limit satır işler; dolu geldikçe max_batches'e kadar tekrarla"""
+        total = 0
+        for _ in range(self.max_batches):
+            processed = step(self.batch_size)
+            total += processed
+            if processed < self.batch_size:
+                break
+        return total
+
+    def start(self):
+        if self._started:
+            return
+        self._started = True
+        for job in self.jobs.values():
+            self.socketio.start_background_task(self._loop, job)
+
+    def run(self, name):
+        """İşi hemen bir kez çalıştır; kira alınamadıysa None döndür"""
+        job = self.jobs[name]
+        if job.exclusive and not self.lock.acquire(name, job.interval):
+            return None
+        started = time.perf_counter()
+        result = 'ok'
+        with self.app.app_context():
+            try:
+                job.last_rows = job.fn() or 0
+                job.last_success = time.time()
+            except Exception:
+                result = 'error'
+                db.session.rollback()
+                logger.exception('Arka plan işi başarısız: %s', name)
+        if self._runs is not None:
+            self._runs.inc((name, result))
+            self._duration.observe(time.perf_counter() - started, (name,))
+            if result == 'ok':
+                self._rows.inc((name,), job.last_rows)
+        return job.last_rows if result == 'ok' else None
+
+    def _loop(self, job):
+        while True:
+            self.socketio.sleep(job.interval)
+            self.run(job.name)
+
+    def _success_ages(self):
+        now = time.time()
+        return {(job.name,): now - job.last_success
+                for job in self.jobs.values() if job.last_success is not None}
@@ -0,0 +1,321 @@
+"""Prometheus metin formatında uygulama ölçümleri (/metrics)
+
+Sıcak yolda yalnızca sayaç artırma ve histogram kovasına ekleme yapılır:
+HTTP uçları ve socket olaylarının süreleri, işlem başına SQL sorgu sayısı,
+sorgu süreleri ve oda yayınlarının alıcı sayısı. Bağlantı, oda ve gönderim
+kuyruğu gibi anlık değerler yalnızca /metrics okunurken hesaplanır.
+
+Ölçümler worker sürecine aittir; her gunicorn süreci ayrı kazınır (scrape).
+METRICS_PROFILE_SAMPLE_RATE > 0 ise isteklerin bu oranı cProfile ile
+izlenir; METRICS_SLOW_MS'i aşanların profili /metrics/slow'da tutulur.
+"""
+import bisect
+import cProfile
+import functools
+import io
+import logging
+import pstats
+import random
+import threading
+import time
+from collections import deque
+
+from flask import Response, g, has_request_context, jsonify, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, labels=()):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            entry[0][index] += 1
+            entry[1] += 1
+            entry[2] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for labels, (counts, count, total) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = f'le="{_number(bound)}"'
+                    lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}')
+                lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {count}')
+                lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}')
+        return lines
+
+
+class GaugeCallback:
+    """Değeri /metrics okunurken fn() ile hesaplanan gauge
+
+    fn tek bir sayı ya da {etiket değerleri: sayı} sözlüğü döndürür.
+    """
+
+    def __init__(self, name, documentation, fn, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.fn = fn
+        self.labelnames = labelnames
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} gauge']
+        try:
+            values = self.fn()
+        except Exception:
+            logger.exception('%s hesaplanamadı', self.name)
+            return lines
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, value in sorted(values.items()):
+            lines.append(f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}')
+        return lines
+
+
+class Metrics:
+    def __init__(self, prefix='dataflow'):
+        self.prefix = prefix
+        self.enabled = True
+        self.slow_ms = 500
+        self.profile_sample_rate = 0.0
+        self.slow_samples = deque(maxlen=20)
+        self._profiling = False
+        self._profile_lock = threading.Lock()
+        self._metrics = []
+
+        self.http_requests = self.counter(
+            'http_requests_total', 'Tamamlanan HTTP istekleri', ('method', 'route', 'status'))
+        self.http_duration = self.histogram(
+            'http_request_duration_seconds', 'HTTP istek süresi', ('method', 'route'))
+        self.socket_duration = self.histogram(
+            'socket_event_duration_seconds', 'Socket olayı işleme süresi', ('event',))
+        self.socket_errors = self.counter(
+            'socket_event_errors_total', 'Hata ile biten socket olayları', ('event',))
+        self.db_queries = self.counter('db_queries_total', 'Çalıştırılan SQL sorguları')
+        self.db_duration = self.histogram('db_query_duration_seconds', 'SQL sorgu süresi')
+        self.queries_per_operation = self.histogram(
+            'db_queries_per_operation', 'HTTP isteği / socket olayı başına SQL sorgusu',
+            ('kind', 'name'), buckets=QUERY_BUCKETS)
+        self.broadcast_recipients = self.histogram(
+            'broadcast_recipients', 'Oda yayını başına bu worker\'daki alıcı sayısı',
+            ('event',), buckets=SIZE_BUCKETS)
+        self.slow_operations = self.counter(
+            'slow_operations_total', 'METRICS_SLOW_MS\'i aşan istek ve olaylar', ('kind',))
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(f'{self.prefix}_{name}', documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(f'{self.prefix}_{name}', documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge_callback(self, name, documentation, fn, labelnames=()):
+        metric = GaugeCallback(f'{self.prefix}_{name}', documentation, fn, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def init_app(self, app, socketio=None, engine=None):
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        self.slow_ms = app.config.get('METRICS_SLOW_MS', self.slow_ms)
+        self.profile_sample_rate = app.config.get('METRICS_PROFILE_SAMPLE_RATE', self.profile_sample_rate)
+        app.extensions['metrics'] = self
+        if not self.enabled:
+            return
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/metrics', 'metrics', self.render_response)
+        app.add_url_rule('/metrics/slow', 'metrics_slow', self.slow_response)
+        if engine is not None:
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        if socketio is not None:
+            self._watch_socketio(socketio)
+
+    # HTTP
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_queries = 0
+        g.metrics_profiler = self._start_profile()
+
+    def _after_request(self, response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        self.http_requests.inc((request.method, route, str(response.status_code)))
+        self.http_duration.observe(elapsed, (request.method, route))
+        self.queries_per_operation.observe(g.pop('metrics_queries', 0), ('http', route))
+        self._finish('http', f'{request.method} {route}', elapsed, g.pop('metrics_profiler', None))
+        return response
+
+    # Socket.IO
+
+    def socket_handler(self, f):
+        """Socket olay handler'ının süresini ve sorgu sayısını ölçen decorator"""
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return f(*args, **kwargs)
+            name = request.event['message']
+            g.metrics_queries = 0
+            profiler = self._start_profile()
+            started = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            except Exception:
+                self.socket_errors.inc((name,))
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                self.socket_duration.observe(elapsed, (name,))
+                self.queries_per_operation.observe(g.pop('metrics_queries', 0), ('socket', name))
+                self._finish('socket', name, elapsed, profiler)
+        return wrapper
+
+    def observe_broadcast(self, socketio, event_name, room, namespace='/'):
+        """Yayından önce odadaki yerel alıcı sayısını kaydet"""
+        if self.enabled:
+            participants = socketio.server.manager.rooms.get(namespace, {}).get(room)
+            self.broadcast_recipients.observe(len(participants) if participants else 0, (event_name,))
+
+    def _watch_socketio(self, socketio):
+        def rooms():
+            return socketio.server.manager.rooms.get('/', {})
+
+        def connections():
+            return len(rooms().get(None, ()))
+
+        def room_sizes():
+            # Her socket kendi sid'i ve kişisel user:<id> odasında da bulunur; bunlar sayılmaz
+            return [len(members) for name, members in list(rooms().items())
+                    if name is not None and not name.startswith('user:') and name not in members]
+
+        def emit_queue():
+            depths = [s.queue.qsize() for s in list(socketio.server.eio.sockets.values())]
+            return {('total',): sum(depths), ('max',): max(depths, default=0)}
+
+        self.gauge_callback('socket_connections', 'Bu worker\'a bağlı socket sayısı', connections)
+        self.gauge_callback('socket_rooms', 'En az bir yerel üyesi olan oda sayısı', lambda: len(room_sizes()))
+        self.gauge_callback('socket_room_members_max', 'En kalabalık odadaki yerel üye sayısı',
+                            lambda: max(room_sizes(), default=0))
+        self.gauge_callback('socket_room_members_total', 'Odalardaki toplam yerel üye sayısı',
+                            lambda: sum(room_sizes()))
+        self.gauge_callback('emit_queue_depth', 'Socket\'lere gönderilmeyi bekleyen paketler',
+                            emit_queue, ('stat',))
+
+    # Veritabanı
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('metrics_query_start')
+        if starts:
+            self.db_duration.observe(time.perf_counter() - starts.pop())
+        self.db_queries.inc()
+        if has_request_context() and 'metrics_queries' in g:
+            g.metrics_queries += 1
+
+    # Yavaş işlem örnekleme
+
+    def _start_profile(self):
+        if not self.profile_sample_rate or random.random() >= self.profile_sample_rate:
+            return None
+        # Aynı thread'de tek profiler çalışabilir; eventlet'te greenlet'ler aynı thread'i paylaşır
+        with self._profile_lock:
+            if self._profiling:
+                return None
+            self._profiling = True
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _finish(self, kind, name, elapsed, profiler):
+        if profiler is not None:
+            profiler.disable()
+            self._profiling = False
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms < self.slow_ms:
+            return
+        self.slow_operations.inc((kind,))
+        sample = {'kind': kind, 'name': name, 'duration_ms': round(elapsed_ms, 1), 'at': time.time()}
+        if profiler is not None:
+            output = io.StringIO()
+            pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(25)
+            sample['profile'] = output.getvalue()
+        self.slow_samples.append(sample)
+        logger.warning('Yavaş %s: %s %.1f ms', kind, name, elapsed_ms)
+
+    # Uçlar
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def render_response(self):
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+    def slow_response(self):
+        return jsonify(list(self.slow_samples))
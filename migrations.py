@@ -0,0 +1,142 @@
+"""Sürümlü şema migrasyonları
+
+db.create_all() yalnızca eksik tabloları oluşturur; var olan tablolara yeni
+indeks eklemez. Buradaki adımlar mevcut veritabanlarını modellerle aynı
+şemaya getirir. Uygulanan son sürüm schema_version tablosunda tutulur ve
+her adım tekrar çalıştırılabilir (idempotent) yazılır.
+
+    apply_migrations(db.engine)     # create_database.py tarafından çağrılır
+    explain_hot_queries(db.engine)  # sıcak sorguların indeks kullanımını raporlar
+"""
+import re
+
+from sqlalchemy import Column, Integer, MetaData, Table, func, inspect, select
+
+from models import db, User, Room, RoomMember, SpeakingRequest, RoomInvite
+
+schema_metadata = MetaData()
+schema_version = Table('schema_version', schema_metadata, Column('version', Integer, nullable=False))
+
+
+def _create_model_indexes(conn, *models):
+    """Modellerde tanımlı olup veritabanında olmayan indeksleri oluştur"""
+    inspector = inspect(conn)
+    created = []
+    for model in models:
+        table = model.__table__
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(conn)
+                created.append(index.name)
+    return created
+
+
+def _dedupe_room_members(conn):
+    """Tekil indeks öncesi aynı (user_id, room_id) için fazladan satırları sil"""
+    duplicates = conn.execute(
+        select(RoomMember.user_id, RoomMember.room_id, func.min(RoomMember.id))
+        .group_by(RoomMember.user_id, RoomMember.room_id)
+        .having(func.count() > 1)
+    ).all()
+    for user_id, room_id, keep_id in duplicates:
+        conn.execute(
+            db.delete(RoomMember).where(
+                RoomMember.user_id == user_id,
+                RoomMember.room_id == room_id,
+                RoomMember.id != keep_id
+            )
+        )
+    return len(duplicates)
+
+
+def _hot_path_indexes(conn):
+    _dedupe_room_members(conn)
+    return _create_model_indexes(conn, Room, RoomMember, SpeakingRequest, RoomInvite)
+
+
+def _sweep_indexes(conn):
+    return _create_model_indexes(conn, User, SpeakingRequest)
+
+
+# (sürüm, açıklama, adım)
+MIGRATIONS = [
+    (1, 'Composite indexes for member, request, room and invite lookups', _hot_path_indexes),
+    (2, 'Indexes for stale session and speaking request sweeps', _sweep_indexes),
+]
+
+
+def current_version(conn):
+    schema_metadata.create_all(conn)
+    return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def apply_migrations(engine):
+    """Bekleyen migrasyonları sırayla uygula; uygulananların listesini döndür"""
+    applied = []
+    with engine.begin() as conn:
+        version = current_version(conn)
+    for number, description, step in MIGRATIONS:
+        if number <= version:
+            continue
+        # Her adım kendi transaction'ında; yarıda kalan adım tekrar çalıştırılabilir
+        with engine.begin() as conn:
+            step(conn)
+            conn.execute(schema_version.insert().values(version=number))
+        applied.append((number, description))
+    return applied
+
+
+def hot_queries():
+    """(ad, sorgu, beklenen indeksler) listesi"""
+    return [
+        ('member by user+room',
+         select(RoomMember.id).where(RoomMember.user_id == 'u', RoomMember.room_id == 'r'),
+         {'uq_room_member_user_room', 'ix_room_member_room_user'}),
+        ('members by room',
+         select(RoomMember.id).where(RoomMember.room_id == 'r'),
+         {'ix_room_member_room_user'}),
+        ('pending request by user+room',
+         select(SpeakingRequest.id).where(SpeakingRequest.user_id == 'u', SpeakingRequest.room_id == 'r',
+                                          SpeakingRequest.status == 'pending'),
+         {'ix_speaking_request_user_room_status'}),
+        ('pending requests by room',
+         select(SpeakingRequest.id).where(SpeakingRequest.room_id == 'r', SpeakingRequest.status == 'pending'),
+         {'ix_speaking_request_room_status', 'ix_speaking_request_user_room_status'}),
+        ('public room directory',
+         select(Room.id).where(Room.is_active == True, Room.is_public == True)
+         .order_by(Room.created_at.desc()).limit(50),
+         {'ix_room_active_public_created'}),
+        ('active room by owner',
+         select(Room.id).where(Room.owner_id == 'u', Room.is_active == True),
+         {'ix_room_owner_active'}),
+        ('stale online users',
+         select(User.id).where(User.is_online == True, User.last_seen < '2000-01-01').limit(500),
+         {'ix_user_online_last_seen'}),
+        ('expired pending requests',
+         select(SpeakingRequest.id).where(SpeakingRequest.status == 'pending',
+                                          SpeakingRequest.requested_at < '2000-01-01').limit(500),
+         {'ix_speaking_request_status_requested'}),
+        # unique invite_code kolonunun kendi indeksi de yeterli (MySQL: 'invite_code')
+        ('unused invite by room+code',
+         select(RoomInvite.id).where(RoomInvite.room_id == 'r', RoomInvite.invite_code == 'C',
+                                     RoomInvite.is_used == False),
+         {'ix_room_invite_room_code_used', 'invite_code', 'sqlite_autoindex_room_invite_1',
+          'sqlite_autoindex_room_invite_2'}),
+    ]
+
+
+def explain_hot_queries(engine):
+    """Sıcak sorguları EXPLAIN ile çalıştır: [(ad, kullanılan indeksler, beklenen mi)]"""
+    results = []
+    with engine.connect() as conn:
+        for name, query, expected in hot_queries():
+            sql = str(query.compile(dialect=engine.dialect, compile_kwargs={'literal_binds': True}))
+            if engine.dialect.name == 'sqlite':
+                plan = ' '.join(row[-1] for row in conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}'))
+                used = re.findall(r'USING (?:COVERING )?INDEX (\S+)', plan)
+            else:
+                rows = conn.exec_driver_sql(f'EXPLAIN {sql}').mappings().all()
+                used = [row['key'] for row in rows if row['key']]
+            results.append((name, ', '.join(used) or 'full scan', bool(expected & set(used))))
+    return results
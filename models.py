@@ -3,9 +3,17 @@ from datetime import datetime
 import uuid
 import hashlib
 
-db = SQLAlchemy()
+from replicas import RoutingSession
+
+# Okumalar salt okunur handler'larda replikaya yönlendirilebilir (bkz. replicas.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
+    __table_args__ = (
+        # Bayat oturum taraması: çevrimiçi görünüp uzun süredir kalp atışı gelmeyenler
+        db.Index('ix_user_online_last_seen', 'is_online', 'last_seen'),
+    )
+    
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     username = db.Column(db.String(50), unique=True, nullable=False)
     display_name = db.Column(db.String(100), nullable=False)
@@ -35,6 +43,13 @@ class User(db.Model):
         }
 
 class Room(db.Model):
+    __table_args__ = (
+        # Oda dizini: is_active/is_public filtresi + keyset sıralama kolonu
+        db.Index('ix_room_active_public_created', 'is_active', 'is_public', 'created_at'),
+        db.Index('ix_room_active_public_participants', 'is_active', 'is_public', 'current_participants'),
+        db.Index('ix_room_owner_active', 'owner_id', 'is_active'),
+    )
+    
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=True)
@@ -66,6 +81,12 @@ class Room(db.Model):
         }
 
 class RoomMember(db.Model):
+    __table_args__ = (
+        # Bir kullanıcı bir odaya yalnızca bir kez üye olabilir
+        db.Index('uq_room_member_user_room', 'user_id', 'room_id', unique=True),
+        db.Index('ix_room_member_room_user', 'room_id', 'user_id'),
+    )
+    
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     joined_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_speaking = db.Column(db.Boolean, default=False)
@@ -91,8 +112,15 @@ class RoomMember(db.Model):
         }
 
 class SpeakingRequest(db.Model):
+    __table_args__ = (
+        db.Index('ix_speaking_request_room_status', 'room_id', 'status'),
+        db.Index('ix_speaking_request_user_room_status', 'user_id', 'room_id', 'status'),
+        # Süresi dolan / saklama süresini dolduran istek taramaları
+        db.Index('ix_speaking_request_status_requested', 'status', 'requested_at'),
+    )
+    
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    status = db.Column(db.String(20), default='pending')  # pending, approved, rejected
+    status = db.Column(db.String(20), default='pending')  # pending, approved, rejected, expired
     requested_at = db.Column(db.DateTime, default=datetime.utcnow)
     responded_at = db.Column(db.DateTime, nullable=True)
     
@@ -112,6 +140,10 @@ class SpeakingRequest(db.Model):
         }
 
 class RoomInvite(db.Model):
+    __table_args__ = (
+        db.Index('ix_room_invite_room_code_used', 'room_id', 'invite_code', 'is_used'),
+    )
+    
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     invite_code = db.Column(db.String(20), unique=True, nullable=False)
     is_used = db.Column(db.Boolean, default=False)
@@ -134,3 +166,8 @@ class RoomInvite(db.Model):
             'invited_by': self.invited_by,
             'used_by': self.used_by
         }
+
+class ReplicaHeartbeat(db.Model):
+    """Replikasyon gecikmesi ölçümü: birincil sunucuya periyodik yazılan tek satır"""
+    id = db.Column(db.Integer, primary_key=True)
+    beat_at = db.Column(db.DateTime, nullable=False)
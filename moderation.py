@@ -0,0 +1,97 @@
+"""Toplu moderasyon: onay, ret, yetki geri alma ve susturma
+
+Tek kullanıcılık uçlar her kullanıcı için odayı yükleyip ayrı sorgular,
+commit ve yayın yapar. Buradaki fonksiyonlar bir kullanıcı listesine ya da
+bir filtreye ("bekleyen tüm istekler", "konuşmacılar dışındaki herkes")
+tek seferde uygulanır: hedefler tek SELECT ile belirlenir, değişiklik tablo
+başına tek bir UPDATE'tir. Sorgu sayısı hedef sayısından bağımsızdır.
+Commit ve yayın çağıranındır.
+"""
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from models import db, RoomMember, SpeakingRequest
+
+# Eylem -> üyeye yazılan alanlar
+ACTIONS = {
+    'approve': {'can_speak': True},
+    'reject': {},
+    'revoke': {'can_speak': False, 'is_speaking': False},
+    'mute': {'is_muted': True, 'is_speaking': False},
+    'unmute': {'is_muted': False},
+}
+
+# Filtreler: all = eylemin uygulanabildiği herkes
+FILTERS = ('all', 'speakers', 'listeners')
+
+
+def _member_targets(room_id, owner_id, action, user_ids, target_filter, live_states):
+    """Eylemin gerçekten bir şey değiştireceği üyeler (oda sahibi hariç)
+
+    is_muted'ın güncel değeri presence deposundadır (veritabanına flush ile
+    gecikmeli yazılır); mute/unmute hedefleri bu yüzden live_states'e göre,
+    depoda olmayan üyeler için veritabanındaki değere göre seçilir.
+    """
+    query = select(RoomMember.user_id, RoomMember.is_muted).where(
+        RoomMember.room_id == room_id, RoomMember.user_id != owner_id)
+    if action == 'revoke':
+        query = query.where(RoomMember.can_speak == True)  # noqa: E712
+    if target_filter == 'speakers':
+        query = query.where(RoomMember.can_speak == True)  # noqa: E712
+    elif target_filter == 'listeners':
+        query = query.where(RoomMember.can_speak == False)  # noqa: E712
+    if user_ids is not None:
+        query = query.where(RoomMember.user_id.in_(user_ids))
+    rows = db.session.execute(query).all()
+    if action not in ('mute', 'unmute'):
+        return [row.user_id for row in rows]
+    muted = action == 'mute'
+    return [row.user_id for row in rows
+            if live_states.get(row.user_id, {}).get('is_muted', bool(row.is_muted)) != muted]
+
+
+def _request_targets(room_id, user_ids, target_filter):
+    """Bekleyen isteği olan kullanıcılar"""
+    query = (select(SpeakingRequest.user_id)
+             .join(RoomMember, (RoomMember.room_id == SpeakingRequest.room_id)
+                   & (RoomMember.user_id == SpeakingRequest.user_id))
+             .where(SpeakingRequest.room_id == room_id, SpeakingRequest.status == 'pending'))
+    if target_filter == 'speakers':
+        query = query.where(RoomMember.can_speak == True)  # noqa: E712
+    elif target_filter == 'listeners':
+        query = query.where(RoomMember.can_speak == False)  # noqa: E712
+    if user_ids is not None:
+        query = query.where(SpeakingRequest.user_id.in_(user_ids))
+    return list(db.session.scalars(query.distinct()))
+
+
+def moderate(room_id, owner_id, action, user_ids=None, target_filter='all', live_states=None):
+    """Eylemi hedeflere uygula; etkilenen kullanıcı id'lerini döndür (commit etmez)
+
+    live_states: presence deposundaki {user_id: durum} (bkz. PresenceStore.room_states)
+    """
+    if action in ('approve', 'reject'):
+        targets = _request_targets(room_id, user_ids, target_filter)
+    else:
+        targets = _member_targets(room_id, owner_id, action, user_ids, target_filter, live_states or {})
+    if not targets:
+        return []
+
+    if action in ('approve', 'reject'):
+        db.session.execute(
+            update(SpeakingRequest)
+            .where(SpeakingRequest.room_id == room_id,
+                   SpeakingRequest.status == 'pending',
+                   SpeakingRequest.user_id.in_(targets))
+            .values(status='approved' if action == 'approve' else 'rejected', responded_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+    if ACTIONS[action]:
+        db.session.execute(
+            update(RoomMember)
+            .where(RoomMember.room_id == room_id, RoomMember.user_id.in_(targets))
+            .values(ACTIONS[action])
+            .execution_options(synchronize_session=False)
+        )
+    return targets
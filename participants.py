@@ -0,0 +1,74 @@
+"""Oda katılımcı sayacı
+
+current_participants Python'da okunup yazılmaz; kapasite kontrolü ve sayaç
+artışı tek bir koşullu UPDATE'tir (WHERE current_participants <
+max_participants). Aynı anda gelen katılımlar sırayla satır kilidini alır ve
+kapasite hiçbir zaman aşılmaz. Sayaç ayrıca periyodik olarak RoomMember
+satırlarının COUNT(*)'ı ile düzeltilir (elle silinen satırlar, yarıda kalan
+işlemler vb.).
+"""
+import logging
+
+from sqlalchemy import func, select, update
+
+from models import db, Room, RoomMember
+
+logger = logging.getLogger(__name__)
+
+
+def reserve_seat(room_id):
+    """Odada yer varsa sayacı bir artır; yer ayrıldıysa True döndür
+
+    Satır kilidi commit'e kadar tutulur; bu yüzden işlemin son yazması
+    olarak çağrılmalıdır.
+    """
+    result = db.session.execute(
+        update(Room)
+        .where(Room.id == room_id, Room.current_participants < Room.max_participants)
+        .values(current_participants=Room.current_participants + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def release_seat(room_id):
+    """Sayacı bir azalt (sıfırın altına inmez)"""
+    db.session.execute(
+        update(Room)
+        .where(Room.id == room_id, Room.current_participants > 0)
+        .values(current_participants=Room.current_participants - 1)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recount(room_ids=None):
+    """Sayacı üye sayısından farklı olan odaları COUNT(*) ile düzelt (commit etmez)
+
+    room_ids verilmezse tüm aktif odalara bakılır; düzeltilen oda sayısını döndürür.
+    """
+    member_count = (
+        select(func.count())
+        .select_from(RoomMember)
+        .where(RoomMember.room_id == Room.id)
+        .scalar_subquery()
+    )
+    if room_ids is None:
+        scope = Room.is_active == True  # noqa: E712
+    else:
+        scope = Room.id.in_(list(room_ids))
+    result = db.session.execute(
+        update(Room)
+        .where(scope, Room.current_participants != member_count)
+        .values(current_participants=member_count)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def reconcile():
+    """Tüm aktif odaların sayacını düzelt; düzeltilen oda sayısını döndür"""
+    fixed = recount()
+    db.session.commit()
+    if fixed:
+        logger.info('%s odanın katılımcı sayacı düzeltildi', fixed)
+    return fixed
@@ -0,0 +1,292 @@
+"""Oda içi anlık durum (presence) deposu
+
+Socket olaylarının sık değiştirdiği is_speaking / is_muted / can_speak alanları
+burada tutulur; handler'lar veritabanına dokunmadan okur ve yazar. Kalıcı
+alanlar jobs.JobRunner'daki presence_flush işiyle periyodik olarak toplu
+halde RoomMember tablosuna yazılır.
+"""
+import threading
+import uuid
+
+from models import db, RoomMember
+
+PRESENCE_FIELDS = ('is_speaking', 'is_muted', 'can_speak')
+
+
+class MemoryPresenceBackend:
+    """Süreç içi bellek backend'i (varsayılan)"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, room_id, user_id):
+        with self._lock:
+            entry = self._entries.get((room_id, user_id))
+            return dict(entry['state']) if entry else None
+
+    def seed(self, room_id, user_id, state):
+        """Kayıt yoksa state ile oluştur; her durumda güncel durumu döndür"""
+        with self._lock:
+            entry = self._entries.setdefault((room_id, user_id), {'state': dict(state), 'dirty': set()})
+            return dict(entry['state'])
+
+    def update(self, room_id, user_id, fields):
+        with self._lock:
+            entry = self._entries.get((room_id, user_id))
+            if entry is None:
+                return None
+            entry['state'].update(fields)
+            entry['dirty'].update(fields)
+            return dict(entry['state'])
+
+    def discard(self, room_id, user_id):
+        with self._lock:
+            self._entries.pop((room_id, user_id), None)
+
+    def discard_room(self, room_id):
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == room_id]:
+                del self._entries[key]
+
+    def room_states(self, room_id):
+        with self._lock:
+            return {key[1]: dict(entry['state'])
+                    for key, entry in self._entries.items() if key[0] == room_id}
+
+    def drain_dirty(self):
+        """Kirli alanları döndür ve temizle: [(room_id, user_id, {alan: değer})]"""
+        drained = []
+        with self._lock:
+            for (room_id, user_id), entry in self._entries.items():
+                if entry['dirty']:
+                    fields = {name: entry['state'][name] for name in entry['dirty']}
+                    drained.append((room_id, user_id, fields))
+                    entry['dirty'] = set()
+        return drained
+
+    def requeue(self, drained):
+        """Yazılamayan alanları tekrar kirli olarak işaretle"""
+        with self._lock:
+            for room_id, user_id, fields in drained:
+                entry = self._entries.get((room_id, user_id))
+                if entry is not None:
+                    entry['dirty'].update(fields)
+
+
+class RedisPresenceBackend:
+    """Birden fazla worker'ın paylaştığı Redis backend'i
+
+    Her üye {prefix}:m:<room>:<user> hash'inde, odanın üyeleri
+    {prefix}:room:<room> kümesinde, kirli alanlar ise {prefix}:dirty
+    kümesinde tutulur. drain_dirty kümeyi RENAME ile atomik olarak devralır;
+    böylece aynı değişikliği iki worker birden yazmaz. seed ve update üye
+    hash'ini WATCH/MULTI ile okuyup yazar; aynı anda yazan worker'lar yeniden dener.
+    """
+
+    def __init__(self, url=None, client=None, prefix='presence'):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.redis = client
+        self.prefix = prefix
+        self._dirty_key = f'{prefix}:dirty'
+
+    def _key(self, room_id, user_id):
+        return f'{self.prefix}:m:{room_id}:{user_id}'
+
+    def _room_key(self, room_id):
+        return f'{self.prefix}:room:{room_id}'
+
+    @staticmethod
+    def _decode(raw):
+        if not raw:
+            return None
+        return {key.decode(): value == b'1' for key, value in raw.items()}
+
+    @staticmethod
+    def _encode(fields):
+        return {name: '1' if value else '0' for name, value in fields.items()}
+
+    def get(self, room_id, user_id):
+        return self._decode(self.redis.hgetall(self._key(room_id, user_id)))
+
+    def seed(self, room_id, user_id, state):
+        key = self._key(room_id, user_id)
+        result = {}
+
+        def insert(pipe):
+            # Mevcut hash'in henüz flush edilmemiş alanları ezilmez
+            current = self._decode(pipe.hgetall(key))
+            pipe.multi()
+            if current is None:
+                pipe.hset(key, mapping=self._encode(state))
+            pipe.sadd(self._room_key(room_id), user_id)
+            result['state'] = current or dict(state)
+
+        self.redis.transaction(insert, key)
+        return result['state']
+
+    def update(self, room_id, user_id, fields):
+        key = self._key(room_id, user_id)
+        markers = [f'{room_id}|{user_id}|{name}' for name in fields]
+        result = {}
+
+        def apply(pipe):
+            # discard ile yarışta yarım (can_speak'siz) hash oluşmasın diye WATCH/MULTI
+            current = self._decode(pipe.hgetall(key))
+            result['state'] = None
+            if current is None:
+                return
+            pipe.multi()
+            pipe.hset(key, mapping=self._encode(fields))
+            pipe.sadd(self._dirty_key, *markers)
+            current.update(fields)
+            result['state'] = current
+
+        self.redis.transaction(apply, key)
+        return result['state']
+
+    def discard(self, room_id, user_id):
+        pipe = self.redis.pipeline()
+        pipe.delete(self._key(room_id, user_id))
+        pipe.srem(self._room_key(room_id), user_id)
+        pipe.execute()
+
+    def discard_room(self, room_id):
+        user_ids = [user_id.decode() for user_id in self.redis.smembers(self._room_key(room_id))]
+        keys = [self._key(room_id, user_id) for user_id in user_ids]
+        self.redis.delete(self._room_key(room_id), *keys)
+
+    def room_states(self, room_id):
+        user_ids = [user_id.decode() for user_id in self.redis.smembers(self._room_key(room_id))]
+        pipe = self.redis.pipeline()
+        for user_id in user_ids:
+            pipe.hgetall(self._key(room_id, user_id))
+        states = {}
+        for user_id, raw in zip(user_ids, pipe.execute()):
+            state = self._decode(raw)
+            if state:
+                states[user_id] = state
+        return states
+
+    def drain_dirty(self):
+        draining = f'{self._dirty_key}:{uuid.uuid4().hex}'
+        try:
+            self.redis.rename(self._dirty_key, draining)
+        except Exception:
+            # Kirli küme yok (boş)
+            return []
+        markers = self.redis.smembers(draining)
+        self.redis.delete(draining)
+
+        grouped = {}
+        for marker in markers:
+            room_id, user_id, name = marker.decode().split('|')
+            grouped.setdefault((room_id, user_id), []).append(name)
+
+        pipe = self.redis.pipeline()
+        keys = list(grouped)
+        for room_id, user_id in keys:
+            pipe.hmget(self._key(room_id, user_id), grouped[(room_id, user_id)])
+        drained = []
+        for (room_id, user_id), values in zip(keys, pipe.execute()):
+            names = grouped[(room_id, user_id)]
+            if all(value is not None for value in values):
+                drained.append((room_id, user_id, {name: value == b'1' for name, value in zip(names, values)}))
+        return drained
+
+    def requeue(self, drained):
+        markers = [f'{room_id}|{user_id}|{name}' for room_id, user_id, fields in drained for name in fields]
+        if markers:
+            self.redis.sadd(self._dirty_key, *markers)
+
+
+class PresenceStore:
+    """RoomMember anlık durumunu önbellekleyen ve toplu yazan depo"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or MemoryPresenceBackend()
+        self.flush_interval = 5
+
+    def init_app(self, app):
+        self.flush_interval = app.config.get('PRESENCE_FLUSH_INTERVAL', 5)
+        app.extensions['presence'] = self
+
+    @staticmethod
+    def state_of(member):
+        return {name: bool(getattr(member, name)) for name in PRESENCE_FIELDS}
+
+    def remember(self, member):
+        """Veritabanından yüklenen üyeyi depoya al; depodaki kayıt varsa onu döndür
+
+        Yeniden katılmada kayıt ezilmez: flush edilmemiş değişiklikler
+        (ör. son pencerede açılan susturma) veritabanı satırından yenidir.
+        """
+        return self.backend.seed(member.room_id, member.user_id, self.state_of(member))
+
+    def get(self, room_id, user_id):
+        """Üyenin durumunu döndür; depoda yoksa bir kez veritabanından yükle"""
+        state = self.backend.get(room_id, user_id)
+        if state is None:
+            member = RoomMember.query.filter_by(user_id=user_id, room_id=room_id).first()
+            if not member:
+                return None
+            state = self.remember(member)
+        return state
+
+    def update(self, room_id, user_id, **fields):
+        """Socket olaylarından gelen değişiklik; sonraki flush'ta yazılır"""
+        return self.backend.update(room_id, user_id, fields)
+
+    def sync(self, room_id, user_id, **fields):
+        """Veritabanına zaten yazılmış değişikliği depoya yansıt
+
+        Alanlar yine kirli işaretlenir: o sırada süren bir flush, bu yazmadan
+        önce devralınmış eski değeri (ör. socket'ten gelen susturma) yazıyor
+        olabilir. Sonraki flush depodaki güncel değeri yeniden yazar.
+        """
+        return self.backend.update(room_id, user_id, fields)
+
+    def discard(self, room_id, user_id):
+        self.backend.discard(room_id, user_id)
+
+    def discard_room(self, room_id):
+        self.backend.discard_room(room_id)
+
+    def room_states(self, room_id):
+        """Odanın depodaki üyelerinin güncel durumu: {user_id: durum}"""
+        return self.backend.room_states(room_id)
+
+    def overlay(self, room_id, members):
+        """Serileştirilmiş üye listesine depodaki güncel durumu uygula"""
+        states = self.backend.room_states(room_id)
+        for member in members:
+            state = states.get(member['user_id'])
+            if state:
+                member.update(state)
+        return members
+
+    def flush(self):
+        """Kirli alanları aynı değer kümelerine göre gruplayıp toplu UPDATE ile yaz"""
+        drained = self.backend.drain_dirty()
+        if not drained:
+            return 0
+
+        groups = {}
+        for room_id, user_id, fields in drained:
+            groups.setdefault(tuple(sorted(fields.items())), []).append((room_id, user_id))
+
+        try:
+            for values, keys in groups.items():
+                db.session.execute(
+                    db.update(RoomMember)
+                    .where(db.tuple_(RoomMember.room_id, RoomMember.user_id).in_(keys))
+                    .values(dict(values))
+                )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            self.backend.requeue(drained)
+            raise
+        return len(drained)
@@ -0,0 +1,49 @@
+"""SQL sorgu sayacı
+
+Bir kod bloğunun veritabanına kaç sorgu gönderdiğini sayar. Uç noktaların
+oda büyüklüğünden bağımsız sabit sayıda sorgu çalıştırdığını doğrulamak için
+kullanılır:
+
+    with assert_max_queries(2):
+        client.get('/api/rooms/<id>/members')
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from models import db
+
+
+class QueryCounter:
+    """Engine üzerinde çalışan sorguları sayan context manager"""
+
+    def __init__(self, engine=None):
+        self.engine = engine
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        if self.engine is None:
+            self.engine = db.engine
+        event.listen(self.engine, 'before_cursor_execute', self._on_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, 'before_cursor_execute', self._on_execute)
+        return False
+
+
+@contextmanager
+def assert_max_queries(limit, engine=None):
+    """Blok limit'ten fazla sorgu çalıştırırsa AssertionError fırlat"""
+    with QueryCounter(engine) as counter:
+        yield counter
+    if counter.count > limit:
+        statements = '\n'.join(f'  {i + 1}. {s}' for i, s in enumerate(counter.statements))
+        raise AssertionError(f'{counter.count} sorgu çalıştı (limit {limit}):\n{statements}')
@@ -0,0 +1,182 @@
+"""Yeniden bağlanma: askıya alınan socket oturumları ve oda olay tekrarı
+
+Mobil istemcinin WebSocket'i birkaç saniyeliğine koptuğunda tam katılım
+(REST + join_room + member_joined yayını) yapılmaz. Kopan socket'in
+odaları bir bekleme penceresi boyunca askıda tutulur; istemci bu sürede
+'resume' ile dönerse odasına veritabanına dokunmadan geri alınır ve
+kaçırdığı oda olayları küçük bir tekrar tamponundan gönderilir.
+
+Her oda yayını artan bir seq ile tampona yazılır. Tampon birden fazla
+worker'da Redis'te paylaşılır (yayınlar her worker'dan gelebilir); askıdaki
+oturumlar ise bağlantının kurulduğu worker'da tutulur (nginx ip_hash ile
+istemci aynı worker'a döner).
+"""
+import json
+import threading
+import time
+from collections import deque
+
+
+class ReplayBuffer:
+    """Süreç içi oda olay tamponu (varsayılan)"""
+
+    def __init__(self, size=200):
+        self.size = size
+        self._rooms = {}
+        self._seq = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.size = app.config.get('REPLAY_BUFFER_SIZE', self.size)
+        app.extensions['replay'] = self
+
+    def record(self, room_id, event, data):
+        """Olayı tampona ekle ve seq'ini döndür"""
+        with self._lock:
+            seq = self._seq.get(room_id, 0) + 1
+            self._seq[room_id] = seq
+            events = self._rooms.get(room_id)
+            if events is None:
+                events = self._rooms[room_id] = deque(maxlen=self.size)
+            events.append((seq, event, data))
+            return seq
+
+    def current(self, room_id):
+        with self._lock:
+            return self._seq.get(room_id, 0)
+
+    def since(self, room_id, seq):
+        """seq'ten sonraki olaylar; tampon o kadar geriye gitmiyorsa None"""
+        with self._lock:
+            events = list(self._rooms.get(room_id, ()))
+            current = self._seq.get(room_id, 0)
+        return _after(events, seq, current)
+
+    def discard_room(self, room_id):
+        with self._lock:
+            self._rooms.pop(room_id, None)
+            self._seq.pop(room_id, None)
+
+
+class RedisReplayBuffer:
+    """Birden fazla worker'ın paylaştığı Redis tamponu
+
+    seq {prefix}:seq:<room> sayacından INCR ile alınır; olaylar
+    {prefix}:events:<room> listesinde son `size` kayıtla sınırlı tutulur.
+    """
+
+    def __init__(self, url=None, client=None, prefix='replay', size=200):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.redis = client
+        self.prefix = prefix
+        self.size = size
+        self.ttl = 3600
+
+    def init_app(self, app):
+        self.size = app.config.get('REPLAY_BUFFER_SIZE', self.size)
+        app.extensions['replay'] = self
+
+    def _keys(self, room_id):
+        return f'{self.prefix}:seq:{room_id}', f'{self.prefix}:events:{room_id}'
+
+    def record(self, room_id, event, data):
+        seq_key, events_key = self._keys(room_id)
+        seq = self.redis.incr(seq_key)
+        pipe = self.redis.pipeline()
+        pipe.rpush(events_key, json.dumps([seq, event, data]))
+        pipe.ltrim(events_key, -self.size, -1)
+        pipe.expire(events_key, self.ttl)
+        pipe.expire(seq_key, self.ttl)
+        pipe.execute()
+        return seq
+
+    def current(self, room_id):
+        return int(self.redis.get(self._keys(room_id)[0]) or 0)
+
+    def since(self, room_id, seq):
+        seq_key, events_key = self._keys(room_id)
+        pipe = self.redis.pipeline()
+        pipe.lrange(events_key, 0, -1)
+        pipe.get(seq_key)
+        raw, current = pipe.execute()
+        # Aynı anda yazan worker'lar listeye sırasız ekleyebilir
+        events = sorted(tuple(json.loads(item)) for item in raw)
+        return _after(events, seq, int(current or 0))
+
+    def discard_room(self, room_id):
+        self.redis.delete(*self._keys(room_id))
+
+
+def _after(events, seq, current):
+    if seq >= current:
+        return []
+    missed = [event for event in events if event[0] > seq]
+    if not missed or missed[0][0] != seq + 1:
+        return None
+    return missed
+
+
+class SocketSessions:
+    """sid başına katılınan odalar ve kopan bağlantıların bekleme penceresi"""
+
+    def __init__(self, grace=30):
+        self.grace = grace
+        self._rooms = {}
+        self._suspended = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.grace = app.config.get('SOCKET_RESUME_GRACE', self.grace)
+        app.extensions['socket_sessions'] = self
+
+    def track(self, sid, user_id, room_id):
+        with self._lock:
+            self._rooms.setdefault(sid, (user_id, set()))[1].add(room_id)
+            self._suspended.pop((user_id, room_id), None)
+
+    def untrack(self, sid, room_id):
+        with self._lock:
+            entry = self._rooms.get(sid)
+            if entry:
+                entry[1].discard(room_id)
+
+    def suspend(self, sid):
+        """Kopan socket'in odalarını pencere sonuna kadar askıya al"""
+        with self._lock:
+            entry = self._rooms.pop(sid, None)
+            if entry is None:
+                return 0
+            user_id, room_ids = entry
+            deadline = time.monotonic() + self.grace
+            for room_id in room_ids:
+                self._suspended[(user_id, room_id)] = deadline
+            return len(room_ids)
+
+    def resume(self, user_id, room_id):
+        """Pencere dolmadan dönen kullanıcının askıdaki üyeliğini devral"""
+        with self._lock:
+            deadline = self._suspended.pop((user_id, room_id), None)
+            return deadline is not None and deadline > time.monotonic()
+
+    def expired(self):
+        """Penceresi dolan ve bu worker'da başka socket'le dönmemiş (user_id, room_id) çiftleri"""
+        now = time.monotonic()
+        with self._lock:
+            keys = [key for key, deadline in self._suspended.items() if deadline <= now]
+            for key in keys:
+                del self._suspended[key]
+            live = {(user_id, room_id) for user_id, room_ids in self._rooms.values() for room_id in room_ids}
+        return [key for key in keys if key not in live]
+
+    def discard_room(self, room_id):
+        with self._lock:
+            for key in [key for key in self._suspended if key[1] == room_id]:
+                del self._suspended[key]
+            for _, room_ids in self._rooms.values():
+                room_ids.discard(room_id)
+
+    def suspended(self):
+        with self._lock:
+            return len(self._suspended)
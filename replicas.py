@@ -0,0 +1,235 @@
+"""Salt okunur uçların okuma replikalarına yönlendirilmesi
+
+DATABASE_REPLICA_URLS verildiğinde her replika SQLALCHEMY_BINDS'te
+replica_<n> adlı bir bind olur. @replicas.read_only ile işaretlenen uç ve
+socket handler'larında session'ın SELECT'leri sağlıklı bir replikaya gider
+(sırayla); flush ve INSERT/UPDATE/DELETE her zaman birincil sunucudadır.
+
+Kendi yazdığını okuma: bir kullanıcının isteği commit ettiğinde kullanıcı
+REPLICA_STICKY_SECONDS boyunca birincil sunucudan okur (ör. join_room_api'den
+hemen sonra üye listesi). Çok worker'da bu işaret Redis'te tutulur.
+
+Yük devri: replikada bağlantı hatası olursa replika REPLICA_RETRY_AFTER
+saniye devre dışı kalır ve istek birincil sunucuda tekrar çalıştırılır
+(istek salt okunur olduğu için güvenlidir). Gecikme ölçümü için birincil
+sunucuya periyodik olarak replica_heartbeat satırı yazılır; replikadaki
+değerin yaşı gecikmedir. Gecikmesi REPLICA_MAX_LAG'ı aşan replika da
+yakalayana kadar kullanılmaz.
+"""
+import functools
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime
+
+from flask import g, has_request_context, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, exc, select, update
+
+logger = logging.getLogger(__name__)
+
+
+class RoutingSession(Session):
+    """info['replica'] ayarlıyken okumaları o engine'e yönlendiren session"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        replica = self.info.get('replica')
+        if replica is not None and bind is None and not self._flushing and not getattr(clause, 'is_dml', False):
+            return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _flushed(session, flush_context):
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _executed(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+
+def replica_binds(urls, options):
+    """SQLALCHEMY_BINDS girdileri: options(url) her replikanın engine seçenekleri"""
+    return {f'replica_{i}': dict(options(url), url=url) for i, url in enumerate(urls)}
+
+
+class StickyWrites:
+    """Yakın zamanda yazan kullanıcılar (worker içi)"""
+
+    def __init__(self, window=5):
+        self.window = window
+        self._until = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._until) > 10000:
+                self._until = {key: until for key, until in self._until.items() if until > now}
+            self._until[user_id] = now + self.window
+
+    def recent(self, user_id):
+        with self._lock:
+            return self._until.get(user_id, 0) > time.monotonic()
+
+
+class RedisStickyWrites:
+    """Birden fazla worker'ın paylaştığı, süreli Redis anahtarlı yazma işaretleri"""
+
+    def __init__(self, url=None, client=None, prefix='replicas', window=5):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.redis = client
+        self.prefix = prefix
+        self.window = window
+
+    def _key(self, user_id):
+        return f'{self.prefix}:wrote:{user_id}'
+
+    def mark(self, user_id):
+        self.redis.set(self._key(user_id), 1, px=int(self.window * 1000))
+
+    def recent(self, user_id):
+        return bool(self.redis.exists(self._key(user_id)))
+
+
+class ReplicaRouter:
+    """Replika seçimi, kendi yazdığını okuma, yük devri ve gecikme ölçümü"""
+
+    def __init__(self, sticky=None):
+        self.sticky = sticky or StickyWrites()
+        self.max_lag = 10
+        self.retry_after = 30
+        self.binds = []
+        self.db = None
+        self.heartbeat_model = None
+        self._fallbacks = None
+        self._down = {}
+        self._lag = {}
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def init_app(self, app, db, heartbeat_model, metrics=None):
+        self.db = db
+        self.heartbeat_model = heartbeat_model
+        self.sticky.window = app.config.get('REPLICA_STICKY_SECONDS', self.sticky.window)
+        self.max_lag = app.config.get('REPLICA_MAX_LAG', self.max_lag)
+        self.retry_after = app.config.get('REPLICA_RETRY_AFTER', self.retry_after)
+        self.binds = sorted(key for key in app.config.get('SQLALCHEMY_BINDS', {}) if key.startswith('replica_'))
+        event.listen(RoutingSession, 'after_commit', self._committed)
+        app.after_request(self._after_request)
+        app.extensions['replicas'] = self
+        if metrics is not None:
+            self._fallbacks = metrics.counter('db_replica_fallbacks_total',
+                                              'Replika hatası nedeniyle birincilde tekrarlanan okumalar', ('replica',))
+            metrics.gauge_callback('db_replica_lag_seconds', 'Replikaların son ölçülen gecikmesi',
+                                   self.lags, ('replica',))
+
+    # Kendi yazdığını okuma
+    def _current_user(self):
+        return flask_session.get('user_id') if has_request_context() else None
+
+    def _committed(self, session):
+        if not session.info.pop('wrote', False) or not has_request_context():
+            return
+        g.replica_wrote = True
+        user_id = self._current_user()
+        if user_id:
+            self.sticky.mark(user_id)
+
+    def _after_request(self, response):
+        # Kullanıcı commit'ten sonra oturuma yazıldıysa (kayıt, giriş) burada işaretlenir
+        if g.get('replica_wrote'):
+            user_id = self._current_user()
+            if user_id:
+                self.sticky.mark(user_id)
+        return response
+
+    # Replika seçimi
+    def _healthy(self, bind):
+        return self._down.get(bind, 0) <= time.monotonic() and self._lag.get(bind, 0) <= self.max_lag
+
+    def pick(self):
+        """Okumanın gideceği bind; birincil sunucu gerekiyorsa None"""
+        if not self.binds:
+            return None
+        user_id = self._current_user()
+        if user_id and self.sticky.recent(user_id):
+            return None
+        healthy = [bind for bind in self.binds if self._healthy(bind)]
+        if not healthy:
+            return None
+        return healthy[next(self._turn) % len(healthy)]
+
+    def mark_down(self, bind, error):
+        with self._lock:
+            self._down[bind] = time.monotonic() + self.retry_after
+        logger.warning('Replika devre dışı (%ss): %s: %s', self.retry_after, bind, error)
+
+    def read_only(self, f):
+        """Handler'ın okumalarını replikaya yönlendir; replika hatasında birincilde tekrarla"""
+        @functools.wraps(f)
+        def wrapper(*args, **kwargs):
+            bind = self.pick()
+            if bind is None:
+                return f(*args, **kwargs)
+            session = self.db.session()
+            session.info['replica'] = self.db.engines[bind]
+            try:
+                return f(*args, **kwargs)
+            except (exc.OperationalError, exc.InterfaceError) as e:
+                self.mark_down(bind, e)
+                session.info.pop('replica', None)
+                self.db.session.rollback()
+                if self._fallbacks is not None:
+                    self._fallbacks.inc((bind,))
+                return f(*args, **kwargs)
+            finally:
+                session.info.pop('replica', None)
+        return wrapper
+
+    # Gecikme ölçümü
+    def heartbeat(self):
+        """Birincile zaman damgası yaz, her replikadaki damganın yaşını ölç (arka plan işi)"""
+        if not self.binds:
+            return 0
+        model = self.heartbeat_model
+        with self.db.engine.begin() as conn:
+            if not conn.execute(update(model).where(model.id == 1).values(beat_at=datetime.utcnow())).rowcount:
+                conn.execute(model.__table__.insert().values(id=1, beat_at=datetime.utcnow()))
+        for bind in self.binds:
+            try:
+                with self.db.engines[bind].connect() as conn:
+                    beat_at = conn.execute(select(model.beat_at).where(model.id == 1)).scalar()
+            except exc.DBAPIError as e:
+                self.mark_down(bind, e)
+                continue
+            if beat_at is None:
+                # İlk damga henüz replikaya ulaşmadı
+                self.mark_down(bind, 'heartbeat row not replicated yet')
+                continue
+            with self._lock:
+                self._lag[bind] = max(0.0, (datetime.utcnow() - beat_at).total_seconds())
+                self._down.pop(bind, None)
+        return len(self.binds)
+
+    def lags(self):
+        """Bind -> son ölçülen gecikme (saniye); metrik için"""
+        with self._lock:
+            return {(bind,): lag for bind, lag in self._lag.items()}
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                bind: {
+                    'lag_seconds': self._lag.get(bind),
+                    'down_for': max(0, round(self._down.get(bind, 0) - now, 1)),
+                    'in_use': self._healthy(bind)
+                }
+                for bind in self.binds
+            }
@@ -0,0 +1,54 @@
+"""Versiyonlu oda katılımcı listesi (roster)
+
+Her odanın katılımcı listesi tek artan bir versiyon numarası taşır. Sunucu
+tüm listeyi yayınlamak yerine member_joined / member_left / member_changed /
+speaking_state delta olaylarını versiyonla birlikte gönderir; istemci
+versiyon boşluğu gördüğünde /api/rooms/<id>/roster ile tam listeyi yeniden
+alır.
+"""
+import threading
+
+
+class RosterVersions:
+    """Oda başına artan roster versiyonu"""
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def current(self, room_id):
+        with self._lock:
+            return self._versions.get(room_id, 0)
+
+    def bump(self, room_id):
+        with self._lock:
+            version = self._versions.get(room_id, 0) + 1
+            self._versions[room_id] = version
+            return version
+
+    def discard(self, room_id):
+        with self._lock:
+            self._versions.pop(room_id, None)
+
+
+class RedisRosterVersions:
+    """Birden fazla worker'ın paylaştığı Redis sayaçlı roster versiyonu"""
+
+    def __init__(self, url=None, client=None, prefix='roster'):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.redis = client
+        self.prefix = prefix
+
+    def _key(self, room_id):
+        return f'{self.prefix}:version:{room_id}'
+
+    def current(self, room_id):
+        return int(self.redis.get(self._key(room_id)) or 0)
+
+    def bump(self, room_id):
+        return self.redis.incr(self._key(room_id))
+
+    def discard(self, room_id):
+        self.redis.delete(self._key(room_id))
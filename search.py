@@ -0,0 +1,203 @@
+"""Oda araması: ad, açıklama ve sahip adı üzerinde önek eşleşmeli ters indeks
+
+Lobi tüm oda listesini indirip tarayıcıda süzmek yerine /api/rooms/search'e
+sorar. Aktif public odaların metinleri kelimelere bölünür (küçük harf,
+Türkçe karakterler ve aksanlar sadeleştirilir: "Öğrenci" -> "ogrenci") ve
+kelime -> {oda id: ağırlık} eşlemesinde tutulur. Kelimeler ayrıca sıralı bir
+listede durur; sorgudaki her terim bu listede ikili aramayla önek olarak
+genişletilir ("müz" -> "muzik", "muzisyen").
+
+Her terim en az bir alanda eşleşmelidir (AND). Skor terim başına en iyi
+eşleşmenin ağırlığıdır: ad > sahip adı > açıklama, tam kelime eşleşmesi
+öneke göre iki kat. Eşitlikte yeni oda önce gelir. Terim sayısı ve önek
+genişlemesi sınırlıdır; adaylar skor katmanlarıyla yüksekten düşüğe
+toplanıp max_candidates'te kesilir. Kesilen sorgularda toplam yaklaşıktır.
+
+İndeks worker başına bellektedir: oda oluşturma ve kapatma anında
+güncellenir, başka worker'larda yapılan değişiklikler periyodik yeniden
+yüklemeyle (SEARCH_INDEX_REFRESH) gelir. Sonuç sayfası veritabanından
+güncel haliyle okunduğu için kapanmış bir oda hiçbir zaman döndürülmez.
+"""
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+
+from models import db, User, Room
+
+# Alan -> ağırlık
+WEIGHTS = {'name': 3, 'owner_name': 2, 'description': 1}
+_FIELD_WEIGHTS = set(WEIGHTS.values())
+
+_FOLD = str.maketrans('ıİ', 'ii')
+_WORD = re.compile(r'\w+')
+_COMBINING = re.compile('[\u0300-\u036f]')
+
+
+def normalize(text):
+    """Küçük harf, aksansız ve Türkçe noktasız i'siz metin"""
+    text = (text or '').translate(_FOLD).casefold()
+    if text.isascii():
+        return text
+    return _COMBINING.sub('', unicodedata.normalize('NFKD', text))
+
+
+def tokenize(text):
+    return _WORD.findall(normalize(text))
+
+
+class RoomSearchIndex:
+    """Worker içi ters indeks; sorgu sonucu skor sırasıyla oda id'leridir"""
+
+    def __init__(self, max_terms=5, prefix_expansion=100, max_candidates=5000):
+        self.max_terms = max_terms
+        self.prefix_expansion = prefix_expansion
+        self.max_candidates = max_candidates
+        self.loaded = False
+        self._postings = {}
+        self._vocab = []
+        self._docs = {}
+        self._created = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_terms = app.config.get('SEARCH_MAX_TERMS', self.max_terms)
+        self.prefix_expansion = app.config.get('SEARCH_PREFIX_EXPANSION', self.prefix_expansion)
+        self.max_candidates = app.config.get('SEARCH_MAX_CANDIDATES', self.max_candidates)
+        app.extensions['room_search'] = self
+
+    @staticmethod
+    def _weights(name, description, owner_name):
+        """Kelime -> o odadaki en yüksek alan ağırlığı"""
+        weights = {}
+        for field, text in (('name', name), ('owner_name', owner_name), ('description', description)):
+            for token in tokenize(text):
+                weights[token] = max(weights.get(token, 0), WEIGHTS[field])
+        return weights
+
+    def _insert(self, room_id, weights, created_at):
+        """Kilit içinde çağrılır"""
+        self._remove(room_id)
+        self._docs[room_id] = tuple(weights)
+        self._created[room_id] = created_at.timestamp() if created_at else 0
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                bisect.insort(self._vocab, token)
+            postings[room_id] = weight
+
+    def _remove(self, room_id):
+        """Kilit içinde çağrılır"""
+        tokens = self._docs.pop(room_id, None)
+        if tokens is None:
+            return
+        del self._created[room_id]
+        for token in tokens:
+            postings = self._postings[token]
+            postings.pop(room_id, None)
+            if not postings:
+                del self._postings[token]
+                del self._vocab[bisect.bisect_left(self._vocab, token)]
+
+    def add(self, room_id, name, description, owner_name, created_at):
+        weights = self._weights(name, description, owner_name)
+        with self._lock:
+            self._insert(room_id, weights, created_at)
+
+    def remove(self, room_id):
+        with self._lock:
+            self._remove(room_id)
+
+    def rebuild(self):
+        """Aktif public odaları veritabanından yeniden yükle (uygulama bağlamında, 1 sorgu)"""
+        rows = db.session.execute(
+            db.select(Room.id, Room.name, Room.description, User.display_name, Room.created_at)
+            .outerjoin(User, Room.owner_id == User.id)
+            .where(Room.is_active == True, Room.is_public == True)  # noqa: E712
+        ).all()
+        postings, docs, created = {}, {}, {}
+        for row in rows:
+            weights = self._weights(row.name, row.description, row.display_name)
+            docs[row.id] = tuple(weights)
+            created[row.id] = row.created_at.timestamp() if row.created_at else 0
+            for token, weight in weights.items():
+                postings.setdefault(token, {})[row.id] = weight
+        vocab = sorted(postings)
+        with self._lock:
+            self._postings, self._vocab, self._docs, self._created = postings, vocab, docs, created
+            self.loaded = True
+        return len(rows)
+
+    def ensure_loaded(self):
+        if not self.loaded:
+            self.rebuild()
+
+    def _expand(self, term):
+        """Terimle başlayan kelimeler: {kelime: çarpan}; tam eşleşme iki kat (kilit içinde)"""
+        start = bisect.bisect_left(self._vocab, term)
+        matches = {}
+        for token in self._vocab[start:start + self.prefix_expansion]:
+            if not token.startswith(term):
+                break
+            matches[token] = 2 if token == term else 1
+        return matches
+
+    def _term_scores(self, expansion):
+        """Oda id -> terimin o odadaki en iyi skoru ve adayların kesilip kesilmediği (kilit içinde)
+
+        Adaylar skor katmanlarıyla (tam kelime adı 6, ..., önek açıklama 1)
+        yüksekten düşüğe toplanır. Sınırı aşan katmandan en yeni odalar tutulur,
+        böylece kesilen aday kümesi tek terimde sonuç sırasıyla birebir aynıdır.
+        """
+        scores = {}
+        tiers = sorted({weight * factor for factor in expansion.values() for weight in WEIGHTS.values()},
+                       reverse=True)
+        for score in tiers:
+            tier = set()
+            for token, factor in expansion.items():
+                weight = score / factor
+                if weight in _FIELD_WEIGHTS:
+                    tier.update([room_id for room_id, room_weight in self._postings[token].items()
+                                 if room_weight == weight])
+            tier.difference_update(scores)
+            room = self.max_candidates - len(scores)
+            if len(tier) > room:
+                # Katman sığmıyor: eşit skorda sıralama gibi yeni odalar tutulur
+                tier = heapq.nlargest(room, tier, key=self._created.__getitem__)
+                scores.update(dict.fromkeys(tier, score))
+                return scores, True
+            scores.update(dict.fromkeys(tier, score))
+        return scores, False
+
+    def search(self, query, limit, offset=0):
+        """Skor sırasıyla [oda id] sayfası, toplam eşleşme sayısı ve toplamın yaklaşık olup olmadığı
+
+        Çok terimli sorguda adaylar en az eşleşmesi olan terimden toplanır,
+        diğer terimler her adayın kendi kelimelerinde denetlenir (AND). Toplam
+        yalnızca bu terimin adayları sınırı aştığında yaklaşıktır.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))[:self.max_terms]
+        if not terms:
+            return [], 0, False
+        with self._lock:
+            expansions = [self._expand(term) for term in terms]
+            expansions.sort(key=lambda expansion: sum(len(self._postings[token]) for token in expansion))
+            scores, approximate = self._term_scores(expansions[0])
+            for expansion in expansions[1:]:
+                # Adayın kendi kelimelerinde terimin en iyi skoru; 0 ise eşleşmez
+                combined = {}
+                tokens = expansion.keys()
+                for room_id, score in scores.items():
+                    matched = tokens & self._docs[room_id]
+                    if matched:
+                        combined[room_id] = score + max(self._postings[token][room_id] * expansion[token]
+                                                        for token in matched)
+                scores = combined
+            page = heapq.nsmallest(offset + limit, scores,
+                                   key=lambda room_id: (-scores[room_id], -self._created[room_id], room_id))
+        return page[offset:], len(scores), approximate
+
+    def __len__(self):
+        return len(self._docs)
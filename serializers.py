@@ -0,0 +1,229 @@
+"""API yanıtları için hafif projeksiyonlar
+
+Listeleme uçları ORM nesnelerini yükleyip her satırda to_dict() ile ilişkili
+User'ı ayrıca sorgulamak yerine (1+N sorgu) gereken kolonları tek bir JOIN
+sorgusuyla seçer. Tek nesne yayınlarında ise member_payload gibi aynı şekli
+üreten ORM tabanlı yardımcılar kullanılır.
+
+Satır -> sözlük dönüştürücüleri (room_row_to_dict, ...) modül yüklenirken
+kolon listesinden bir kez derlenir: her biri satırı sıra numarasıyla okuyup
+tek bir dict literal'i döndüren düz bir fonksiyondur; çağrı başına isimle
+kolon araması ya da ara sözlük kurulmaz.
+"""
+import base64
+import json
+from datetime import datetime
+
+from models import db, User, Room, RoomMember, SpeakingRequest
+
+
+def _iso(value):
+    return value.isoformat() if value else None
+
+
+def compile_row(name, columns, layout):
+    """Sorgu satırını layout şeklinde sözlüğe çeviren fonksiyonu derle
+
+    layout öğeleri: 'kolon' (aynı isimle), ('anahtar', 'kolon') ya da iç içe
+    sözlük için ('anahtar', (layout...)). DateTime kolonları ISO metne çevrilir.
+    """
+    index = {column.key: i for i, column in enumerate(columns)}
+    dates = {column.key for column in columns if isinstance(column.type, db.DateTime)}
+
+    def literal(layout):
+        parts = []
+        for item in layout:
+            key, source = (item, item) if isinstance(item, str) else item
+            if isinstance(source, tuple):
+                value = literal(source)
+            elif source in dates:
+                value = f'_iso(row[{index[source]}])'
+            else:
+                value = f'row[{index[source]}]'
+            parts.append(f'{key!r}: {value}')
+        return '{' + ', '.join(parts) + '}'
+
+    namespace = {'_iso': _iso}
+    exec(f'def {name}(row):\n    return {literal(layout)}\n', namespace)
+    return namespace[name]
+
+
+# Satırdaki kullanıcı kolonlarından _user_summary şekli
+USER_SUMMARY = (('id', 'user_id'), 'username', 'display_name', 'avatar_url')
+
+
+def _user_summary(user_id, username, display_name, avatar_url):
+    return {
+        'id': user_id,
+        'username': username,
+        'display_name': display_name,
+        'avatar_url': avatar_url
+    }
+
+
+# Oda listesi / detayı
+ROOM_COLUMNS = (
+    Room.id, Room.name, Room.description, Room.is_public, Room.max_participants,
+    Room.current_participants, Room.is_active, Room.created_at, Room.owner_id,
+    User.display_name.label('owner_name')
+)
+
+
+def room_query():
+    """Oda + sahip adını tek sorguda seçen temel sorgu"""
+    return db.select(*ROOM_COLUMNS).outerjoin(User, Room.owner_id == User.id)
+
+
+room_row_to_dict = compile_row('room_row_to_dict', ROOM_COLUMNS, (
+    'id', 'name', 'description', 'is_public', 'max_participants', 'current_participants',
+    'is_active', 'created_at', 'owner_id', 'owner_name'
+))
+
+
+# Oda dizini sıralamaları: ad -> (sıralama kolonu, cursor değerini çözen fonksiyon)
+ROOM_SORTS = {
+    'created_at': (Room.created_at, datetime.fromisoformat),
+    'participants': (Room.current_participants, int),
+}
+
+
+def encode_cursor(sort, row):
+    value = row.created_at.isoformat() if sort == 'created_at' else row.current_participants
+    raw = json.dumps([value, row.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(sort, cursor):
+    """Cursor'ı (değer, oda id) ikilisine çöz; bozuksa ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, room_id = json.loads(raw)
+        return ROOM_SORTS[sort][1](value), str(room_id)
+    except (TypeError, ValueError, KeyError) as e:
+        raise ValueError('Invalid cursor') from e
+
+
+def public_rooms_page(sort='created_at', limit=50, cursor=None):
+    """Aktif public odaların keyset sayfası (1 sorgu): (odalar, sonraki cursor)
+
+    Sıralama kolonu azalan, eşitlikte oda id artan sıradadır; cursor son
+    satırın (değer, id) ikilisidir, böylece OFFSET taraması yapılmaz.
+    """
+    column = ROOM_SORTS[sort][0]
+    query = room_query().where(Room.is_active == True, Room.is_public == True)
+    if cursor:
+        value, room_id = decode_cursor(sort, cursor)
+        query = query.where(db.or_(column < value, db.and_(column == value, Room.id > room_id)))
+    query = query.order_by(column.desc(), Room.id.asc()).limit(limit + 1)
+
+    rows = db.session.execute(query).all()
+    next_cursor = encode_cursor(sort, rows[limit - 1]) if len(rows) > limit else None
+    return [room_row_to_dict(row) for row in rows[:limit]], next_cursor
+
+
+def room_detail(room_id):
+    """Tek oda detayı (1 sorgu); oda yoksa None"""
+    row = db.session.execute(room_query().where(Room.id == room_id)).first()
+    return room_row_to_dict(row) if row else None
+
+
+def rooms_by_ids(room_ids):
+    """Verilen sıradaki aktif public odalar (1 sorgu); kapanmış/bulunmayan odalar atlanır"""
+    if not room_ids:
+        return []
+    rows = db.session.execute(
+        room_query().where(Room.id.in_(room_ids), Room.is_active == True, Room.is_public == True)
+    )
+    rooms = {row.id: room_row_to_dict(row) for row in rows}
+    return [rooms[room_id] for room_id in room_ids if room_id in rooms]
+
+
+# Oda üyeleri
+MEMBER_COLUMNS = (
+    RoomMember.id, RoomMember.joined_at, RoomMember.is_speaking, RoomMember.is_muted,
+    RoomMember.can_speak, RoomMember.is_moderator, RoomMember.user_id, RoomMember.room_id,
+    User.username, User.display_name, User.avatar_url
+)
+
+
+member_row_to_dict = compile_row('member_row_to_dict', MEMBER_COLUMNS, (
+    'id', 'joined_at', 'is_speaking', 'is_muted', 'can_speak', 'is_moderator',
+    'user_id', 'room_id', ('user', USER_SUMMARY)
+))
+
+
+def room_members(room_id):
+    """Odanın üyeleri ve kullanıcı özetleri (1 sorgu)"""
+    rows = db.session.execute(
+        db.select(*MEMBER_COLUMNS)
+        .join(User, RoomMember.user_id == User.id)
+        .where(RoomMember.room_id == room_id)
+    )
+    return [member_row_to_dict(row) for row in rows]
+
+
+def member_payload(member):
+    """Tek RoomMember nesnesini room_members ile aynı şekle çevir"""
+    user = member.user
+    return {
+        'id': member.id,
+        'joined_at': _iso(member.joined_at),
+        'is_speaking': member.is_speaking,
+        'is_muted': member.is_muted,
+        'can_speak': member.can_speak,
+        'is_moderator': member.is_moderator,
+        'user_id': member.user_id,
+        'room_id': member.room_id,
+        'user': _user_summary(user.id, user.username, user.display_name, user.avatar_url) if user else None
+    }
+
+
+# Konuşma istekleri
+REQUEST_COLUMNS = (
+    SpeakingRequest.id, SpeakingRequest.status, SpeakingRequest.requested_at,
+    SpeakingRequest.responded_at, SpeakingRequest.user_id, SpeakingRequest.room_id,
+    User.username, User.display_name, User.avatar_url
+)
+
+
+request_row_to_dict = compile_row('request_row_to_dict', REQUEST_COLUMNS, (
+    'id', 'status', 'requested_at', 'responded_at', 'user_id', 'room_id', ('user', USER_SUMMARY)
+))
+
+
+def pending_requests(room_id):
+    """Odanın bekleyen konuşma istekleri (1 sorgu)"""
+    rows = db.session.execute(
+        db.select(*REQUEST_COLUMNS)
+        .join(User, SpeakingRequest.user_id == User.id)
+        .where(SpeakingRequest.room_id == room_id, SpeakingRequest.status == 'pending')
+    )
+    return [request_row_to_dict(row) for row in rows]
+
+
+def request_payload(request_obj):
+    """Tek SpeakingRequest nesnesini pending_requests ile aynı şekle çevir"""
+    user = request_obj.user
+    return {
+        'id': request_obj.id,
+        'status': request_obj.status,
+        'requested_at': _iso(request_obj.requested_at),
+        'responded_at': _iso(request_obj.responded_at),
+        'user_id': request_obj.user_id,
+        'room_id': request_obj.room_id,
+        'user': _user_summary(user.id, user.username, user.display_name, user.avatar_url) if user else None
+    }
+
+
+def invite_payload(row):
+    """create_invites satır sözlüğünü RoomInvite.to_dict ile aynı şekle çevir"""
+    return {
+        'id': row['id'],
+        'invite_code': row['invite_code'],
+        'is_used': row['is_used'],
+        'created_at': _iso(row['created_at']),
+        'used_at': None,
+        'room_id': row['room_id'],
+        'invited_by': row['invited_by'],
+        'used_by': None
+    }
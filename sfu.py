@@ -0,0 +1,315 @@
+"""Sahne (stage) modu için ses yönlendirme servisi (SFU)
+
+Büyük odalarda her katılımcının herkese bağlandığı mesh yerine bu servis
+kullanılır: konuşma yetkisi (can_speak) olan üyeler sesini tek bir bağlantıyla
+servise yayınlar (publish), her üye de tek bir bağlantıyla servisten odadaki
+yayıncıları alır (subscribe). Böylece istemci başına yukarı yönlü akış sayısı
+N-1'den en fazla 1'e iner. Her yayıncının sesi serviste bir kez kodlanır ve
+aynı Opus paketleri tüm abonelere gönderilir; abone sayısı arttıkça yalnızca
+paketleme ve şifreleme maliyeti artar.
+
+Servis aiortc ile yazılmış ayrı bir asyncio sürecidir; Flask uygulaması
+(eventlet) sinyal mesajlarını yetki kontrolünden sonra bu servisin HTTP
+arayüzüne iletir:
+
+    POST   /rooms/<room_id>/publish      {user_id, offer} -> {answer}
+    POST   /rooms/<room_id>/subscribe    {user_id, offer} -> {answer, tracks}
+    POST   /rooms/<room_id>/unpublish    {user_id}
+    POST   /rooms/<room_id>/leave        {user_id}
+    DELETE /rooms/<room_id>
+    GET    /stats
+
+    python sfu.py --host 127.0.0.1 --port 5100
+
+SFU_TOKEN ortam değişkeni verilirse her istekte X-SFU-Token başlığı aranır.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from aiohttp import web
+from aiortc import RTCConfiguration, RTCIceServer, RTCPeerConnection, RTCSessionDescription
+from aiortc.codecs.opus import OpusEncoder, SAMPLES_PER_FRAME, TIME_BASE
+from aiortc.mediastreams import MediaStreamError, MediaStreamTrack
+from av.packet import Packet
+
+
+def _description(data):
+    return RTCSessionDescription(sdp=data['sdp'], type=data['type'])
+
+
+def _local_description(pc):
+    return {'sdp': pc.localDescription.sdp, 'type': pc.localDescription.type}
+
+
+async def _close_subscriber(pc):
+    # İletilen izler durdurulmazsa yayıncı paketleri kapanmış kuyruğa yazmaya devam eder
+    for sender in pc.getSenders():
+        if sender.track is not None:
+            sender.track.stop()
+    await pc.close()
+
+
+class ForwardedTrack(MediaStreamTrack):
+    """Yayıncının kodlanmış paketlerini tek bir aboneye ileten iz"""
+
+    kind = 'audio'
+
+    def __init__(self, fanout, queue_size=50):
+        super().__init__()
+        self.fanout = fanout
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def push(self, packet):
+        # Yavaş abone yayıncıyı bekletmez; en eski paket düşürülür
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(packet)
+
+    async def recv(self):
+        packet = await self.queue.get()
+        if packet is None:
+            self.stop()
+            raise MediaStreamError
+        return packet
+
+    def stop(self):
+        super().stop()
+        self.fanout.subscribers.discard(self)
+
+
+class EncodedFanout:
+    """Yayıncının sesini bir kez kodlayıp paketleri tüm abonelere dağıtan yardımcı"""
+
+    def __init__(self, track):
+        self.track = track
+        self.subscribers = set()
+        self.encoder = OpusEncoder()
+        self.task = asyncio.ensure_future(self._run())
+
+    def subscribe(self):
+        forwarded = ForwardedTrack(self)
+        self.subscribers.add(forwarded)
+        return forwarded
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                frame = await self.track.recv()
+                if not self.subscribers:
+                    continue
+                payloads, timestamp = await loop.run_in_executor(None, self.encoder.encode, frame)
+                for i, payload in enumerate(payloads):
+                    packet = Packet(payload)
+                    packet.pts = timestamp + i * SAMPLES_PER_FRAME
+                    packet.time_base = TIME_BASE
+                    for forwarded in list(self.subscribers):
+                        forwarded.push(packet)
+        except MediaStreamError:
+            pass
+        finally:
+            for forwarded in list(self.subscribers):
+                forwarded.push(None)
+
+    def stop(self):
+        self.task.cancel()
+
+
+class SfuRoom:
+    """Bir odanın yayıncı ve abone bağlantıları"""
+
+    def __init__(self):
+        self.publishers = {}   # user_id -> (pc, EncodedFanout)
+        self.subscribers = {}  # user_id -> pc
+
+    def is_empty(self):
+        return not self.publishers and not self.subscribers
+
+
+class SfuRouter:
+    """Yayıncı seslerini abonelere ileten oda yönlendiricisi"""
+
+    def __init__(self, stun_urls=('stun:stun.l.google.com:19302',)):
+        self.rooms = {}
+        self.configuration = RTCConfiguration(iceServers=[RTCIceServer(urls=url) for url in stun_urls])
+        self.started_at = time.time()
+
+    def _room(self, room_id):
+        room = self.rooms.get(room_id)
+        if room is None:
+            room = self.rooms[room_id] = SfuRoom()
+        return room
+
+    def _watch(self, pc, on_closed):
+        @pc.on('connectionstatechange')
+        async def on_state():
+            if pc.connectionState in ('failed', 'closed'):
+                await on_closed()
+
+    async def publish(self, room_id, user_id, offer):
+        """Üyenin ses yayınını al; önceki yayın bağlantısı kapatılır"""
+        await self.unpublish(room_id, user_id)
+        room = self._room(room_id)
+        pc = RTCPeerConnection(self.configuration)
+        tracks = []
+        pc.on('track', lambda track: track.kind == 'audio' and tracks.append(track))
+
+        await pc.setRemoteDescription(_description(offer))
+        await pc.setLocalDescription(await pc.createAnswer())
+        if not tracks:
+            await pc.close()
+            raise ValueError('Offer has no audio track')
+
+        room.publishers[user_id] = (pc, EncodedFanout(tracks[0]))
+        self._watch(pc, lambda: self._drop_publisher(room_id, user_id, pc))
+        return {'answer': _local_description(pc)}
+
+    async def subscribe(self, room_id, user_id, offer):
+        """Odadaki diğer yayıncıları tek bağlantıda gönder
+
+        İstemci teklifinde yayıncı sayısı kadar recvonly ses transceiver'ı
+        bulunur; her biri sırayla bir yayıncıya eşlenir ve hangi mid'in hangi
+        kullanıcıya ait olduğu yanıtla birlikte döner.
+        """
+        await self._drop_subscriber(room_id, user_id)
+        room = self._room(room_id)
+        pc = RTCPeerConnection(self.configuration)
+        await pc.setRemoteDescription(_description(offer))
+
+        sources = [(publisher_id, fanout) for publisher_id, (_, fanout) in room.publishers.items()
+                   if publisher_id != user_id and fanout.track.readyState == 'live']
+        slots = [t for t in pc.getTransceivers() if t.kind == 'audio']
+        tracks = []
+        for transceiver, (publisher_id, fanout) in zip(slots, sources):
+            transceiver.sender.replaceTrack(fanout.subscribe())
+            transceiver.direction = 'sendonly'
+            tracks.append({'mid': transceiver.mid, 'user_id': publisher_id})
+
+        await pc.setLocalDescription(await pc.createAnswer())
+        room.subscribers[user_id] = pc
+        self._watch(pc, lambda: self._drop_subscriber(room_id, user_id, pc))
+        return {'answer': _local_description(pc), 'tracks': tracks}
+
+    async def _drop_publisher(self, room_id, user_id, pc=None):
+        room = self.rooms.get(room_id)
+        entry = room.publishers.get(user_id) if room else None
+        if entry is None or (pc is not None and entry[0] is not pc):
+            return
+        del room.publishers[user_id]
+        entry[1].stop()
+        await entry[0].close()
+        self._prune(room_id)
+
+    async def _drop_subscriber(self, room_id, user_id, pc=None):
+        room = self.rooms.get(room_id)
+        current = room.subscribers.get(user_id) if room else None
+        if current is None or (pc is not None and current is not pc):
+            return
+        del room.subscribers[user_id]
+        await _close_subscriber(current)
+        self._prune(room_id)
+
+    def _prune(self, room_id):
+        room = self.rooms.get(room_id)
+        if room is not None and room.is_empty():
+            del self.rooms[room_id]
+
+    async def unpublish(self, room_id, user_id):
+        await self._drop_publisher(room_id, user_id)
+
+    async def leave(self, room_id, user_id):
+        await self._drop_publisher(room_id, user_id)
+        await self._drop_subscriber(room_id, user_id)
+
+    async def close_room(self, room_id):
+        room = self.rooms.pop(room_id, None)
+        if room is None:
+            return
+        for _, fanout in room.publishers.values():
+            fanout.stop()
+        await asyncio.gather(*(_close_subscriber(pc) for pc in room.subscribers.values()),
+                             *(pc.close() for pc, _ in room.publishers.values()))
+
+    async def close(self):
+        await asyncio.gather(*(self.close_room(room_id) for room_id in list(self.rooms)))
+
+    def stats(self):
+        return {
+            'rooms': {
+                room_id: {'publishers': len(room.publishers), 'subscribers': len(room.subscribers)}
+                for room_id, room in self.rooms.items()
+            },
+            'cpu_seconds': round(time.process_time(), 3),
+            'uptime_seconds': round(time.time() - self.started_at, 1)
+        }
+
+
+def create_app(router=None, token=None):
+    """SfuRouter'ı HTTP üzerinden sunan aiohttp uygulaması"""
+    router = router or SfuRouter()
+
+    @web.middleware
+    async def check_token(request, handler):
+        if token and request.headers.get('X-SFU-Token') != token:
+            return web.json_response({'error': 'Invalid token'}, status=401)
+        return await handler(request)
+
+    async def publish(request):
+        data = await request.json()
+        try:
+            result = await router.publish(request.match_info['room_id'], data['user_id'], data['offer'])
+        except (KeyError, TypeError, ValueError) as e:
+            return web.json_response({'error': str(e) or 'Invalid offer'}, status=400)
+        return web.json_response(result)
+
+    async def subscribe(request):
+        data = await request.json()
+        try:
+            result = await router.subscribe(request.match_info['room_id'], data['user_id'], data['offer'])
+        except (KeyError, TypeError, ValueError) as e:
+            return web.json_response({'error': str(e) or 'Invalid offer'}, status=400)
+        return web.json_response(result)
+
+    async def unpublish(request):
+        data = await request.json()
+        await router.unpublish(request.match_info['room_id'], data.get('user_id'))
+        return web.json_response({'message': 'Unpublished'})
+
+    async def leave(request):
+        data = await request.json()
+        await router.leave(request.match_info['room_id'], data.get('user_id'))
+        return web.json_response({'message': 'Left'})
+
+    async def close_room(request):
+        await router.close_room(request.match_info['room_id'])
+        return web.json_response({'message': 'Room closed'})
+
+    async def stats(request):
+        return web.json_response(router.stats())
+
+    async def on_shutdown(app):
+        await router.close()
+
+    app = web.Application(middlewares=[check_token])
+    app['router'] = router
+    app.router.add_post('/rooms/{room_id}/publish', publish)
+    app.router.add_post('/rooms/{room_id}/subscribe', subscribe)
+    app.router.add_post('/rooms/{room_id}/unpublish', unpublish)
+    app.router.add_post('/rooms/{room_id}/leave', leave)
+    app.router.add_delete('/rooms/{room_id}', close_room)
+    app.router.add_get('/stats', stats)
+    app.on_shutdown.append(on_shutdown)
+    return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='DataFlow SFU servisi')
+    parser.add_argument('--host', default=os.environ.get('SFU_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('SFU_PORT', 5100)))
+    parser.add_argument('--stun', default=os.environ.get('SFU_STUN_URLS', 'stun:stun.l.google.com:19302'),
+                        help='virgülle ayrılmış STUN adresleri (boş: yalnızca yerel adaylar)')
+    args = parser.parse_args()
+    router = SfuRouter(stun_urls=[url for url in args.stun.split(',') if url])
+    web.run_app(create_app(router, token=os.environ.get('SFU_TOKEN')), host=args.host, port=args.port)
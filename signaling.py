@@ -0,0 +1,128 @@
+"""WebRTC sinyal aktarımı (offer / answer / ICE)
+
+İstemciler SDP ve ICE adaylarını Socket.IO üzerinden gönderir; sunucu her
+birini yalnızca alıcının kişisel odasına (user:<id>) iletir. Kısa aralıkta
+art arda gelen ICE adayları tek bir webrtc_ice_candidates olayında toplanır.
+Offer, sunucunun aktarma zamanıyla (relayed_at) gönderilir; karşı taraf bunu
+answer ile geri yollar ve aradaki süre oda başına sinyal gecikmesi olarak
+tutulur. Zaman damgası mesajla taşındığı için offer ve answer farklı
+worker'lara düşse de ölçüm yapılabilir.
+"""
+import threading
+import time
+from collections import deque
+
+
+def user_room(user_id):
+    """Kullanıcının tüm socket'lerinin katıldığı kişisel oda"""
+    return f'user:{user_id}'
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class SignalingStats:
+    """Oda başına sinyal sayaçları ve offer→answer gecikmeleri"""
+
+    def __init__(self, samples=200):
+        self.offers = 0
+        self.answers = 0
+        self.ice_candidates = 0
+        self.ice_batches = 0
+        self.setup_ms = deque(maxlen=samples)
+
+    def to_dict(self):
+        setup = list(self.setup_ms)
+        return {
+            'offers': self.offers,
+            'answers': self.answers,
+            'ice_candidates': self.ice_candidates,
+            'ice_batches': self.ice_batches,
+            'setup_ms': {
+                'samples': len(setup),
+                'avg': round(sum(setup) / len(setup), 2) if setup else None,
+                'p50': round(_percentile(setup, 50), 2) if setup else None,
+                'p95': round(_percentile(setup, 95), 2) if setup else None
+            }
+        }
+
+
+class SignalingRelay:
+    """Sinyal mesajlarını hedef kullanıcıya ileten ve ICE adaylarını toplayan aktarıcı"""
+
+    def __init__(self, socketio, ice_batch_window=0.02):
+        self.socketio = socketio
+        self.ice_batch_window = ice_batch_window
+        self._ice_batches = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _room_stats(self, room_id):
+        stats = self._stats.get(room_id)
+        if stats is None:
+            stats = self._stats[room_id] = SignalingStats()
+        return stats
+
+    def relay_offer(self, room_id, from_user_id, to_user_id, offer):
+        with self._lock:
+            self._room_stats(room_id).offers += 1
+        self.socketio.emit('webrtc_offer', {
+            'room_id': room_id,
+            'from_user_id': from_user_id,
+            'offer': offer,
+            'relayed_at': time.time()
+        }, room=user_room(to_user_id))
+
+    def relay_answer(self, room_id, from_user_id, to_user_id, answer, offer_relayed_at=None):
+        with self._lock:
+            stats = self._room_stats(room_id)
+            stats.answers += 1
+            if isinstance(offer_relayed_at, (int, float)):
+                elapsed = (time.time() - offer_relayed_at) * 1000
+                if 0 <= elapsed < 60000:
+                    stats.setup_ms.append(elapsed)
+        self.socketio.emit('webrtc_answer', {
+            'room_id': room_id,
+            'from_user_id': from_user_id,
+            'answer': answer
+        }, room=user_room(to_user_id))
+
+    def queue_ice_candidate(self, room_id, from_user_id, to_user_id, candidate):
+        """Adayı topla; pencere içindeki ilk aday gönderimi zamanlar"""
+        key = (room_id, from_user_id, to_user_id)
+        with self._lock:
+            self._room_stats(room_id).ice_candidates += 1
+            batch = self._ice_batches.get(key)
+            if batch is not None:
+                batch.append(candidate)
+                return
+            self._ice_batches[key] = [candidate]
+        self.socketio.start_background_task(self._flush_ice_batch, key)
+
+    def _flush_ice_batch(self, key):
+        self.socketio.sleep(self.ice_batch_window)
+        room_id, from_user_id, to_user_id = key
+        with self._lock:
+            candidates = self._ice_batches.pop(key, [])
+            self._room_stats(room_id).ice_batches += 1
+        self.socketio.emit('webrtc_ice_candidates', {
+            'room_id': room_id,
+            'from_user_id': from_user_id,
+            'candidates': candidates
+        }, room=user_room(to_user_id))
+
+    def pending_ice_candidates(self):
+        """Henüz gönderilmemiş toplam ICE adayı sayısı"""
+        with self._lock:
+            return sum(len(batch) for batch in self._ice_batches.values())
+
+    def stats(self, room_id):
+        with self._lock:
+            stats = self._stats.get(room_id)
+            return stats.to_dict() if stats else SignalingStats().to_dict()
+
+    def discard_room(self, room_id):
+        with self._lock:
+            self._stats.pop(room_id, None)
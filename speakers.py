@@ -0,0 +1,134 @@
+"""Oda başına aktif konuşmacı kümesi (top-K)
+
+start_speaking ile kümeye giren üye, kümede en fazla K kişi kalacak şekilde
+tutulur; yer açmak gerektiğinde önce konuşmayı bırakmış en eski üye, yoksa en
+eski üye çıkarılır. stop_speaking üyeyi hemen çıkarmaz (kısa duraklamalarda
+ses bağlantısı açılıp kapanmasın diye), susturma / yetki kaybı / ayrılma ise
+çıkarır. Küme yalnızca üyeleri değiştiğinde yayınlanır; istemciler kümede
+olmadıklarında ses göndermeyi durdurur, böylece dinleyici başına gelen akış
+sayısı K ile sınırlı kalır.
+"""
+import threading
+import time
+
+
+def _admit(order, speaking, user_id, k):
+    """order: eskiden yeniye üyeler; (yeni sıra, çıkarılan üye) döndür"""
+    order = [member for member in order if member != user_id] + [user_id]
+    evicted = None
+    if len(order) > k:
+        older = order[:-1]
+        evicted = next((member for member in older if member not in speaking), older[0])
+        order.remove(evicted)
+    return order, evicted
+
+
+class ActiveSpeakers:
+    """Süreç içi aktif konuşmacı kümesi"""
+
+    def __init__(self, k=3):
+        self.k = k
+        self._order = {}
+        self._speaking = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.k = app.config.get('ACTIVE_SPEAKERS_K', self.k)
+        app.extensions['active_speakers'] = self
+
+    def current(self, room_id):
+        with self._lock:
+            return list(self._order.get(room_id, []))
+
+    def start(self, room_id, user_id):
+        """Üyeyi kümeye al; küme değiştiyse yeni listeyi, değişmediyse None döndür"""
+        with self._lock:
+            order = self._order.get(room_id, [])
+            speaking = self._speaking.setdefault(room_id, set())
+            changed = user_id not in order
+            order, evicted = _admit(order, speaking, user_id, self.k)
+            speaking.add(user_id)
+            speaking.discard(evicted)
+            self._order[room_id] = order
+            return list(order) if changed else None
+
+    def stop(self, room_id, user_id):
+        with self._lock:
+            self._speaking.get(room_id, set()).discard(user_id)
+
+    def remove(self, room_id, user_id):
+        """Üyeyi kümeden çıkar; küme değiştiyse yeni listeyi döndür"""
+        with self._lock:
+            self._speaking.get(room_id, set()).discard(user_id)
+            order = self._order.get(room_id, [])
+            if user_id not in order:
+                return None
+            order.remove(user_id)
+            return list(order)
+
+    def discard_room(self, room_id):
+        with self._lock:
+            self._order.pop(room_id, None)
+            self._speaking.pop(room_id, None)
+
+
+class RedisActiveSpeakers:
+    """Birden fazla worker'ın paylaştığı Redis tabanlı aktif konuşmacı kümesi
+
+    Küme {prefix}:order:<room> sıralı kümesinde (skor: son başlama zamanı),
+    konuşmakta olanlar {prefix}:on:<room> kümesinde tutulur. Güncellemeler
+    WATCH/MULTI ile yapılır; aynı anda yazan worker'lar yeniden dener.
+    """
+
+    def __init__(self, url=None, client=None, prefix='speakers', k=3):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.redis = client
+        self.prefix = prefix
+        self.k = k
+
+    def init_app(self, app):
+        self.k = app.config.get('ACTIVE_SPEAKERS_K', self.k)
+        app.extensions['active_speakers'] = self
+
+    def _keys(self, room_id):
+        return f'{self.prefix}:order:{room_id}', f'{self.prefix}:on:{room_id}'
+
+    def current(self, room_id):
+        order_key, _ = self._keys(room_id)
+        return [member.decode() for member in self.redis.zrange(order_key, 0, -1)]
+
+    def start(self, room_id, user_id):
+        order_key, on_key = self._keys(room_id)
+        result = {}
+
+        def admit(pipe):
+            order = [member.decode() for member in pipe.zrange(order_key, 0, -1)]
+            speaking = {member.decode() for member in pipe.smembers(on_key)}
+            new_order, evicted = _admit(order, speaking, user_id, self.k)
+            pipe.multi()
+            pipe.zadd(order_key, {user_id: time.time()})
+            pipe.sadd(on_key, user_id)
+            if evicted is not None:
+                pipe.zrem(order_key, evicted)
+                pipe.srem(on_key, evicted)
+            result['order'] = new_order if user_id not in order else None
+
+        self.redis.transaction(admit, order_key, on_key)
+        return result['order']
+
+    def stop(self, room_id, user_id):
+        _, on_key = self._keys(room_id)
+        self.redis.srem(on_key, user_id)
+
+    def remove(self, room_id, user_id):
+        order_key, on_key = self._keys(room_id)
+        pipe = self.redis.pipeline()
+        pipe.zrem(order_key, user_id)
+        pipe.srem(on_key, user_id)
+        removed, _ = pipe.execute()
+        return self.current(room_id) if removed else None
+
+    def discard_room(self, room_id):
+        self.redis.delete(*self._keys(room_id))
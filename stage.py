@@ -0,0 +1,105 @@
+"""Oda ses topolojisi: mesh veya SFU
+
+Küçük odalarda istemciler birbirine doğrudan bağlanır (mesh). Üye sayısı
+SFU_ROOM_THRESHOLD'u aştığında ve bir SFU servisi (sfu.py) yapılandırıldıysa
+oda sfu moduna geçer: yalnızca konuşma yetkisi olan üyeler yayın yapar, herkes
+sesi tek bağlantıyla servisten alır. Karar her değişiklikte veritabanındaki
+üyelikten hesaplanır, böylece farklı worker'lar aynı sonuca varır; değişmeyen
+topoloji tekrar yayınlanmaz.
+"""
+import threading
+
+import requests
+
+from models import db, RoomMember
+
+MODE_MESH = 'mesh'
+MODE_SFU = 'sfu'
+
+
+class SfuClient:
+    """sfu.py servisinin HTTP arayüzü için ince istemci"""
+
+    def __init__(self, url=None, token=None, timeout=5):
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+
+    def init_app(self, app):
+        self.url = (app.config.get('SFU_URL') or '').rstrip('/') or None
+        self.token = app.config.get('SFU_TOKEN')
+        self.timeout = app.config.get('SFU_TIMEOUT', self.timeout)
+        app.extensions['sfu'] = self
+
+    @property
+    def enabled(self):
+        return self.url is not None
+
+    def _request(self, method, path, payload=None):
+        headers = {'X-SFU-Token': self.token} if self.token else {}
+        response = requests.request(method, f'{self.url}{path}', json=payload,
+                                    headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def publish(self, room_id, user_id, offer):
+        return self._request('POST', f'/rooms/{room_id}/publish', {'user_id': user_id, 'offer': offer})
+
+    def subscribe(self, room_id, user_id, offer):
+        return self._request('POST', f'/rooms/{room_id}/subscribe', {'user_id': user_id, 'offer': offer})
+
+    def unpublish(self, room_id, user_id):
+        return self._request('POST', f'/rooms/{room_id}/unpublish', {'user_id': user_id})
+
+    def leave(self, room_id, user_id):
+        return self._request('POST', f'/rooms/{room_id}/leave', {'user_id': user_id})
+
+    def close_room(self, room_id):
+        return self._request('DELETE', f'/rooms/{room_id}')
+
+
+class RoomTopology:
+    """Odanın mesh/sfu kararını veren ve değişiklikleri yayınlayan yardımcı"""
+
+    def __init__(self, sfu, threshold=8):
+        self.sfu = sfu
+        self.threshold = threshold
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.threshold = app.config.get('SFU_ROOM_THRESHOLD', self.threshold)
+        app.extensions['room_topology'] = self
+
+    def compute(self, room_id):
+        """Odanın güncel topolojisi (1 sorgu)"""
+        rows = db.session.execute(
+            db.select(RoomMember.user_id, RoomMember.can_speak).where(RoomMember.room_id == room_id)
+        ).all()
+        mode = MODE_SFU if self.sfu.enabled and len(rows) > self.threshold else MODE_MESH
+        return {
+            'room_id': room_id,
+            'mode': mode,
+            # mesh modunda herkes yayın yapar
+            'publishers': sorted(row.user_id for row in rows if mode == MODE_MESH or row.can_speak),
+            'threshold': self.threshold
+        }
+
+    def publish(self, broadcast, room_id):
+        """Topoloji değiştiyse odaya room_topology olayı gönder
+
+        broadcast(event, data, room_id) diğer oda olaylarının yayın yardımcısıdır;
+        olay tekrar tamponuna yazılır, böylece resume eden istemci geçişi kaçırmaz.
+        """
+        topology = self.compute(room_id)
+        key = (topology['mode'], tuple(topology['publishers']) if topology['mode'] == MODE_SFU else ())
+        with self._lock:
+            if self._last.get(room_id) == key:
+                return topology
+            self._last[room_id] = key
+        broadcast('room_topology', topology, room_id)
+        return topology
+
+    def discard(self, room_id):
+        with self._lock:
+            self._last.pop(room_id, None)
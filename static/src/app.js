@@ -0,0 +1,887 @@
+// Socket.IO bağlantısı
+const socket = io();
+window.socket = socket; // webrtc.js sinyal mesajlarını bu bağlantı üzerinden gönderir
+
+// Global state
+let currentUser = null;
+let currentRoom = null;
+let currentMember = null;
+let isSpeaking = false;
+let isMuted = false;
+
+// Versiyonlu katılımcı listesi: sunucu delta gönderir, boşlukta tam liste alınır
+let rosterVersion = 0;
+let roomSeq = 0;
+let rosterMembers = new Map();
+let rosterLoading = false;
+let pendingRosterDeltas = [];
+
+// DOM elements
+const authSection = document.getElementById('authSection');
+const header = document.getElementById('header');
+const dashboard = document.getElementById('dashboard');
+const roomView = document.getElementById('roomView');
+const statusMessage = document.getElementById('statusMessage');
+
+// Initialize app
+document.addEventListener('DOMContentLoaded', function() {
+    loadRooms(); // Sayfa yüklendiğinde odaları göster
+    checkAuth();
+    setupEventListeners();
+});
+
+// Socket odasına katıl; yanıt odanın o anki olay seq'idir (üye değilse boş)
+function joinSocketRoom(roomId, onNotMember) {
+    roomSeq = 0;
+    socket.emit('join_room', { room_id: roomId, user_id: currentUser.id }, function(result) {
+        if (result && typeof result.seq === 'number') {
+            roomSeq = Math.max(roomSeq, result.seq);
+        } else if (onNotMember) {
+            onNotMember();
+        }
+    });
+}
+
+// Socket kimliği bağlantı anında session'dan alınır; giriş/çıkıştan sonra yeniden bağlan
+function reconnectSocket() {
+    socket.disconnect();
+    socket.connect();
+}
+
+// Check authentication status
+async function checkAuth() {
+    try {
+        const response = await fetch('/api/auth/me');
+        if (response.ok) {
+            currentUser = await response.json();
+            showUserInfo();
+        } else {
+            showAuthMenu();
+        }
+    } catch (error) {
+        showAuthMenu();
+    }
+}
+
+// Setup event listeners
+function setupEventListeners() {
+    // Auth tabs
+    document.querySelectorAll('.auth-tab').forEach(tab => {
+        tab.addEventListener('click', function() {
+            switchAuthTab(this.dataset.tab);
+        });
+    });
+
+    // Login form
+    document.getElementById('loginForm').addEventListener('submit', handleLogin);
+
+    // Register form
+    document.getElementById('registerForm').addEventListener('submit', handleRegister);
+
+    // Logout
+    document.getElementById('logoutBtn').addEventListener('click', handleLogout);
+
+    // Create room
+    document.getElementById('createRoomForm').addEventListener('submit', handleCreateRoom);
+    document.getElementById('closeCreateModal').addEventListener('click', hideCreateRoomModal);
+
+    // Auth menu
+    document.getElementById('authMenuBtn').addEventListener('click', showAuthModal);
+
+    // Room controls
+    document.getElementById('leaveRoomBtn').addEventListener('click', handleLeaveRoom);
+    document.getElementById('closeRoomBtn').addEventListener('click', handleCloseRoom);
+    document.getElementById('inviteBtn').addEventListener('click', handleInvite);
+    document.getElementById('requestsBtn').addEventListener('click', showRequestsModal);
+    document.getElementById('closeRequestsModal').addEventListener('click', hideRequestsModal);
+    document.getElementById('closeInviteModal').addEventListener('click', hideInviteModal);
+
+    // Speaking controls
+    document.getElementById('speakBtn').addEventListener('click', handleSpeak);
+    document.getElementById('muteBtn').addEventListener('click', handleMute);
+    document.getElementById('requestSpeakBtn').addEventListener('click', handleRequestSpeak);
+}
+
+// Auth functions
+function switchAuthTab(tab) {
+    document.querySelectorAll('.auth-tab').forEach(t => t.classList.remove('active'));
+    document.querySelector(`[data-tab="${tab}"]`).classList.add('active');
+
+    document.querySelectorAll('.auth-form').forEach(form => form.style.display = 'none');
+    document.getElementById(`${tab}Form`).style.display = 'block';
+}
+
+async function handleLogin(e) {
+    e.preventDefault();
+    const formData = new FormData(e.target);
+
+    try {
+        const response = await fetch('/api/auth/login', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                username: formData.get('username')
+            })
+        });
+
+        if (response.ok) {
+            currentUser = await response.json();
+            reconnectSocket();
+            showUserInfo();
+            hideAuthModal();
+            showStatus('Giriş başarılı!', 'success');
+        } else {
+            const error = await response.json();
+            showStatus(error.error || 'Giriş hatası!', 'error');
+        }
+    } catch (error) {
+        showStatus('Bağlantı hatası!', 'error');
+    }
+}
+
+async function handleRegister(e) {
+    e.preventDefault();
+    const formData = new FormData(e.target);
+
+    try {
+        const response = await fetch('/api/auth/register', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                username: formData.get('username'),
+                display_name: formData.get('display_name'),
+                email: formData.get('email') || null
+            })
+        });
+
+        if (response.ok) {
+            currentUser = await response.json();
+            reconnectSocket();
+            showUserInfo();
+            hideAuthModal();
+            showStatus('Kayıt başarılı!', 'success');
+        } else {
+            const error = await response.json();
+            showStatus(error.error || 'Kayıt hatası!', 'error');
+        }
+    } catch (error) {
+        showStatus('Bağlantı hatası!', 'error');
+    }
+}
+
+async function handleLogout() {
+    try {
+        await fetch('/api/auth/logout', { method: 'POST' });
+        reconnectSocket();
+        currentUser = null;
+        currentRoom = null;
+        currentMember = null;
+        showAuthMenu();
+        showStatus('Çıkış yapıldı!', 'info');
+    } catch (error) {
+        showStatus('Çıkış hatası!', 'error');
+    }
+}
+
+// UI functions
+function showAuthMenu() {
+    document.getElementById('userInfo').style.display = 'none';
+    document.getElementById('authMenu').style.display = 'flex';
+}
+
+function showUserInfo() {
+    document.getElementById('authMenu').style.display = 'none';
+    document.getElementById('userInfo').style.display = 'flex';
+
+    // Update user info
+    document.getElementById('userAvatar').textContent = currentUser.display_name.charAt(0).toUpperCase();
+    document.getElementById('userName').textContent = currentUser.display_name;
+}
+
+function showAuthModal() {
+    document.getElementById('authSection').classList.add('active');
+}
+
+function hideAuthModal() {
+    document.getElementById('authSection').classList.remove('active');
+}
+
+function showDashboard() {
+    authSection.classList.remove('active');
+    dashboard.classList.add('active');
+    roomView.classList.remove('active');
+    loadRooms();
+}
+
+function showRoom(room) {
+    currentRoom = room;
+    roomView.classList.add('active');
+    dashboard.classList.remove('active');
+
+    document.getElementById('roomTitle').textContent = room.name;
+    document.getElementById('roomParticipantCount').textContent = `${room.current_participants} katılımcı`;
+
+    // Show/hide owner controls
+    const isOwner = room.owner_id === currentUser.id;
+    document.getElementById('requestsBtn').style.display = isOwner ? 'block' : 'none';
+    document.getElementById('closeRoomBtn').style.display = isOwner ? 'block' : 'none';
+    document.getElementById('leaveRoomBtn').style.display = isOwner ? 'none' : 'block';
+
+    loadRoomMembers();
+    window.webrtcAudioConference.joinRoom(room.id, currentUser.id);
+}
+
+// Auth control functions
+function handleJoinRoom(roomId) {
+    if (!currentUser) {
+        showAuthModal();
+        showStatus('Odaya katılmak için giriş yapmalısınız!', 'error');
+        return;
+    }
+    joinRoom(roomId);
+}
+
+function handleCreateRoomClick() {
+    if (!currentUser) {
+        showAuthModal();
+        showStatus('Oda oluşturmak için giriş yapmalısınız!', 'error');
+        return;
+    }
+    showCreateRoomModal();
+}
+
+// Room functions
+// Oda dizini sayfalıdır; sonraki sayfanın cursor'ı X-Next-Cursor başlığında gelir
+let roomsNextCursor = null;
+let roomsQuery = '';
+let roomSearchTimer = null;
+
+function renderRoomCard(room) {
+    return `
+        <div class="room-card" onclick="joinRoom('${room.id}')">
+            <div class="room-header">
+                <div>
+                    <h3 class="room-title">${room.name}</h3>
+                    <p class="room-description">${room.description || 'Açıklama yok'}</p>
+                </div>
+                <div class="room-stats">
+                    <i class="fas fa-users"></i> ${room.current_participants}/${room.max_participants}
+                </div>
+            </div>
+            <div class="room-owner">
+                <div class="owner-avatar">${room.owner_name.charAt(0).toUpperCase()}</div>
+                <span class="owner-name">${room.owner_name}</span>
+            </div>
+            <button class="join-room-btn" onclick="event.stopPropagation(); handleJoinRoom('${room.id}')">
+                <i class="fas fa-sign-in-alt"></i> Katıl
+            </button>
+        </div>
+    `;
+}
+
+async function loadRooms(append = false) {
+    try {
+        const params = new URLSearchParams();
+        if (roomsQuery) params.set('q', roomsQuery);
+        if (append && roomsNextCursor) params.set('cursor', roomsNextCursor);
+        const response = await fetch(`${roomsQuery ? '/api/rooms/search' : '/api/rooms'}?${params}`);
+        const rooms = await response.json();
+        roomsNextCursor = response.headers.get('X-Next-Cursor');
+        document.getElementById('loadMoreRoomsBtn').style.display = roomsNextCursor ? 'block' : 'none';
+
+        const roomsGrid = document.getElementById('roomsGrid');
+        if (append) {
+            roomsGrid.insertAdjacentHTML('beforeend', rooms.map(renderRoomCard).join(''));
+        } else if (rooms.length === 0 && roomsQuery) {
+            roomsGrid.innerHTML = '<p style="text-align: center; color: rgba(255,255,255,0.6); grid-column: 1/-1;">Aramayla eşleşen oda yok.</p>';
+        } else if (rooms.length === 0) {
+            roomsGrid.innerHTML = '<p style="text-align: center; color: rgba(255,255,255,0.6); grid-column: 1/-1;">Henüz aktif oda yok. İlk odayı siz oluşturun!</p>';
+        } else {
+            roomsGrid.innerHTML = rooms.map(renderRoomCard).join('');
+        }
+    } catch (error) {
+        console.error('Odalar yüklenirken hata:', error);
+        showStatus('Odalar yüklenirken hata oluştu!', 'error');
+    }
+}
+
+function handleRoomSearch() {
+    // Her tuşta değil, yazma durduktan sonra ara
+    clearTimeout(roomSearchTimer);
+    roomSearchTimer = setTimeout(() => {
+        roomsQuery = document.getElementById('roomSearch').value.trim();
+        loadRooms();
+    }, 250);
+}
+
+async function joinRoom(roomId) {
+    try {
+        const response = await fetch(`/api/rooms/${roomId}/join`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({})
+        });
+
+        if (response.ok) {
+            currentMember = await response.json();
+            const room = await getRoom(roomId);
+            showRoom(room);
+
+            // Join socket room
+            joinSocketRoom(roomId);
+
+            showStatus('Odaya katıldınız!', 'success');
+        } else {
+            const error = await response.json();
+            if (error.error === 'Invite code required for private room') {
+                const inviteCode = prompt('Bu özel oda için davet kodu gerekli:');
+                if (inviteCode) {
+                    joinRoomWithInvite(roomId, inviteCode);
+                }
+            } else {
+                showStatus(error.error || 'Katılım hatası!', 'error');
+            }
+        }
+    } catch (error) {
+        showStatus('Bağlantı hatası!', 'error');
+    }
+}
+
+async function joinRoomWithInvite(roomId, inviteCode) {
+    try {
+        const response = await fetch(`/api/rooms/${roomId}/join`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ invite_code: inviteCode })
+        });
+
+        if (response.ok) {
+            currentMember = await response.json();
+            const room = await getRoom(roomId);
+            showRoom(room);
+
+            joinSocketRoom(roomId);
+            showStatus('Odaya katıldınız!', 'success');
+        } else {
+            const error = await response.json();
+            showStatus(error.error || 'Katılım hatası!', 'error');
+        }
+    } catch (error) {
+        showStatus('Bağlantı hatası!', 'error');
+    }
+}
+
+async function getRoom(roomId) {
+    const response = await fetch(`/api/rooms/${roomId}`);
+    return await response.json();
+}
+
+async function joinRoomAfterCreate(roomId) {
+    // Oda oluşturulduktan sonra kullanıcı zaten oda üyesi olduğu için
+    // sadece member bilgisini al
+    try {
+        const response = await fetch(`/api/rooms/${roomId}/members`);
+        const members = await response.json();
+        return members.find(m => m.user.id === currentUser.id);
+    } catch (error) {
+        console.error('Member bilgisi alınırken hata:', error);
+        return null;
+    }
+}
+
+async function loadRoomMembers() {
+    if (!currentRoom) return;
+    rosterLoading = true;
+    try {
+        const response = await fetch(`/api/rooms/${currentRoom.id}/roster`);
+        const snapshot = await response.json();
+
+        rosterVersion = snapshot.version;
+        // Liste bu seq'e kadarki olayları içerir; sonraki kopmada buradan devam edilir
+        if (typeof snapshot.seq === 'number') roomSeq = Math.max(roomSeq, snapshot.seq);
+        rosterMembers = new Map(snapshot.members.map(m => [m.user_id, m]));
+
+        // Liste yüklenirken gelen deltaları uygula
+        const queued = pendingRosterDeltas;
+        pendingRosterDeltas = [];
+        rosterLoading = false;
+        queued.forEach(([delta, apply]) => applyRosterDelta(delta, apply));
+
+        renderParticipants();
+    } catch (error) {
+        rosterLoading = false;
+        console.error('Üyeler yüklenirken hata:', error);
+    }
+}
+
+function applyRosterDelta(delta, apply) {
+    if (!currentRoom || delta.room_id !== currentRoom.id) return;
+    if (rosterLoading) {
+        pendingRosterDeltas.push([delta, apply]);
+        return;
+    }
+    if (delta.version <= rosterVersion) return; // Zaten listede var
+    if (delta.version !== rosterVersion + 1) {
+        // Kaçırılmış delta var, tam listeyi yeniden al
+        loadRoomMembers();
+        return;
+    }
+    apply(delta);
+    rosterVersion = delta.version;
+    renderParticipants();
+}
+
+function renderParticipants() {
+    const members = Array.from(rosterMembers.values());
+    const participantsCircle = document.getElementById('participantsCircle');
+    participantsCircle.innerHTML = members.map(member => {
+        const user = member.user;
+        const isOwner = currentRoom.owner_id === user.id;
+
+        return `
+            <div class="participant-avatar ${member.is_speaking ? 'speaking' : ''} ${member.is_muted ? 'muted' : ''} ${isOwner ? 'owner' : ''}" 
+                 data-user-id="${user.id}">
+                ${user.display_name.charAt(0).toUpperCase()}
+                <div class="participant-name">${user.display_name}</div>
+                <div class="participant-status ${member.is_speaking ? 'status-speaking' : member.is_muted ? 'status-muted' : isOwner ? 'status-owner' : ''}">
+                    ${member.is_speaking ? '🎤' : member.is_muted ? '🔇' : isOwner ? '👑' : ''}
+                </div>
+            </div>
+        `;
+    }).join('');
+
+    document.getElementById('roomParticipantCount').textContent = `${members.length} katılımcı`;
+
+    // Update current member info
+    currentMember = rosterMembers.get(currentUser.id) || currentMember;
+    updateSpeakingControls();
+}
+
+function updateSpeakingControls() {
+    const speakBtn = document.getElementById('speakBtn');
+    const muteBtn = document.getElementById('muteBtn');
+    const requestSpeakBtn = document.getElementById('requestSpeakBtn');
+
+    if (!currentMember) return;
+
+    const canSpeak = currentMember.can_speak;
+    const isOwner = currentRoom.owner_id === currentUser.id;
+
+    if (isOwner) {
+        speakBtn.style.display = 'block';
+        muteBtn.style.display = 'block';
+        requestSpeakBtn.style.display = 'none';
+    } else if (canSpeak) {
+        speakBtn.style.display = 'block';
+        muteBtn.style.display = 'block';
+        requestSpeakBtn.style.display = 'none';
+    } else {
+        speakBtn.style.display = 'none';
+        muteBtn.style.display = 'none';
+        requestSpeakBtn.style.display = 'block';
+    }
+}
+
+// Room creation
+function showCreateRoomModal() {
+    document.getElementById('createRoomModal').classList.add('active');
+}
+
+function hideCreateRoomModal() {
+    document.getElementById('createRoomModal').classList.remove('active');
+}
+
+async function handleCreateRoom(e) {
+    e.preventDefault();
+    const formData = new FormData(e.target);
+
+    try {
+        const response = await fetch('/api/rooms', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                name: formData.get('name'),
+                description: formData.get('description'),
+                is_public: formData.get('is_public') === 'true',
+                max_participants: parseInt(formData.get('max_participants'))
+            })
+        });
+
+        if (response.ok) {
+            const room = await response.json();
+            hideCreateRoomModal();
+            e.target.reset();
+
+            // Oda oluşturulduktan sonra otomatik olarak odaya katıl
+            currentMember = await joinRoomAfterCreate(room.id);
+            showRoom(room);
+
+            // Join socket room
+            joinSocketRoom(room.id);
+
+            showStatus('Oda oluşturuldu ve odaya katıldınız!', 'success');
+        } else {
+            const error = await response.json();
+            showStatus(error.error || 'Oda oluşturma hatası!', 'error');
+        }
+    } catch (error) {
+        showStatus('Bağlantı hatası!', 'error');
+    }
+}
+
+// Room controls
+async function handleLeaveRoom() {
+    try {
+        const response = await fetch(`/api/rooms/${currentRoom.id}/leave`, { method: 'POST' });
+        if (response.ok) {
+            socket.emit('leave_room', { room_id: currentRoom.id, user_id: currentUser.id });
+            window.webrtcAudioConference.leaveRoom();
+            currentRoom = null;
+            currentMember = null;
+            showDashboard();
+            showStatus('Odadan çıkıldı!', 'info');
+        } else {
+            const error = await response.json();
+            showStatus(error.error || 'Çıkış hatası!', 'error');
+        }
+    } catch (error) {
+        showStatus('Bağlantı hatası!', 'error');
+    }
+}
+
+async function handleCloseRoom() {
+    if (confirm('Odayı kapatmak istediğinizden emin misiniz? Tüm katılımcılar odadan çıkarılacak.')) {
+        try {
+            const response = await fetch(`/api/rooms/${currentRoom.id}/close`, { method: 'POST' });
+            if (response.ok) {
+                window.webrtcAudioConference.leaveRoom();
+                currentRoom = null;
+                currentMember = null;
+                showDashboard();
+                showStatus('Oda kapatıldı!', 'info');
+            } else {
+                const error = await response.json();
+                showStatus(error.error || 'Oda kapatma hatası!', 'error');
+            }
+        } catch (error) {
+            showStatus('Bağlantı hatası!', 'error');
+        }
+    }
+}
+
+async function handleInvite() {
+    try {
+        const response = await fetch(`/api/rooms/${currentRoom.id}/invite`, { method: 'POST' });
+        if (response.ok) {
+            const invite = await response.json();
+            showInviteModal(invite.invite_code);
+        } else {
+            showStatus('Davet kodu oluşturma hatası!', 'error');
+        }
+    } catch (error) {
+        showStatus('Bağlantı hatası!', 'error');
+    }
+}
+
+function showInviteModal(inviteCode) {
+    const modal = document.getElementById('inviteModal');
+    const content = document.getElementById('inviteContent');
+
+    content.innerHTML = `
+        <div style="text-align: center;">
+            <p>Bu davet kodunu paylaşın:</p>
+            <div style="background: rgba(255,255,255,0.1); padding: 1rem; border-radius: 10px; margin: 1rem 0; font-family: monospace; font-size: 1.2rem; font-weight: bold;">
+                ${inviteCode}
+            </div>
+            <button class="btn" onclick="copyInviteCode('${inviteCode}')">
+                <i class="fas fa-copy"></i> Kopyala
+            </button>
+        </div>
+    `;
+
+    modal.classList.add('active');
+}
+
+function hideInviteModal() {
+    document.getElementById('inviteModal').classList.remove('active');
+}
+
+function copyInviteCode(code) {
+    navigator.clipboard.writeText(code).then(() => {
+        showStatus('Davet kodu kopyalandı!', 'success');
+    });
+}
+
+// Speaking controls
+async function handleSpeak() {
+    if (isSpeaking) {
+        // Stop speaking
+        socket.emit('stop_speaking', { room_id: currentRoom.id, user_id: currentUser.id });
+        isSpeaking = false;
+        document.getElementById('speakBtn').innerHTML = '<i class="fas fa-microphone"></i> Konuş';
+    } else {
+        // Start speaking
+        socket.emit('start_speaking', { room_id: currentRoom.id, user_id: currentUser.id });
+        isSpeaking = true;
+        document.getElementById('speakBtn').innerHTML = '<i class="fas fa-stop"></i> Durdur';
+    }
+}
+
+async function handleMute() {
+    isMuted = !isMuted;
+    socket.emit('toggle_mute', { 
+        room_id: currentRoom.id, 
+        user_id: currentUser.id, 
+        is_muted: isMuted 
+    });
+
+    const muteBtn = document.getElementById('muteBtn');
+    if (isMuted) {
+        muteBtn.innerHTML = '<i class="fas fa-microphone"></i> Susturmayı Kaldır';
+        muteBtn.classList.remove('mute-btn');
+    } else {
+        muteBtn.innerHTML = '<i class="fas fa-microphone-slash"></i> Sustur';
+        muteBtn.classList.add('mute-btn');
+    }
+}
+
+async function handleRequestSpeak() {
+    try {
+        const response = await fetch(`/api/rooms/${currentRoom.id}/request-speak`, { method: 'POST' });
+        if (response.ok) {
+            showStatus('Konuşma isteği gönderildi!', 'info');
+        } else {
+            const error = await response.json();
+            showStatus(error.error || 'İstek gönderme hatası!', 'error');
+        }
+    } catch (error) {
+        showStatus('Bağlantı hatası!', 'error');
+    }
+}
+
+// Speaking requests modal
+function showRequestsModal() {
+    loadSpeakingRequests();
+    document.getElementById('requestsModal').classList.add('active');
+}
+
+function hideRequestsModal() {
+    document.getElementById('requestsModal').classList.remove('active');
+}
+
+async function loadSpeakingRequests() {
+    try {
+        const response = await fetch(`/api/rooms/${currentRoom.id}/speaking-requests`);
+        const requests = await response.json();
+
+        const requestsList = document.getElementById('requestsList');
+        if (requests.length === 0) {
+            requestsList.innerHTML = '<p style="text-align: center; color: rgba(255,255,255,0.6);">Bekleyen istek yok.</p>';
+        } else {
+            const bulkActions = requests.length > 1 ? `
+                <div class="request-actions" style="justify-content: flex-end; margin-bottom: 10px;">
+                    <button class="approve-btn" onclick="moderateAll('approve')">Tümünü Onayla</button>
+                    <button class="reject-btn" onclick="moderateAll('reject')">Tümünü Reddet</button>
+                </div>` : '';
+            requestsList.innerHTML = bulkActions + requests.map(req => `
+                <div class="request-item">
+                    <div class="request-user">
+                        <div class="owner-avatar">${req.user.display_name.charAt(0).toUpperCase()}</div>
+                        <span>${req.user.display_name}</span>
+                    </div>
+                    <div class="request-actions">
+                        <button class="approve-btn" onclick="approveSpeak('${req.user_id}')">Onayla</button>
+                        <button class="reject-btn" onclick="rejectSpeak('${req.user_id}')">Reddet</button>
+                    </div>
+                </div>
+            `).join('');
+        }
+    } catch (error) {
+        console.error('İstekler yüklenirken hata:', error);
+    }
+}
+
+async function approveSpeak(userId) {
+    try {
+        await fetch(`/api/rooms/${currentRoom.id}/approve-speak/${userId}`, { method: 'POST' });
+        loadSpeakingRequests();
+        showStatus('Konuşma yetkisi verildi!', 'success');
+    } catch (error) {
+        showStatus('Onaylama hatası!', 'error');
+    }
+}
+
+async function rejectSpeak(userId) {
+    try {
+        await fetch(`/api/rooms/${currentRoom.id}/reject-speak/${userId}`, { method: 'POST' });
+        loadSpeakingRequests();
+        showStatus('Konuşma isteği reddedildi!', 'info');
+    } catch (error) {
+        showStatus('Reddetme hatası!', 'error');
+    }
+}
+
+// Toplu moderasyon: tek istek, tek güncelleme, odaya tek olay
+async function moderateAll(action, filter = 'all') {
+    try {
+        const response = await fetch(`/api/rooms/${currentRoom.id}/moderation`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ action: action, filter: filter })
+        });
+        const result = await response.json();
+        if (!response.ok) {
+            showStatus(result.error || 'Moderasyon hatası!', 'error');
+            return;
+        }
+        loadSpeakingRequests();
+        showStatus(`${result.count} kullanıcı için işlem yapıldı.`, 'success');
+    } catch (error) {
+        showStatus('Moderasyon hatası!', 'error');
+    }
+}
+
+// Utility functions
+function showStatus(message, type) {
+    const statusEl = document.getElementById('statusMessage');
+    statusEl.textContent = message;
+    statusEl.className = `status-message ${type}`;
+    statusEl.classList.add('show');
+
+    setTimeout(() => {
+        statusEl.classList.remove('show');
+    }, 3000);
+}
+
+// Socket.IO event listeners
+socket.on('connect', function() {
+    if (!currentRoom || !currentUser) return;
+    // Kısa kopmada oturum sunucuda askıdadır: odaya geri dön ve kaçırılan olayları uygula
+    const roomId = currentRoom.id;
+    socket.emit('resume', { room_id: roomId, seq: roomSeq }, function(result) {
+        if (!result || !result.resumed) {
+            // Pencere dolmuş veya sunucu değişmiş (ör. yeniden başlatma): odaya tekrar katıl.
+            // Pencere dolduysa üyelik sunucuda kaldırılmıştır; lobiye dönülür
+            joinSocketRoom(roomId, function() {
+                if (!currentRoom || currentRoom.id !== roomId) return;
+                window.webrtcAudioConference.leaveRoom();
+                currentRoom = null;
+                currentMember = null;
+                showDashboard();
+                showStatus('Bağlantı uzun süre koptuğu için odadan çıkarıldınız', 'info');
+            });
+            loadRoomMembers();
+        } else if (result.resync) {
+            // roomSeq liste yanıtındaki seq ile ilerler; arada gelen olaylar kaybolmaz
+            loadRoomMembers();
+            window.webrtcAudioConference.refreshTopology();
+        } else {
+            // Tekrarlanan olaylar onAny'den geçmez; seq burada ilerletilir
+            result.events.forEach(e => socket.listeners(e.event).forEach(fn => fn(e.data)));
+            roomSeq = Math.max(roomSeq, ...result.events.map(e => e.data.seq));
+        }
+    });
+});
+
+// Oda olaylarının seq'i: yeniden bağlanınca bu noktadan sonrası istenir
+socket.onAny(function(event, data) {
+    if (data && typeof data.seq === 'number') roomSeq = Math.max(roomSeq, data.seq);
+});
+
+socket.on('server_draining', function(data) {
+    // Sunucu kapanıyor: herkes aynı anda bağlanmasın diye rastgele gecikmeyle yeniden bağlan
+    const windowMs = (data.reconnect_window || 5) * 1000;
+    setTimeout(reconnectSocket, 1000 + Math.random() * windowMs);
+});
+
+socket.on('member_joined', function(delta) {
+    applyRosterDelta(delta, d => rosterMembers.set(d.member.user_id, d.member));
+});
+
+socket.on('member_left', function(delta) {
+    applyRosterDelta(delta, d => rosterMembers.delete(d.user_id));
+    if (currentRoom && delta.room_id === currentRoom.id) {
+        window.webrtcAudioConference.handleMemberLeft(delta.user_id);
+    }
+});
+
+socket.on('member_changed', function(delta) {
+    applyRosterDelta(delta, d => {
+        const member = rosterMembers.get(d.user_id);
+        if (member) Object.assign(member, d.changes);
+    });
+});
+
+socket.on('roster_snapshot', function(snapshot) {
+    if (currentRoom && snapshot.room_id === currentRoom.id) {
+        rosterVersion = snapshot.version;
+        // Liste bu seq'e kadarki olayları içerir; sonraki kopmada buradan devam edilir
+        if (typeof snapshot.seq === 'number') roomSeq = Math.max(roomSeq, snapshot.seq);
+        rosterMembers = new Map(snapshot.members.map(m => [m.user_id, m]));
+        renderParticipants();
+    }
+});
+
+socket.on('speaking_request', function(request) {
+    if (currentRoom && currentRoom.owner_id === currentUser.id) {
+        showStatus(`${request.user.display_name} konuşma istiyor!`, 'info');
+    }
+});
+
+const moderationMessages = {
+    approve: ['Konuşma yetkiniz onaylandı!', 'success'],
+    reject: ['Konuşma isteğiniz reddedildi.', 'error'],
+    revoke: ['Konuşma yetkiniz geri alındı.', 'info'],
+    mute: ['Oda sahibi sizi susturdu.', 'info'],
+    unmute: ['Susturmanız kaldırıldı.', 'info']
+};
+
+socket.on('members_moderated', function(batch) {
+    if (batch.user_ids.includes(currentUser.id)) {
+        showStatus(...moderationMessages[batch.action]);
+    }
+    if (batch.version) {
+        applyRosterDelta(batch, b => b.user_ids.forEach(userId => {
+            const member = rosterMembers.get(userId);
+            if (member) Object.assign(member, b.changes);
+        }));
+    }
+});
+
+socket.on('speaking_approved', function(data) {
+    if (data.user_id === currentUser.id) {
+        showStatus('Konuşma yetkiniz onaylandı!', 'success');
+    }
+});
+
+socket.on('speaking_rejected', function(data) {
+    if (data.user_id === currentUser.id) {
+        showStatus('Konuşma isteğiniz reddedildi.', 'error');
+    }
+});
+
+socket.on('speaking_request_expired', function(data) {
+    if (data.user_id === currentUser.id) {
+        showStatus('Konuşma isteğinizin süresi doldu.', 'info');
+    }
+});
+
+// Konuşma/susturma değişiklikleri sunucuda kısa bir pencerede birleştirilip tek delta olarak gelir
+socket.on('speaking_state', function(delta) {
+    applyRosterDelta(delta, d => {
+        Object.entries(d.states).forEach(([userId, changes]) => {
+            const member = rosterMembers.get(userId);
+            if (member) Object.assign(member, changes);
+        });
+    });
+});
+
+socket.on('room_closed', function(data) {
+    if (currentRoom && currentRoom.id === data.room_id) {
+        window.webrtcAudioConference.leaveRoom();
+        currentRoom = null;
+        currentMember = null;
+        showDashboard();
+        showStatus('Oda kapatıldı!', 'info');
+    }
+});
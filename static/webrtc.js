@@ -9,6 +9,18 @@ class WebRTCAudioConference {
         this.isMuted = false;
         this.isSpeaking = false;
         
+        // Uzak açıklama gelmeden ulaşan ICE adayları
+        this.pendingCandidates = new Map();
+        this.signalingBound = false;
+        
+        // Oda topolojisi: mesh (herkes herkese) veya sfu (tek yayın + tek abonelik)
+        this.topology = { mode: 'mesh', publishers: [] };
+        this.sfuPublisher = null;
+        this.sfuSubscriber = null;
+        
+        // Sunucunun seçtiği aktif konuşmacılar; kümede olmayan istemci ses göndermez
+        this.activeSpeakers = new Set();
+        
         // ICE servers configuration
         this.iceServers = {
             iceServers: [
@@ -109,9 +121,30 @@ class WebRTCAudioConference {
         }
     }
     
+    bindSignaling() {
+        // Sinyal mesajları Socket.IO üzerinden, sunucu aracılığıyla doğrudan alıcıya gelir
+        if (this.signalingBound || !window.socket) return;
+        this.signalingBound = true;
+        
+        window.socket.on('webrtc_offer', (data) => this.handleOffer(data));
+        window.socket.on('webrtc_answer', (data) => {
+            if (data.room_id === this.roomId) {
+                this.handleAnswer(data.from_user_id, data.answer);
+            }
+        });
+        window.socket.on('webrtc_ice_candidates', (data) => this.handleIceCandidates(data));
+        window.socket.on('room_topology', (topology) => this.applyTopology(topology));
+        window.socket.on('active_speakers', (data) => {
+            if (data.room_id === this.roomId) {
+                this.setActiveSpeakers(data.user_ids);
+            }
+        });
+    }
+    
     async joinRoom(roomId, userId) {
         this.roomId = roomId;
         this.userId = userId;
+        this.bindSignaling();
         
         try {
             // Initialize WebRTC
@@ -120,17 +153,20 @@ class WebRTCAudioConference {
                 return false;
             }
             
-            // Get existing room members
-            const response = await fetch(`/api/rooms/${roomId}/members`);
+            const speakersResponse = await fetch(`/api/rooms/${roomId}/active-speakers`);
+            if (speakersResponse.ok) {
+                this.activeSpeakers = new Set((await speakersResponse.json()).user_ids);
+            }
+            
+            const response = await fetch(`/api/rooms/${roomId}/topology`);
             if (response.ok) {
-                const members = await response.json();
-                
-                // Create peer connections for existing members
-                for (const member of members) {
-                    if (member.user_id !== userId) {
-                        await this.createPeerConnection(member.user_id);
-                    }
-                }
+                this.topology = await response.json();
+            }
+            
+            if (this.topology.mode === 'sfu') {
+                await this.startSfu();
+            } else {
+                await this.connectMesh(false);
             }
             
             return true;
@@ -140,7 +176,215 @@ class WebRTCAudioConference {
         }
     }
     
-    async createPeerConnection(userId) {
+    async connectMesh(tieBreak) {
+        // Get existing room members
+        const response = await fetch(`/api/rooms/${this.roomId}/members`);
+        if (!response.ok) return;
+        const members = await response.json();
+        
+        // Katılan üye herkese teklif gönderir; topoloji değişiminde ise çakışmayı
+        // önlemek için yalnızca büyük user_id'li üyelere teklif gönderilir
+        for (const member of members) {
+            if (member.user_id !== this.userId && (!tieBreak || member.user_id > this.userId)) {
+                await this.createPeerConnection(member.user_id);
+            }
+        }
+    }
+    
+    setActiveSpeakers(userIds) {
+        this.activeSpeakers = new Set(userIds);
+        const connections = [...this.peerConnections.values()];
+        if (this.sfuPublisher) connections.push(this.sfuPublisher);
+        connections.forEach(connection => this.gateSenders(connection));
+        this.updateAudioElements();
+    }
+    
+    gateSenders(peerConnection) {
+        // Yeniden anlaşma (renegotiation) gerektirmeden gönderimi aç/kapat
+        const track = this.localStream ? this.localStream.getAudioTracks()[0] : null;
+        const outgoing = this.activeSpeakers.has(this.userId) ? track : null;
+        peerConnection.getSenders().forEach(sender => {
+            if (sender.track !== outgoing) {
+                sender.replaceTrack(outgoing).catch(error => console.error('Error gating sender:', error));
+            }
+        });
+    }
+    
+    isPublisher() {
+        return this.topology.mode !== 'sfu' || this.topology.publishers.includes(this.userId);
+    }
+    
+    async refreshTopology() {
+        // Yeniden bağlanmada tekrar tamponu yetmediyse güncel topolojiyi sunucudan al
+        if (!this.roomId) return;
+        const response = await fetch(`/api/rooms/${this.roomId}/topology`);
+        if (response.ok) {
+            await this.applyTopology(await response.json());
+        }
+    }
+    
+    async applyTopology(topology) {
+        if (topology.room_id !== this.roomId) return;
+        
+        const previous = this.topology;
+        this.topology = topology;
+        
+        if (previous.mode !== topology.mode) {
+            this.closeConnections();
+            if (topology.mode === 'sfu') {
+                await this.startSfu();
+            } else {
+                await this.connectMesh(true);
+            }
+            return;
+        }
+        if (topology.mode !== 'sfu') return;
+        
+        const wasPublisher = previous.publishers.includes(this.userId);
+        if (wasPublisher !== this.isPublisher()) {
+            if (this.isPublisher()) {
+                await this.sfuPublish();
+            } else {
+                this.closeSfuPublisher();
+            }
+        }
+        
+        const others = (list) => list.filter(id => id !== this.userId).join(',');
+        if (others(previous.publishers) !== others(topology.publishers)) {
+            await this.sfuSubscribe();
+        }
+    }
+    
+    async startSfu() {
+        if (this.isPublisher()) {
+            await this.sfuPublish();
+        }
+        await this.sfuSubscribe();
+    }
+    
+    waitForIceGathering(peerConnection, timeout = 2000) {
+        // SFU adayları teklifle birlikte bekler (trickle ICE yok)
+        return new Promise(resolve => {
+            if (peerConnection.iceGatheringState === 'complete') return resolve();
+            const timer = setTimeout(resolve, timeout);
+            peerConnection.addEventListener('icegatheringstatechange', () => {
+                if (peerConnection.iceGatheringState === 'complete') {
+                    clearTimeout(timer);
+                    resolve();
+                }
+            });
+        });
+    }
+    
+    async sfuNegotiate(event, peerConnection) {
+        await peerConnection.setLocalDescription(await peerConnection.createOffer());
+        await this.waitForIceGathering(peerConnection);
+        
+        const offer = peerConnection.localDescription;
+        const result = await new Promise(resolve => {
+            window.socket.emit(event, {
+                room_id: this.roomId,
+                offer: { sdp: offer.sdp, type: offer.type }
+            }, resolve);
+        });
+        if (!result || result.error || peerConnection.signalingState === 'closed') {
+            if (result && result.error) console.error(`${event} failed:`, result.error);
+            return null;
+        }
+        
+        await peerConnection.setRemoteDescription(result.answer);
+        return result;
+    }
+    
+    async sfuPublish() {
+        this.closeSfuPublisher();
+        if (!this.localStream) return;
+        
+        const peerConnection = new RTCPeerConnection(this.iceServers);
+        this.localStream.getAudioTracks().forEach(track => {
+            peerConnection.addTrack(track, this.localStream);
+        });
+        this.gateSenders(peerConnection);
+        this.sfuPublisher = peerConnection;
+        
+        try {
+            if (!await this.sfuNegotiate('sfu_publish', peerConnection) && this.sfuPublisher === peerConnection) {
+                this.closeSfuPublisher();
+            }
+        } catch (error) {
+            console.error('Error publishing to SFU:', error);
+        }
+    }
+    
+    async sfuSubscribe() {
+        this.closeSfuSubscriber();
+        const publishers = this.topology.publishers.filter(id => id !== this.userId);
+        if (!publishers.length) return;
+        
+        // Her yayıncı için bir alıcı transceiver; SFU hangisinin kime ait olduğunu döndürür
+        const peerConnection = new RTCPeerConnection(this.iceServers);
+        publishers.forEach(() => peerConnection.addTransceiver('audio', { direction: 'recvonly' }));
+        this.sfuSubscriber = peerConnection;
+        
+        try {
+            const result = await this.sfuNegotiate('sfu_subscribe', peerConnection);
+            if (this.sfuSubscriber !== peerConnection) return;
+            if (!result) {
+                this.closeSfuSubscriber();
+                return;
+            }
+            
+            const owners = new Map(result.tracks.map(track => [track.mid, track.user_id]));
+            peerConnection.getTransceivers().forEach(transceiver => {
+                const userId = owners.get(transceiver.mid);
+                if (userId) {
+                    this.remoteStreams.set(userId, new MediaStream([transceiver.receiver.track]));
+                }
+            });
+            this.updateAudioElements();
+        } catch (error) {
+            console.error('Error subscribing to SFU:', error);
+        }
+    }
+    
+    closeSfuPublisher() {
+        if (this.sfuPublisher) {
+            this.sfuPublisher.close();
+            this.sfuPublisher = null;
+        }
+    }
+    
+    closeSfuSubscriber() {
+        if (this.sfuSubscriber) {
+            this.sfuSubscriber.close();
+            this.sfuSubscriber = null;
+            this.removeRemoteStreams();
+        }
+    }
+    
+    removeRemoteStreams() {
+        this.remoteStreams.forEach((stream, userId) => {
+            const audioElement = document.getElementById(`audio-${userId}`);
+            if (audioElement) {
+                audioElement.remove();
+            }
+        });
+        this.remoteStreams.clear();
+    }
+    
+    closeConnections() {
+        // Mesh ve SFU bağlantılarının hepsini kapat (yerel akış korunur)
+        this.peerConnections.forEach(connection => {
+            connection.close();
+        });
+        this.peerConnections.clear();
+        this.pendingCandidates.clear();
+        this.closeSfuPublisher();
+        this.closeSfuSubscriber();
+        this.removeRemoteStreams();
+    }
+    
+    async createPeerConnection(userId, initiator = true) {
         const peerConnection = new RTCPeerConnection(this.iceServers);
         this.peerConnections.set(userId, peerConnection);
         
@@ -149,6 +393,7 @@ class WebRTCAudioConference {
             this.localStream.getTracks().forEach(track => {
                 peerConnection.addTrack(track, this.localStream);
             });
+            this.gateSenders(peerConnection);
         }
         
         // Handle remote streams
@@ -165,39 +410,50 @@ class WebRTCAudioConference {
             }
         };
         
-        // Create offer
-        const offer = await peerConnection.createOffer();
-        await peerConnection.setLocalDescription(offer);
-        
-        // Send offer to the other user via signaling server
-        await this.sendOffer(userId, offer);
+        if (initiator) {
+            // Create offer
+            const offer = await peerConnection.createOffer();
+            await peerConnection.setLocalDescription(offer);
+            
+            // Send offer to the other user via signaling server
+            this.sendOffer(userId, offer);
+        }
         
         return peerConnection;
     }
     
-    async sendOffer(userId, offer) {
+    sendOffer(userId, offer) {
+        window.socket.emit('webrtc_offer', {
+            room_id: this.roomId,
+            to_user_id: userId,
+            offer: offer
+        });
+    }
+    
+    async handleOffer(data) {
+        if (data.room_id !== this.roomId || this.topology.mode !== 'mesh') return;
+        
         try {
-            const response = await fetch('/api/webrtc/offer', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({
-                    room_id: this.roomId,
-                    from_user_id: this.userId,
-                    to_user_id: userId,
-                    offer: offer
-                })
-            });
-            
-            if (response.ok) {
-                const data = await response.json();
-                if (data.answer) {
-                    await this.handleAnswer(userId, data.answer);
-                }
+            const userId = data.from_user_id;
+            let peerConnection = this.peerConnections.get(userId);
+            if (!peerConnection) {
+                peerConnection = await this.createPeerConnection(userId, false);
             }
+            
+            await peerConnection.setRemoteDescription(data.offer);
+            await this.flushPendingCandidates(userId);
+            
+            const answer = await peerConnection.createAnswer();
+            await peerConnection.setLocalDescription(answer);
+            
+            window.socket.emit('webrtc_answer', {
+                room_id: this.roomId,
+                to_user_id: userId,
+                answer: answer,
+                offer_relayed_at: data.relayed_at
+            });
         } catch (error) {
-            console.error('Error sending offer:', error);
+            console.error('Error handling offer:', error);
         }
     }
     
@@ -205,28 +461,46 @@ class WebRTCAudioConference {
         const peerConnection = this.peerConnections.get(userId);
         if (peerConnection) {
             await peerConnection.setRemoteDescription(answer);
+            await this.flushPendingCandidates(userId);
         }
     }
     
-    async sendIceCandidate(userId, candidate) {
-        try {
-            await fetch('/api/webrtc/ice-candidate', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json'
-                },
-                body: JSON.stringify({
-                    room_id: this.roomId,
-                    from_user_id: this.userId,
-                    to_user_id: userId,
-                    candidate: candidate
-                })
-            });
-        } catch (error) {
-            console.error('Error sending ICE candidate:', error);
+    sendIceCandidate(userId, candidate) {
+        // Sunucu art arda gelen adayları toplayıp tek olayda iletir
+        window.socket.emit('webrtc_ice_candidate', {
+            room_id: this.roomId,
+            to_user_id: userId,
+            candidate: candidate.toJSON ? candidate.toJSON() : candidate
+        });
+    }
+    
+    async handleIceCandidates(data) {
+        if (data.room_id !== this.roomId) return;
+        
+        const userId = data.from_user_id;
+        const peerConnection = this.peerConnections.get(userId);
+        if (!peerConnection || !peerConnection.remoteDescription) {
+            const pending = this.pendingCandidates.get(userId) || [];
+            this.pendingCandidates.set(userId, pending.concat(data.candidates));
+            return;
+        }
+        
+        for (const candidate of data.candidates) {
+            try {
+                await peerConnection.addIceCandidate(candidate);
+            } catch (error) {
+                console.error('Error adding ICE candidate:', error);
+            }
         }
     }
     
+    async flushPendingCandidates(userId) {
+        const pending = this.pendingCandidates.get(userId);
+        if (!pending) return;
+        this.pendingCandidates.delete(userId);
+        await this.handleIceCandidates({ room_id: this.roomId, from_user_id: userId, candidates: pending });
+    }
+    
     updateAudioElements() {
         // Create hidden audio elements for each remote stream
         this.remoteStreams.forEach((stream, userId) => {
@@ -239,7 +513,11 @@ class WebRTCAudioConference {
                 audioElement.volume = 0.8; // Default volume
                 document.body.appendChild(audioElement);
             }
-            audioElement.srcObject = stream;
+            if (audioElement.srcObject !== stream) {
+                audioElement.srcObject = stream;
+            }
+            // Aktif konuşmacı olmayanların akışı boştur; oynatmayı da durdur
+            audioElement.muted = !this.activeSpeakers.has(userId);
         });
     }
     
@@ -298,6 +576,7 @@ class WebRTCAudioConference {
         }
         
         this.remoteStreams.delete(userId);
+        this.pendingCandidates.delete(userId);
         
         const audioElement = document.getElementById(`audio-${userId}`);
         if (audioElement) {
@@ -307,11 +586,11 @@ class WebRTCAudioConference {
     
     async leaveRoom() {
         try {
-            // Close all peer connections
-            this.peerConnections.forEach(connection => {
-                connection.close();
-            });
-            this.peerConnections.clear();
+            // Close all peer connections and clear remote audio
+            this.closeConnections();
+            this.roomId = null;
+            this.topology = { mode: 'mesh', publishers: [] };
+            this.activeSpeakers = new Set();
             
             // Stop local stream
             if (this.localStream) {
@@ -321,15 +600,6 @@ class WebRTCAudioConference {
                 this.localStream = null;
             }
             
-            // Clear remote streams and audio elements
-            this.remoteStreams.forEach((stream, userId) => {
-                const audioElement = document.getElementById(`audio-${userId}`);
-                if (audioElement) {
-                    audioElement.remove();
-                }
-            });
-            this.remoteStreams.clear();
-            
             // Close audio context
             if (this.audioContext) {
                 await this.audioContext.close();
@@ -0,0 +1,163 @@
+"""Bayat kayıtları temizleyen toplu sorgular
+
+Tarayıcısı kapanıp /api/auth/logout'a hiç gelmeyen kullanıcılar, leave_room
+göndermeden düşen üyelikler, sahibi kaybolmuş odalar ve birikip duran konuşma
+istekleri burada temizlenir. Her fonksiyon en fazla `limit` satırı tek bir
+kısa işlemde işler ve commit eder; böylece büyük tablolarda bile kilitler
+kısa tutulur. Döngü ve zamanlama jobs.JobRunner'dadır.
+"""
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from models import db, User, Room, RoomMember, SpeakingRequest
+from participants import recount
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def touch_online(user_ids, batch_size=500):
+    """Bu worker'a bağlı kullanıcıların kalp atışı: is_online ve last_seen'i tazele"""
+    user_ids = list(user_ids)
+    now = datetime.utcnow()
+    for chunk in _chunks(user_ids, batch_size):
+        db.session.execute(
+            update(User).where(User.id.in_(chunk))
+            .values(is_online=True, last_seen=now)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    return len(user_ids)
+
+
+def mark_offline(seen_before, limit):
+    """last_seen'i seen_before'dan eski çevrimiçi kullanıcıları çevrimdışı yap"""
+    user_ids = db.session.scalars(
+        select(User.id)
+        .where(User.is_online == True, User.last_seen < seen_before)  # noqa: E712
+        .limit(limit)
+    ).all()
+    if user_ids:
+        db.session.execute(
+            update(User).where(User.id.in_(user_ids), User.last_seen < seen_before)
+            .values(is_online=False)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    return user_ids
+
+
+def stale_members(seen_before, limit):
+    """Çevrimdışı kullanıcıların oda sahibi olmadıkları üyelikleri: [(id, room_id, user_id)]"""
+    return db.session.execute(
+        select(RoomMember.id, RoomMember.room_id, RoomMember.user_id)
+        .join(User, User.id == RoomMember.user_id)
+        .join(Room, Room.id == RoomMember.room_id)
+        .where(User.is_online == False,  # noqa: E712
+               User.last_seen < seen_before,
+               RoomMember.joined_at < seen_before,
+               RoomMember.user_id != Room.owner_id)
+        .limit(limit)
+    ).all()
+
+
+def disconnected_members(pairs):
+    """Bekleme penceresi dolan (user_id, room_id) çiftlerinin üyelikleri: [(id, room_id, user_id, is_owner)]"""
+    if not pairs:
+        return []
+    return db.session.execute(
+        select(RoomMember.id, RoomMember.room_id, RoomMember.user_id,
+               (Room.owner_id == RoomMember.user_id).label('is_owner'))
+        .join(Room, Room.id == RoomMember.room_id)
+        .where(db.tuple_(RoomMember.user_id, RoomMember.room_id).in_(list(pairs)))
+    ).all()
+
+
+def remove_members(rows):
+    """stale_members / disconnected_members satırlarını sil ve etkilenen odaların sayaçlarını düzelt"""
+    if not rows:
+        return 0
+    db.session.execute(
+        db.delete(RoomMember).where(RoomMember.id.in_([row.id for row in rows]))
+        .execution_options(synchronize_session=False)
+    )
+    recount({row.room_id for row in rows})
+    db.session.commit()
+    return len(rows)
+
+
+def abandoned_rooms(seen_before, limit):
+    """Sahibi seen_before'dan beri çevrimdışı olan aktif odalar"""
+    return db.session.scalars(
+        select(Room.id)
+        .join(User, User.id == Room.owner_id)
+        .where(Room.is_active == True,  # noqa: E712
+               User.is_online == False,  # noqa: E712
+               User.last_seen < seen_before)
+        .limit(limit)
+    ).all()
+
+
+def close_rooms(room_ids):
+    """Odaları kapat: üyeler silinir, bekleyen istekler expired olur (tek işlem)
+
+    Oda kapatma uç noktası ve sahipsiz oda taraması aynı sorguları kullanır.
+    """
+    if not room_ids:
+        return 0
+    now = datetime.utcnow()
+    db.session.execute(
+        db.delete(RoomMember).where(RoomMember.room_id.in_(room_ids))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        update(SpeakingRequest)
+        .where(SpeakingRequest.room_id.in_(room_ids), SpeakingRequest.status == 'pending')
+        .values(status='expired', responded_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    result = db.session.execute(
+        update(Room).where(Room.id.in_(room_ids))
+        .values(is_active=False, current_participants=0)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def expire_requests(requested_before, limit):
+    """requested_before'dan eski bekleyen konuşma isteklerini expired yap: [(id, room_id, user_id)]"""
+    rows = db.session.execute(
+        select(SpeakingRequest.id, SpeakingRequest.room_id, SpeakingRequest.user_id)
+        .where(SpeakingRequest.status == 'pending', SpeakingRequest.requested_at < requested_before)
+        .limit(limit)
+    ).all()
+    if rows:
+        db.session.execute(
+            update(SpeakingRequest)
+            .where(SpeakingRequest.id.in_([row.id for row in rows]), SpeakingRequest.status == 'pending')
+            .values(status='expired', responded_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    return rows
+
+
+def purge_requests(requested_before, limit):
+    """Sonuçlanmış ve saklama süresini doldurmuş konuşma isteklerini sil"""
+    request_ids = db.session.scalars(
+        select(SpeakingRequest.id)
+        .where(SpeakingRequest.status.in_(('approved', 'rejected', 'expired')),
+               SpeakingRequest.requested_at < requested_before)
+        .limit(limit)
+    ).all()
+    if request_ids:
+        db.session.execute(
+            db.delete(SpeakingRequest).where(SpeakingRequest.id.in_(request_ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    return len(request_ids)
@@ -0,0 +1,65 @@
+"""Süreç içi arka plan görev kuyruğu
+
+İsteğin veya socket olayının yanıtını geciktirmemesi gereken işler (oda
+kapandıktan sonraki temizlik gibi) kuyruğa atılır ve tek bir arka plan
+görevinde sırayla, uygulama bağlamı içinde çalıştırılır. Kuyruk worker
+sürecine aittir; süreç kapanırken bekleyen işler kaybolabilir. Bu yüzden
+yalnızca atlanması kalıcı tutarsızlık bırakmayan işler için kullanılır.
+
+Kuyruk Socket.IO'nun async moduna göre oluşturulur (eventlet'te
+eventlet.queue.Queue); böylece boş kuyrukta beklemek, monkey_patch
+yapılmamış geliştirme sunucusunda bile olay döngüsünü bloklamaz.
+"""
+import logging
+import queue
+
+logger = logging.getLogger(__name__)
+
+
+class TaskQueue:
+    def __init__(self, maxsize=10000):
+        self.app = None
+        self.socketio = None
+        self.processed = 0
+        self.failed = 0
+        self.maxsize = maxsize
+        self._queue = queue.Queue(maxsize)
+        self._started = False
+
+    def init_app(self, app, socketio):
+        self.app = app
+        self.socketio = socketio
+        self._queue = socketio.server.eio.create_queue(self.maxsize)
+        app.extensions['tasks'] = self
+
+    def start(self):
+        if self._started:
+            return
+        self._started = True
+        self.socketio.start_background_task(self._run)
+
+    def submit(self, fn, *args, **kwargs):
+        """İşi kuyruğa ekle; kuyruk doluysa çağıranın içinde çalıştır"""
+        self.start()
+        try:
+            self._queue.put_nowait((fn, args, kwargs))
+        except queue.Full:
+            logger.warning('Görev kuyruğu dolu, %s beklemeden çalıştırılıyor', fn.__name__)
+            self._execute(fn, args, kwargs)
+
+    def depth(self):
+        return self._queue.qsize()
+
+    def _run(self):
+        while True:
+            fn, args, kwargs = self._queue.get()
+            self._execute(fn, args, kwargs)
+
+    def _execute(self, fn, args, kwargs):
+        with self.app.app_context():
+            try:
+                fn(*args, **kwargs)
+                self.processed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception('Arka plan görevi başarısız: %s', fn.__name__)
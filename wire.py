@@ -0,0 +1,105 @@
+"""REST ve Socket.IO yüklerinin kodlanması (JSON / orjson / MessagePack)
+
+Oda listesi ve roster gibi büyük yükler her istekte ve her yayında yeniden
+kodlanır; standart json modülü bu noktada CPU'nun belirgin bir kısmını
+harcar. JSON_BACKEND=orjson ile hem REST yanıtları (app.json) hem de
+Socket.IO paketleri orjson ile kodlanır; çıktı aynı JSON'dur, istemci
+tarafında değişiklik gerekmez.
+
+SOCKETIO_SERIALIZER=msgpack Socket.IO paketlerini ikili MessagePack olarak
+gönderir. Sunucunun serializer'ı tüm bağlantılar için tektir; bu yüzden bu
+seçenek dağıtım genelinde açılır ve sayfa, socket.io istemcisinin msgpack
+parser'lı sürümünü yükler (bkz. socketio_client_url).
+"""
+import decimal
+
+from flask.json.provider import JSONProvider
+
+JSON_BACKENDS = ('json', 'orjson')
+SOCKETIO_SERIALIZERS = ('default', 'msgpack')
+
+SOCKETIO_CLIENT_URLS = {
+    'default': 'https://cdnjs.cloudflare.com/ajax/libs/socket.io/4.0.1/socket.io.js',
+    'msgpack': 'https://cdn.jsdelivr.net/npm/socket.io-client@4.7.2/dist/socket.io.msgpack.min.js',
+}
+
+
+def _default(value):
+    """orjson'un doğrudan kodlayamadığı tipler (Flask varsayılanıyla aynı)"""
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class OrjsonProvider(JSONProvider):
+    """app.json için orjson tabanlı sağlayıcı; yanıt gövdesi doğrudan bytes olarak yazılır"""
+
+    mimetype = 'application/json'
+
+    def __init__(self, app):
+        super().__init__(app)
+        import orjson
+        self._orjson = orjson
+        self._option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs):
+        return self._orjson.dumps(obj, default=_default, option=self._option).decode()
+
+    def loads(self, s, **kwargs):
+        return self._orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = self._orjson.dumps(obj, default=_default, option=self._option | self._orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+class OrjsonModule:
+    """python-socketio / engine.io'nun json= parametresinin beklediği dumps/loads arayüzü"""
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+
+    def dumps(self, obj, **kwargs):
+        # separators gibi stdlib parametreleri yok sayılır; orjson zaten sıkışık yazar
+        return self._orjson.dumps(obj, default=_default, option=self._orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return self._orjson.loads(s)
+
+
+class PayloadCodec:
+    """Yapılandırmaya göre REST ve Socket.IO kodlayıcılarını seçer"""
+
+    def __init__(self):
+        self.json_backend = 'json'
+        self.socketio_serializer = 'default'
+
+    def init_app(self, app):
+        self.json_backend = app.config.get('JSON_BACKEND', self.json_backend)
+        self.socketio_serializer = app.config.get('SOCKETIO_SERIALIZER', self.socketio_serializer)
+        if self.json_backend not in JSON_BACKENDS:
+            raise ValueError(f'Unknown JSON_BACKEND: {self.json_backend}')
+        if self.socketio_serializer not in SOCKETIO_SERIALIZERS:
+            raise ValueError(f'Unknown SOCKETIO_SERIALIZER: {self.socketio_serializer}')
+        if self.socketio_serializer == 'msgpack':
+            import msgpack  # noqa: F401  (python-socketio msgpack_packet bunu ister)
+        if self.json_backend == 'orjson':
+            app.json = OrjsonProvider(app)
+        app.extensions['payload_codec'] = self
+
+    def socketio_options(self):
+        """SocketIO(...) kurucusuna geçilecek serializer / json seçenekleri"""
+        options = {}
+        if self.socketio_serializer == 'msgpack':
+            options['serializer'] = 'msgpack'
+        if self.json_backend == 'orjson':
+            # msgpack açıkken de engine.io el sıkışması JSON'dur
+            options['json'] = OrjsonModule()
+        return options
+
+    def socketio_client_url(self):
+        return SOCKETIO_CLIENT_URLS[self.socketio_serializer]
@@ -0,0 +1,14 @@
+"""Üretim WSGI giriş noktası
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+eventlet, uygulama ve veritabanı sürücüsü içe aktarılmadan önce yamalanır;
+böylece PyMySQL, Redis ve requests çağrıları diğer bağlantıları bloklamaz.
+"""
+import eventlet
+
+eventlet.monkey_patch()
+
+from index import create_app  # noqa: E402
+
+app = create_app()